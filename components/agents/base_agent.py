@@ -1,13 +1,29 @@
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from typing import List, Dict, Any, Optional
-import os
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, message_chunk_to_message
+from typing import List, Dict, Any, Optional, Callable, Iterator
 from dotenv import load_dotenv
-import time
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, Retrying, retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+import asyncio
+import itertools
 import logging
+import re
 import sys
 
+from components.monitoring.llm_telemetry import LLMCall, note_attempt, record_cache_hit, track_llm_call
+from components.retrieval.context_packer import PackedContext, estimate_tokens, pack_context
+from components.utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from components.utils.deadlines import (
+    CALL_TIMEOUT_SECONDS,
+    DeadlineExceeded,
+    call_timeout,
+    call_within_deadline,
+    check_deadline,
+    remaining,
+)
+from components.utils.llm_cache import cache_bypassed, get_llm_cache, request_key
+from components.utils.model_routing import REASONING, get_chat_model, route
+from components.utils.rate_limiter import EXPECTED_OUTPUT_TOKENS, get_rate_limiter
+from components.utils.single_flight import SINGLE_FLIGHT_ENABLED, async_llm_calls, llm_calls
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -17,45 +33,309 @@ logging.basicConfig(
 # Load environment variables
 load_dotenv()
 
-# Base LLM setup
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash-preview-04-17",
-    api_key=os.environ["GEMINI_API_KEY"],
+# Base LLM setup: the reasoning tier. Agents pick a tier per call from the
+# routing table in components/utils/model_routing.py; LLM_BACKEND=offline swaps
+# in the deterministic template model (no network, no quota) for benchmarks
+llm = get_chat_model(REASONING)
+
+
+# Errors that mean the model cannot answer in time; workflows stop calling it
+# and return what they have
+LLM_UNAVAILABLE = (CircuitOpenError, DeadlineExceeded)
+
+_backoff = wait_exponential(multiplier=1, min=4, max=60)
+
+
+def _wait_within_deadline(retry_state) -> float:
+    # Never sleep past the deadline; the next attempt then fails fast
+    wait = _backoff(retry_state)
+    left = remaining()
+    return wait if left is None else max(min(wait, left), 0.0)
+
+
+# Attempts and backoff shared by the sync and async LLM paths
+RETRY_POLICY = dict(
+    stop=stop_after_attempt(5),
+    wait=_wait_within_deadline,
+    retry=retry_if_not_exception_type(LLM_UNAVAILABLE),
+    reraise=True,
 )
 
 
+def _estimate_request_tokens(messages) -> int:
+    """Rough input plus expected output tokens of a request, for rate limiting."""
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "".join(str(getattr(message, "content", message)) for message in messages)
+    return estimate_tokens(text) + EXPECTED_OUTPUT_TOKENS
+
+
 class Agent:
     """Base Agent class that all specialized agents will inherit from."""
 
+    # Estimated tokens of retrieved standards text an agent puts in one prompt;
+    # subclasses tune this to how much context their task needs
+    context_token_budget = 3000
+
     def __init__(self, system_prompt: str, tools: Optional[List] = None):
         self.system_prompt = system_prompt
         self.memory = []
+        self.tools = tools
+        self._llms: Dict[str, Any] = {}
 
         # Set up LLM with or without tools
-        if tools:
-            self.llm = llm.bind_tools(tools)
-        else:
-            self.llm = llm
-
-    @retry(stop=stop_after_attempt(5), 
-           wait=wait_exponential(multiplier=1, min=4, max=60),
-           reraise=True)
-    def _invoke_with_retry(self, messages):
+        self.llm = self._llm_for(REASONING)
+
+    def _llm_for(self, tier: str):
+        """This agent's model of ``tier``, bound to its tools."""
+        if tier not in self._llms:
+            model = get_chat_model(tier)
+            self._llms[tier] = model.bind_tools(self.tools) if self.tools else model
+        return self._llms[tier]
+
+    def _routed_llm(self):
+        """(tier, model) for a call made now, per the routing table and the current ``@llm_task``."""
+        tier = route(type(self))
+        return tier, self._llm_for(tier)
+
+    def _cached_response(self, messages, bypass_cache: bool):
+        """Key of a request and the cached reply, if the cache may answer it."""
+        tier, model = self._routed_llm()
+        key = request_key(model, messages)
+        cache = get_llm_cache()
+        if cache is None or bypass_cache or cache_bypassed():
+            return key, None
+        cached = cache.get(key)
+        if cached is not None:
+            logging.info(f"[{type(self).__name__}] LLM response served from cache")
+            record_cache_hit(type(self).__name__, model, tier)
+        return key, cached
+
+    def _store_response(self, key: str, response):
+        cache = get_llm_cache()
+        if cache is not None:
+            cache.put(key, response)
+        return response
+
+    @staticmethod
+    def _own_copy(response, shared: bool):
+        # Callers that coalesced onto one request each get their own message object
+        return response.model_copy(deep=True) if shared else response
+
+    def _invoke_with_retry(self, messages, bypass_cache: bool = False):
+        """
+        Invoke the LLM, answering repeated identical requests from the response cache.
+
+        An identical request already in flight (from another thread, e.g. a
+        second Streamlit session) is joined instead of sent again.
+
+        Args:
+            messages: Messages (or prompt) to send
+            bypass_cache: Skip the cache lookup and ask the model (the fresh
+                answer still replaces the cached one)
+        """
+        key, cached = self._cached_response(messages, bypass_cache)
+        if cached is not None:
+            return cached
+
+        def fetch():
+            tier, model = self._routed_llm()
+            with track_llm_call(type(self).__name__, model, messages, tier) as call:
+                response = self._call_llm(messages)
+                call.finish(response)
+            return self._store_response(key, response)
+
+        if not SINGLE_FLIGHT_ENABLED:
+            return fetch()
+        response, shared = llm_calls.do(key, fetch)
+        return self._own_copy(response, shared)
+
+    async def ainvoke(self, messages, bypass_cache: bool = False):
+        """
+        Async ``_invoke_with_retry`` on the chat model's native async API.
+
+        Same cache, rate limiter, retry policy and coalescing as the sync
+        path, but the event loop keeps running while the request is in
+        flight, so agents gathered with ``asyncio.gather`` overlap.
+        """
+        key, cached = self._cached_response(messages, bypass_cache)
+        if cached is not None:
+            return cached
+
+        async def fetch():
+            tier, model = self._routed_llm()
+            with track_llm_call(type(self).__name__, model, messages, tier) as call:
+                response = await self._acall_llm(messages)
+                call.finish(response)
+            return self._store_response(key, response)
+
+        if not SINGLE_FLIGHT_ENABLED:
+            return await fetch()
+        response, shared = await async_llm_calls.do(key, fetch)
+        return self._own_copy(response, shared)
+
+    def stream(
+        self,
+        messages,
+        bypass_cache: bool = False,
+        on_complete: Optional[Callable[[AIMessage], None]] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the reply's text as the model produces it.
+
+        Failures before the first chunk are retried like ``_invoke_with_retry``;
+        once text has been yielded an error is raised to the consumer. A cached
+        reply is yielded in one piece. Streams are not coalesced with other
+        in-flight requests.
+
+        Args:
+            messages: Messages (or prompt) to send
+            bypass_cache: Skip the cache lookup
+            on_complete: Called with the full AIMessage once the stream ends
+        """
+        key, cached = self._cached_response(messages, bypass_cache)
+        if cached is not None:
+            if cached.content:
+                yield cached.content
+            if on_complete:
+                on_complete(cached)
+            return
+
+        limiter = get_rate_limiter()
+        breaker = get_circuit_breaker()
+        tier, model = self._routed_llm()
+        call = LLMCall(type(self).__name__, model, messages, tier)
+        try:
+            for attempt in Retrying(**RETRY_POLICY):
+                with attempt:
+                    call.attempt()
+                    reservation = self._admit(limiter, messages)
+                    try:
+                        chunks = iter(model.stream(messages))
+                        first = next(chunks, None)
+                    except Exception as e:
+                        breaker.record_failure()
+                        self._handle_quota_error(e)
+                        raise
+            call.first_token()
+
+            response = None
+            try:
+                for chunk in itertools.chain([first] if first is not None else [], chunks):
+                    response = chunk if response is None else response + chunk
+                    if isinstance(chunk.content, str) and chunk.content:
+                        yield chunk.content
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+        except BaseException as e:
+            call.finish(error=e)
+            raise
+
+        message = message_chunk_to_message(response) if response is not None else AIMessage(content="")
+        call.finish(message)
+        limiter.settle(reservation, (message.usage_metadata or {}).get("total_tokens"))
+        self._store_response(key, message)
+        if on_complete:
+            on_complete(message)
+
+    @staticmethod
+    def _handle_quota_error(e: Exception) -> None:
+        """On a 429, pause the shared rate limiter for the server's retry delay."""
+        if "429" in str(e) and "quota" in str(e).lower():
+            logging.warning(f"Rate limit exceeded, retrying after backoff: {e}")
+            # Extract retry delay from error message if available
+            retry_seconds = 30  # Default retry delay
+            match = re.search(r"retry_delay.*?seconds: (\d+)", str(e))
+            if match:
+                retry_seconds = int(match.group(1))
+            # Hold back every agent, not just this caller; the retry queues behind the pause
+            get_rate_limiter().pause(retry_seconds)
+
+    @retry(**RETRY_POLICY)
+    def _call_llm(self, messages):
         """Invoke LLM with retry logic for handling quota exceeded errors"""
         try:
-            return self.llm.invoke(messages)
+            return self._invoke_llm(messages)
         except Exception as e:
-            if "429" in str(e) and "quota" in str(e).lower():
-                logging.warning(f"Rate limit exceeded, retrying after backoff: {e}")
-                # Extract retry delay from error message if available
-                import re
-                retry_seconds = 30  # Default retry delay
-                match = re.search(r"retry_delay.*?seconds: (\d+)", str(e))
-                if match:
-                    retry_seconds = int(match.group(1))
-                time.sleep(retry_seconds)
-                raise  # Re-raise to trigger retry
+            self._handle_quota_error(e)
+            raise  # Re-raise to trigger retry
+
+    async def _acall_llm(self, messages):
+        """Async ``_call_llm``: same attempts, backoff and quota handling."""
+        async for attempt in AsyncRetrying(**RETRY_POLICY):
+            with attempt:
+                try:
+                    return await self._ainvoke_llm(messages)
+                except Exception as e:
+                    self._handle_quota_error(e)
+                    raise
+
+    @staticmethod
+    def _admit(limiter, messages):
+        """
+        Let one request through to the model, or fail fast.
+
+        Raises ``DeadlineExceeded`` when the workflow's deadline is spent or
+        would pass while waiting for quota, and ``CircuitOpenError`` while
+        the upstream is failing.
+        """
+        check_deadline()
+        get_circuit_breaker().before_call()
+        return limiter.acquire(_estimate_request_tokens(messages), max_wait=remaining())
+
+    def _invoke_llm(self, messages):
+        """Single model call, paced by the shared rate limiter and guarded by the circuit breaker."""
+        note_attempt()
+        limiter = get_rate_limiter()
+        breaker = get_circuit_breaker()
+        reservation = self._admit(limiter, messages)
+        try:
+            response = call_within_deadline(self._routed_llm()[1].invoke, messages)
+        except DeadlineExceeded:
+            # Cut short by the workflow deadline rather than a slow upstream
+            raise
+        except Exception:
+            breaker.record_failure()
             raise
+        breaker.record_success()
+        usage = getattr(response, "usage_metadata", None) or {}
+        limiter.settle(reservation, usage.get("total_tokens"))
+        return response
+
+    async def _ainvoke_llm(self, messages):
+        """Single async model call, paced by the shared rate limiter and guarded by the circuit breaker."""
+        note_attempt()
+        limiter = get_rate_limiter()
+        breaker = get_circuit_breaker()
+        check_deadline()
+        breaker.before_call()
+        reservation = await limiter.aacquire(_estimate_request_tokens(messages), max_wait=remaining())
+        timeout = call_timeout()
+        try:
+            response = await asyncio.wait_for(self._routed_llm()[1].ainvoke(messages), timeout)
+        except TimeoutError:
+            # Cut short by the workflow deadline rather than a slow upstream
+            if timeout >= CALL_TIMEOUT_SECONDS:
+                breaker.record_failure()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        usage = getattr(response, "usage_metadata", None) or {}
+        limiter.settle(reservation, usage.get("total_tokens"))
+        return response
+
+    def _pack_context(self, nodes, token_budget: Optional[int] = None) -> PackedContext:
+        """Dedupe retrieved nodes and cut them to this agent's context token budget."""
+        return pack_context(
+            nodes,
+            token_budget or self.context_token_budget,
+            label=type(self).__name__,
+        )
 
     def __call__(self, state) -> Dict[str, Any]:
         """Process the current state and return a response."""
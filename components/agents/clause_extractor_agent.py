@@ -1,4 +1,5 @@
 from components.agents.base_agent import Agent
+from components.utils.model_routing import llm_task
 from typing import Dict, Any, List, Optional
 import re
 import logging
@@ -33,6 +34,7 @@ class ClauseExtractorAgent(Agent):
     def __init__(self):
         super().__init__(system_prompt=CLAUSE_EXTRACTOR_PROMPT)
     
+    @llm_task
     def extract_clauses(self, enhancement_results: Dict[str, Any]) -> List[Dict[str, str]]:
         """
         Extract clauses and their proposed modifications from enhancement results.
@@ -89,7 +89,7 @@ Please provide:
         ]
         
         # Get validation result
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
         
         return {
             "standard_id": standard_id,
@@ -104,7 +104,7 @@ class ProductComplianceCheckAgent(Agent):
             HumanMessage(content=extract_prompt)
         ]
         
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
         
         # Extract JSON from the response
         try:
@@ -219,7 +219,7 @@ class ProductComplianceCheckAgent(Agent):
             HumanMessage(content=compliance_prompt)
         ]
         
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
         
         # Parse the response to extract structured information
         compliance_checkpoints = []
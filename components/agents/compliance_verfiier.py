@@ -8,6 +8,8 @@ from langchain_core.messages import SystemMessage, HumanMessage
 class ComplianceVerifierAgent(Agent):
     """Agent responsible for verifying compliance of financial reports and documents."""
     
+    context_token_budget = 2500
+
     def __init__(self):
         super().__init__(system_prompt=COMPLIANCE_VERIFIER_SYSTEM_PROMPT)
     
@@ -29,7 +31,7 @@ class ComplianceVerifierAgent(Agent):
         
         # Use retriever to get additional relevant information
         retrieved_nodes = retriever.retrieve(document)
-        additional_context = "\n\n".join([node.text for node in retrieved_nodes])
+        additional_context = self._pack_context(retrieved_nodes).text
         
         # Prepare message for compliance verification
         messages = [
@@ -46,7 +48,7 @@ class ComplianceVerifierAgent(Agent):
                 f.write(f"{message.content}\n")
         
         # Get compliance verification result
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
         
         return {
             "document": document,
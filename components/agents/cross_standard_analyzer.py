@@ -86,7 +86,7 @@ class CrossStandardAnalyzerAgent(Agent):
         
         # Get analysis result
         try:
-            response = self.llm.invoke(messages)
+            response = self._invoke_with_retry(messages)
             analysis_text = response.content
         except Exception as e:
             logger.error(f"Error invoking LLM for cross-standard analysis: {e}")
@@ -357,7 +357,7 @@ Your response MUST follow this format:
         for standard_id in related_standard_ids:
             # Construct a query to retrieve key concepts from this standard
             retrieval_query = f"Key concepts, principles, and definitions in FAS {standard_id}"
-            retrieved_nodes = retriever.retrieve(retrieval_query)
+            retrieved_nodes = retriever.retrieve(retrieval_query, filters={"standard_id": standard_id})
             
             # Extract text content from retrieved nodes
             content = "\n\n".join([node.text for node in retrieved_nodes[:5]])  # Limit to top 5 results
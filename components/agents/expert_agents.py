@@ -1,5 +1,6 @@
 
 import logging
+import os
 from typing import Dict, Any, List, Optional, Tuple
 
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -97,6 +98,10 @@ class ExpertAgent(Agent):
     Base class for expert agents analyzing standard enhancement proposals, with tool-calling capabilities.
     """
     DOMAIN_KEYWORDS = DOMAIN_KEYWORDS_FIXED # From components.evaluation.utils
+    # Expert searches are TF-IDF keyword bags, where lexical matching on contract
+    # terms helps, so EXPERT_RETRIEVAL_MODE=hybrid suits them; unset, the
+    # retriever's configured mode applies (a sparse-only host stays model-free)
+    RETRIEVAL_MODE = os.environ.get("EXPERT_RETRIEVAL_MODE") or None
 
     def __init__(self, system_prompt: str, domain: str):
         self.domain = domain
@@ -167,19 +172,51 @@ class ExpertAgent(Agent):
     def _search_standards_tool(self, query: str) -> List[Dict[str, Any]]:
         logger.info(f"[{self.domain.upper()} TOOL CALL] Searching standards with query: '{query}'")
         try:
-            nodes = retriever.retrieve(query) # Assuming retriever.retrieve returns Node objects
-            docs = []
-            for node in nodes[:3]:  # Limit to top 3 for conciseness in prompt
-                doc_content = {"text": node.text}
-                if hasattr(node, 'metadata') and node.metadata:
-                    doc_content["metadata"] = node.metadata
-                docs.append(doc_content)
+            nodes = retriever.retrieve(query, mode=self.RETRIEVAL_MODE)
+            docs = self._nodes_to_docs(nodes)
             logger.info(f"[{self.domain.upper()} TOOL RESULT] Found {len(docs)} relevant documents for query '{query}'.")
             return docs
         except Exception as e:
             logger.error(f"[{self.domain.upper()}] Error searching standards: {e}")
             return []
 
+    async def _asearch_standards_tool(self, query: str) -> List[Dict[str, Any]]:
+        """Async variant of ``_search_standards_tool`` that doesn't block the event loop."""
+        logger.info(f"[{self.domain.upper()} TOOL CALL] Searching standards with query: '{query}'")
+        try:
+            nodes = await retriever.aretrieve(query, mode=self.RETRIEVAL_MODE)
+            docs = self._nodes_to_docs(nodes)
+            logger.info(f"[{self.domain.upper()} TOOL RESULT] Found {len(docs)} relevant documents for query '{query}'.")
+            return docs
+        except Exception as e:
+            logger.error(f"[{self.domain.upper()}] Error searching standards: {e}")
+            return []
+
+    def _nodes_to_docs(self, nodes: List[Any]) -> List[Dict[str, Any]]:
+        docs = []
+        for node in nodes[:3]:  # Limit to top 3 for conciseness in prompt
+            doc_content = {"text": node.text}
+            if hasattr(node, 'metadata') and node.metadata:
+                doc_content["metadata"] = node.metadata
+            docs.append(doc_content)
+        return docs
+
+    def build_search_query(self, context: Dict[str, Any]) -> Tuple[List[str], str]:
+        """
+        Build the standards search query this expert would run for a proposal.
+
+        Exposed separately so the orchestrator can batch the searches of all
+        experts into one retrieval and pass the results back via
+        ``context["retrieved_docs"]``.
+
+        Returns:
+            Tuple of (keywords, search query); the query is empty if no keywords were found
+        """
+        previous_discussion_str = self._format_previous_discussion(context.get("previous_discussion", []))
+        text_for_keywords = context.get("proposal", "") + "\n" + previous_discussion_str
+        keywords = self._extract_keywords_tool_using_tfidf(text_for_keywords)
+        return keywords, " ".join(keywords)
+
     # --- Main Analysis Method ---
     async def analyze_proposal(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -203,15 +240,18 @@ class ExpertAgent(Agent):
         # Format previous discussion
         previous_discussion_str = self._format_previous_discussion(previous_discussion_list)
 
-        # 1. Extract Keywords from proposal and discussion
-        text_for_keywords = proposal_text + "\n" + previous_discussion_str
-        keywords = self._extract_keywords_tool_using_tfidf(text_for_keywords)
-        
-        # 2. Search Standards using keywords
-        retrieved_docs = []
-        if keywords:
-            search_query = " ".join(keywords)
-            retrieved_docs = self._search_standards_tool(search_query)
+        if "retrieved_docs" in context:
+            # Search already done by the caller (batched across experts)
+            keywords = context.get("keywords_used_for_search", [])
+            retrieved_docs = context["retrieved_docs"]
+        else:
+            # 1. Extract Keywords from proposal and discussion
+            keywords, search_query = self.build_search_query(context)
+
+            # 2. Search Standards using keywords
+            retrieved_docs = []
+            if search_query:
+                retrieved_docs = await self._asearch_standards_tool(search_query)
         
         retrieved_context_str = "No relevant excerpts from existing standards were retrieved for this query."
         if retrieved_docs:
@@ -243,8 +283,7 @@ Provide your analysis, concerns, and recommendations strictly in the format spec
 
         # 4. Invoke LLM for analysis
         try:
-            # Assuming self.llm.invoke is an async method from the base Agent class
-            response =  self.llm.invoke(messages)
+            response = await self.ainvoke(messages)
             parsed_output = self._parse_structured_response(response.content)
             
             return {
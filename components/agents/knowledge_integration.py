@@ -60,7 +60,7 @@ Provide an integrated analysis that:
         ]
 
         # Get response from the model
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
 
         return {
             "transaction_analysis": transaction_analysis,
@@ -12,6 +12,7 @@ import re
 
 # Import base agent class
 from components.agents.base_agent import Agent
+from components.utils.model_routing import llm_task
 from components.agents.standards_extractor import standards_extractor
 from retreiver import retriever
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -61,6 +62,7 @@ class ProductDesignAdvisorAgent(Agent):
         
         return new_state
     
+    @llm_task
     def extract_requirements_from_query(self, query: str) -> Dict[str, Any]:
         """Extract product requirements from a natural language query."""
         # This is a simple implementation - could be enhanced with a more sophisticated approach
@@ -97,7 +99,7 @@ class ProductDesignAdvisorAgent(Agent):
             HumanMessage(content=extract_prompt)
         ]
         
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
         
         # Extract JSON from the response
         try:
@@ -143,7 +145,7 @@ class ProductDesignAdvisorAgent(Agent):
             HumanMessage(content=contract_prompt)
         ]
         
-        contract_response = self.llm.invoke(messages)
+        contract_response = self._invoke_with_retry(messages)
         
         # Parse the contract response
         recommended_contracts = []
@@ -198,7 +200,7 @@ class ProductDesignAdvisorAgent(Agent):
             HumanMessage(content=structure_prompt)
         ]
         
-        structure_response = self.llm.invoke(messages)
+        structure_response = self._invoke_with_retry(messages)
         
         # Step 4: Generate compliance checkpoints using Shariah principles knowledge
         from shariah_principles import format_principles_for_validation
@@ -243,7 +245,7 @@ class ProductDesignAdvisorAgent(Agent):
             HumanMessage(content=compliance_prompt)
         ]
         
-        compliance_response = self.llm.invoke(messages)
+        compliance_response = self._invoke_with_retry(messages)
         
         # Parse compliance response
         compliance_checkpoints = []
@@ -291,7 +293,7 @@ class ProductDesignAdvisorAgent(Agent):
             HumanMessage(content=name_prompt)
         ]
         
-        name_response = self.llm.invoke(messages)
+        name_response = self._invoke_with_retry(messages)
         suggested_name = name_response.content.strip()
         
         # Compile the final product design recommendation
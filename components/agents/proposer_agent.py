@@ -92,8 +92,7 @@ This precise formatting is critical for downstream automated parsing.
             """)
         ]
         
-        # Assuming self.llm.invoke is async, as in your other agents
-        response = self.llm.invoke(messages)
+        response = await self.ainvoke(messages)
         
         return {
             "standard_id": standard_id,
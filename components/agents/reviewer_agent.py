@@ -1,8 +1,10 @@
 from typing import Dict, Any, List
 from components.agents.base_agent import Agent
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from pydantic import BaseModel, Field, ValidationError
 from retreiver import retriever
 import logging
+import re
 
 from .expert_agents import (
     shariah_expert,
@@ -26,6 +28,44 @@ Return detailed findings including:
 - Why this might be an issue in the context of the trigger scenario
 """
 
+REVIEW_OUTPUT_INSTRUCTIONS = """Return your response as a single JSON object with exactly these keys:
+{"analysis": "<your detailed analysis as plain text>", "enhancement_areas": ["<one area needing enhancement, in a short phrase>", ...]}
+List each distinct enhancement area once, most important first. Do not write anything outside the JSON object."""
+
+
+class ReviewOutput(BaseModel):
+    """Schema of the reviewer's structured reply."""
+    analysis: str
+    enhancement_areas: List[str] = Field(default_factory=list)
+
+
+def parse_review(content: str) -> ReviewOutput:
+    """
+    Read the reviewer's reply into a ``ReviewOutput``.
+
+    Replies that are not valid JSON for the schema (prose, truncated output)
+    are parsed locally instead: the whole text is the analysis and its
+    bulleted or numbered lines are the enhancement areas.
+    """
+    json_match = re.search(r'({[\s\S]*})', content)
+    if json_match:
+        try:
+            review = ReviewOutput.model_validate_json(json_match.group(1))
+            review.enhancement_areas = [area.strip() for area in review.enhancement_areas if area.strip()]
+            return review
+        except ValidationError as e:
+            logging.warning(f"Reviewer reply did not match the schema, parsing it as text: {e.error_count()} errors")
+
+    areas = []
+    for line in content.splitlines():
+        item = re.match(r'^\s*(?:[-*\u2022]|\d+[.)])\s+(.+)$', line)
+        if item:
+            area = item.group(1).replace("**", "").strip()
+            if area and area not in areas:
+                areas.append(area)
+    return ReviewOutput(analysis=content.strip(), enhancement_areas=areas)
+
+
 class ReviewerAgent(Agent):
     """Agent responsible for initial analysis of standards and enhancement needs"""
 
@@ -45,7 +85,7 @@ class ReviewerAgent(Agent):
         """
         # Use retriever to get relevant chunks from standards
         retrieval_query = f"Standard FAS {standard_id} elements that might need enhancement regarding: {trigger_scenario}"
-        retrieved_nodes = retriever.retrieve(retrieval_query)
+        retrieved_nodes = retriever.retrieve(retrieval_query, filters={"standard_id": standard_id})
         
         # Extract text content from retrieved nodes
         context = "\n\n".join([node.text for node in retrieved_nodes])
@@ -66,18 +106,21 @@ Provide a detailed analysis of sections that might need enhancement, including:
 - Areas where the standard might not fully address the trigger scenario
 - Specific text that could be ambiguous when applied to this scenario
 - Potential inconsistencies within the standard or with other standards
+
+{REVIEW_OUTPUT_INSTRUCTIONS}
 """)
         ]
 
-        # Get analysis result
+        # Analysis and enhancement areas come back in one structured reply
         response = self._invoke_with_retry(messages)
+        review = parse_review(response.content)
         
         return {
             "standard_id": standard_id,
             "trigger_scenario": trigger_scenario,
             "review_content": context, 
-            "review_analysis": response.content,
-            "enhancement_areas": self._extract_enhancement_areas(response.content)
+            "review_analysis": review.analysis,
+            "enhancement_areas": review.enhancement_areas
         }
         
     async def analyze_standard(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -86,7 +129,7 @@ Provide a detailed analysis of sections that might need enhancement, including:
             # If context doesn't have 'text', retrieve it using the retriever
             if 'text' not in context:
                 retrieval_query = f"Standard FAS {context['standard_id']} elements that might need enhancement regarding: {context['trigger_scenario']}"
-                retrieved_nodes = retriever.retrieve(retrieval_query)
+                retrieved_nodes = await retriever.aretrieve(retrieval_query, filters={"standard_id": context['standard_id']})
                 context['text'] = "\n\n".join([node.text for node in retrieved_nodes])
             
             messages = [
@@ -101,14 +144,17 @@ Current Standard Text:
 
 Identify gaps, ambiguities, or areas needing enhancement in the current standard.
 Provide detailed analysis of how the standard could be improved to better address this scenario.
+
+{REVIEW_OUTPUT_INSTRUCTIONS}
 """)
             ]
 
-            response = self._invoke_with_retry(messages)
+            response = await self.ainvoke(messages)
+            review = parse_review(response.content)
             
             return {
-                "review_analysis": response.content,
-                "enhancement_areas": self._extract_enhancement_areas(response.content),
+                "review_analysis": review.analysis,
+                "enhancement_areas": review.enhancement_areas,
                 "text": context['text']  # Explicitly include the retrieved text in the response
             }
             
@@ -120,31 +166,6 @@ Provide detailed analysis of how the standard could be improved to better addres
                 "text": context.get('text', "")  # Include text field even in error case
             }
         
-    def _extract_enhancement_areas(self, analysis: str) -> List[str]:
-        """Extract key enhancement areas from analysis text"""
-        try:
-            messages = [
-                SystemMessage(content="Extract the key areas needing enhancement from the analysis. Return as a list."),
-                HumanMessage(content=analysis)
-            ]
-            
-            response = self._invoke_with_retry(messages)
-            return [area.strip() for area in response.content.split('\n') if area.strip()]
-            
-        except Exception as e:
-            logging.error(f"Error extracting enhancement areas: {str(e)}")
-            return []
-        
-    def _invoke_with_retry(self, messages, max_retries=3):
-        """Invoke LLM with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                return self.llm.invoke(messages)
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    raise e
-                logging.warning(f"Attempt {attempt+1} failed: {str(e)}. Retrying...")
-
 
 class ModeratorAgent(Agent):
     """
@@ -183,7 +204,7 @@ class ModeratorAgent(Agent):
     def _search_standard(self, standard_id: str, trigger_scenario: str) -> List[str]:
         """Search for relevant sections using retriever"""
         retrieval_query = f"Standard FAS {standard_id} elements that might need enhancement regarding: {trigger_scenario}"
-        retrieved_nodes = retriever.retrieve(retrieval_query)
+        retrieved_nodes = retriever.retrieve(retrieval_query, filters={"standard_id": standard_id})
         return [node.text for node in retrieved_nodes]
     
     def _identify_gaps(self, relevant_sections: List[str], trigger_scenario: str) -> List[Dict[str, Any]]:
@@ -351,7 +372,7 @@ class ModeratorAgent(Agent):
             HumanMessage(content=f"Synthesize expert opinions into a final proposal:\n\n{str(expert_opinions)}")
         ]
         
-        response = self.llm.invoke(messages)
+        response = await self.ainvoke(messages)
         
         return {
             "content": response.content,
@@ -415,7 +436,7 @@ class ModeratorAgent(Agent):
             """)
         ]
         
-        response = self.llm.invoke(messages)
+        response = await self.ainvoke(messages)
         return response.content
 
     async def _generate_discussion_summary(self, discussion_rounds: List) -> str:
@@ -425,7 +446,7 @@ class ModeratorAgent(Agent):
             HumanMessage(content=f"Summarize the following discussion rounds:\n\n{str(discussion_rounds)}")
         ]
         
-        response = self.llm.invoke(messages)
+        response = await self.ainvoke(messages)
         return response.content
 
     def _extract_remaining_concerns(self, discussion_rounds: List) -> List[Dict]:
@@ -468,16 +489,6 @@ class ModeratorAgent(Agent):
             "previous_discussion": proposal.get("previous_discussion", []) + [expert_opinions]
         }
         
-    def _invoke_with_retry(self, messages, max_retries=3):
-        """Invoke LLM with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                return self.llm.invoke(messages)
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    raise e
-                logging.warning(f"Attempt {attempt+1} failed: {str(e)}. Retrying...")
-
 
 # Initialize the agents
 reviewer_agent = ReviewerAgent()
@@ -14,7 +14,7 @@ class StandardsExtractorAgent(Agent):
         """Extract specific information from standards based on query."""
         # Use retriever to get relevant chunks from standards
         retrieval_query = f"Standard {standard_id}: {query}"
-        retrieved_nodes = retriever.retrieve(retrieval_query)
+        retrieved_nodes = retriever.retrieve(retrieval_query, filters={"standard_id": standard_id})
 
         # Extract text content from retrieved nodes
         context = "\n\n".join([node.text for node in retrieved_nodes])
@@ -36,7 +36,7 @@ Return a structured response with key elements, requirements, and guidelines.
         ]
 
         # Get extraction result
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
 
         return {
             "standard_id": standard_id,
@@ -1,5 +1,5 @@
 from langchain_core.messages import SystemMessage, HumanMessage
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Union, Callable, Iterator, Optional
 from components.agents.base_agent import Agent
 from components.agents.prompts import TRANSACTION_ANALYZER_SYSTEM_PROMPT
 from retreiver import retriever
@@ -10,6 +10,9 @@ import logging
 class TransactionAnalyzerAgent(Agent):
     """Agent responsible for analyzing journal entries to identify applicable AAOIFI standards."""
 
+    # Identifying the standard benefits from breadth across several standards
+    context_token_budget = 4000
+
     def __init__(self):
         super().__init__(system_prompt=TRANSACTION_ANALYZER_SYSTEM_PROMPT)
         self.retriever = retriever  # Make retriever accessible as a class attribute
@@ -27,6 +30,35 @@ class TransactionAnalyzerAgent(Agent):
         Returns:
             Dict containing analysis results
         """
+        transaction_details, retrieved_nodes, messages = self._prepare_analysis(transaction_input)
+
+        # Get response from the model
+        response = self._invoke_with_retry(messages)
+        return self._analysis_result(transaction_details, retrieved_nodes, response.content)
+
+    def stream_analysis(
+        self,
+        transaction_input: Union[str, Dict[str, Any]],
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming ``analyze_transaction``: yields the analysis text as it is generated.
+
+        Args:
+            transaction_input: Same as ``analyze_transaction``
+            on_complete: Called with the ``analyze_transaction`` result dict once
+                the analysis is complete
+        """
+        transaction_details, retrieved_nodes, messages = self._prepare_analysis(transaction_input)
+
+        def complete(response):
+            if on_complete:
+                on_complete(self._analysis_result(transaction_details, retrieved_nodes, response.content))
+
+        yield from self.stream(messages, on_complete=complete)
+
+    def _prepare_analysis(self, transaction_input: Union[str, Dict[str, Any]]):
+        """Retrieve standards context and build the analysis prompt."""
         # Handle string input
         if isinstance(transaction_input, str):
             transaction_details = {"context": transaction_input}
@@ -38,7 +70,7 @@ class TransactionAnalyzerAgent(Agent):
 
         # Use retriever to get relevant standards information
         retrieved_nodes = self.retriever.retrieve(query)
-        standards_context = "\n\n".join([node.text for node in retrieved_nodes])
+        standards_context = self._pack_context(retrieved_nodes).text
 
         # Log chunk information
         logging.info(f"TransactionAnalyzer retrieved {len(retrieved_nodes)} chunks")
@@ -67,16 +99,15 @@ IMPORTANT: If you determine that the transaction does not match any of the AAOIF
             """
             ),
         ]
+        return transaction_details, retrieved_nodes, messages
 
-        # Get response from the model
-        response = self.llm.invoke(messages)
-
+    def _analysis_result(self, transaction_details: Dict[str, Any], retrieved_nodes, analysis: str) -> Dict[str, Any]:
         # Extract standards mentioned in the response
-        standards = self._extract_standards(response.content)
+        standards = self._extract_standards(analysis)
 
         return {
             "transaction_details": transaction_details,
-            "analysis": response.content,
+            "analysis": analysis,
             "identified_standards": standards,
             "retrieval_stats": {
                 "chunk_count": len(retrieved_nodes),
@@ -143,7 +143,7 @@ and clauses in an organized manner with brief descriptions of what each referenc
             """
             ),
         ]  # Get response from the model
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
         # Extract references from the response
         # This will look for patterns like [Section X.XX], [Paragraph Y], etc.
         references = re.findall(
@@ -1,5 +1,5 @@
 from langchain_core.messages import SystemMessage, HumanMessage
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterator, Tuple
 from components.agents.base_agent import Agent
 from components.agents.prompts import USE_CASE_PROCESSOR_SYSTEM_PROMPT
 from components.agents.use_case_verifier import use_case_verifier
@@ -9,6 +9,8 @@ from retreiver import retriever
 class UseCaseProcessorAgent(Agent):
     """Agent responsible for processing financial use cases and providing accounting guidance."""
 
+    context_token_budget = 2500
+
     def __init__(self):
         super().__init__(system_prompt=USE_CASE_PROCESSOR_SYSTEM_PROMPT)
 
@@ -16,6 +18,53 @@ class UseCaseProcessorAgent(Agent):
         self, scenario: str, standards_info: Optional[Dict] = None
     ) -> Dict[str, Any]:
         """Process a financial scenario and provide accounting guidance with verification."""
+        messages = self._guidance_messages(scenario, standards_info)
+
+        # Get initial processing result
+        initial_response = self._invoke_with_retry(messages)
+        initial_guidance = initial_response.content
+
+        # Pass the initial output to the verifier for validation and enhancement
+        verified_result = use_case_verifier.verify_use_case(
+            scenario=scenario, llm_output=initial_guidance
+        )
+
+        # Return the combined result
+        return {
+            "scenario": scenario,
+            "accounting_guidance": verified_result["verified_guidance"],
+        }
+
+    def stream_use_case(
+        self,
+        scenario: str,
+        standards_info: Optional[Dict] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Streaming ``process_use_case``.
+
+        Yields ("draft", text) pieces of the initial guidance, then
+        ("verified", text) pieces of the verifier's final guidance.
+
+        Args:
+            scenario: Financial scenario to process
+            standards_info: Optional extracted standards information
+            on_complete: Called with the ``process_use_case`` result dict at the end
+        """
+        draft = []
+        for text in self.stream(self._guidance_messages(scenario, standards_info)):
+            draft.append(text)
+            yield "draft", text
+
+        def complete(verified_result):
+            if on_complete:
+                on_complete({"scenario": scenario, "accounting_guidance": verified_result["verified_guidance"]})
+
+        for text in use_case_verifier.stream_verification(scenario, "".join(draft), on_complete=complete):
+            yield "verified", text
+
+    def _guidance_messages(self, scenario: str, standards_info: Optional[Dict]):
         # If we have standards info, include it as context
         standards_context = ""
         if standards_info:
@@ -25,7 +74,7 @@ class UseCaseProcessorAgent(Agent):
 
         # Use retriever to get additional relevant information
         retrieved_nodes = retriever.retrieve(scenario)
-        additional_context = "\n\n".join([node.text for node in retrieved_nodes])
+        additional_context = self._pack_context(retrieved_nodes).text
 
         # Prepare message for use case processing
         messages = [
@@ -42,21 +91,7 @@ Additional Context:
             """
             ),
         ]
-
-        # Get initial processing result
-        initial_response = self.llm.invoke(messages)
-        initial_guidance = initial_response.content
-
-        # Pass the initial output to the verifier for validation and enhancement
-        verified_result = use_case_verifier.verify_use_case(
-            scenario=scenario, llm_output=initial_guidance
-        )
-
-        # Return the combined result
-        return {
-            "scenario": scenario,
-            "accounting_guidance": verified_result["verified_guidance"],
-        }
+        return messages
 
 
 # Initialize the agent
@@ -1,5 +1,5 @@
 from langchain_core.messages import SystemMessage, HumanMessage
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterator
 from components.agents.base_agent import Agent
 from components.agents.prompts import USE_CASE_VERIFIER_SYSTEM_PROMPT
 from retreiver import retriever
@@ -8,6 +8,9 @@ from tools.index import extract_financial_amounts, identify_transaction_type
 class UseCaseVerifierAgent(Agent):
     """Agent responsible for verifying financial use cases processing and enhancing accounting guidance."""
 
+    # The prompt already carries the processor's guidance and extracted amounts
+    context_token_budget = 1500
+
     def __init__(self):
         super().__init__(system_prompt=USE_CASE_VERIFIER_SYSTEM_PROMPT)
 
@@ -15,6 +18,28 @@ class UseCaseVerifierAgent(Agent):
         self, scenario: str, llm_output: str = ""
     ) -> Dict[str, Any]:
         """Verify a financial scenario processing and enhance accounting guidance with missing calculations."""
+        messages = self._verification_messages(scenario, llm_output)
+
+        # Get verification result
+        response = self._invoke_with_retry(messages)
+        return self._verification_result(scenario, llm_output, response.content)
+
+    def stream_verification(
+        self,
+        scenario: str,
+        llm_output: str = "",
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Iterator[str]:
+        """Streaming ``verify_use_case``: yields the verified guidance as it is generated."""
+        messages = self._verification_messages(scenario, llm_output)
+
+        def complete(response):
+            if on_complete:
+                on_complete(self._verification_result(scenario, llm_output, response.content))
+
+        yield from self.stream(messages, on_complete=complete)
+
+    def _verification_messages(self, scenario: str, llm_output: str):
         # Identify the transaction type to get context-specific calculation formulas
         transaction_info = identify_transaction_type(scenario)
         
@@ -23,7 +48,7 @@ class UseCaseVerifierAgent(Agent):
         
         # Get additional context from the retriever
         retrieved_nodes = retriever.retrieve(scenario)
-        additional_context = "\n\n".join([node.text for node in retrieved_nodes])
+        additional_context = self._pack_context(retrieved_nodes).text
 
         # Prepare message for verification
         messages = [
@@ -50,14 +75,14 @@ Focus on identifying any missing calculations or amounts that were not properly
 """
             ),
         ]
+        return messages
 
-        # Get verification result
-        response = self.llm.invoke(messages)
-
+    @staticmethod
+    def _verification_result(scenario: str, llm_output: str, verified_guidance: str) -> Dict[str, Any]:
         return {
             "scenario": scenario, 
             "original_guidance": llm_output,
-            "verified_guidance": response.content
+            "verified_guidance": verified_guidance
         }
 
 # Initialize the agent
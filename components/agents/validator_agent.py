@@ -1,8 +1,11 @@
 from langchain_core.messages import SystemMessage, HumanMessage
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional
 import requests
 import json
+import logging
 import os
+import threading
 from components.agents.base_agent import Agent
 from components.agents.prompts import VALIDATOR_SYSTEM_PROMPT
 from shariah_principles import format_principles_for_validation
@@ -11,6 +14,30 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+COMPLIANCE_API_WORKERS = int(os.environ.get("COMPLIANCE_API_WORKERS", "4"))
+
+_compliance_executor: Optional[ThreadPoolExecutor] = None
+_compliance_executor_lock = threading.Lock()
+
+
+def get_compliance_executor() -> ThreadPoolExecutor:
+    """Shared executor for compliance API requests, created on first use."""
+    global _compliance_executor
+    if _compliance_executor is None:
+        with _compliance_executor_lock:
+            if _compliance_executor is None:
+                _compliance_executor = ThreadPoolExecutor(
+                    max_workers=COMPLIANCE_API_WORKERS, thread_name_prefix="compliance-api"
+                )
+    return _compliance_executor
+
+
+def _log_abandoned_check(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Compliance API request for an abandoned validation failed: {future.exception()}")
+
 
 
 
@@ -35,6 +62,9 @@ load_dotenv()
 
 class ValidatorAgent(Agent):
     """Agent responsible for validating proposed changes."""
+
+    # Related-standards context only supports the consistency check
+    context_token_budget = 1500
     
     def __init__(self, use_compliance_api: bool = True, compliance_api_url: Optional[str] = None):
         """
@@ -73,7 +103,7 @@ class ValidatorAgent(Agent):
         # Use retriever to get related standards information
         related_query = f"Related standards to FAS {standard_id} and consistency considerations"
         related_nodes = retriever.retrieve(related_query)
-        related_standards = "\n\n".join([node.text for node in related_nodes])
+        related_standards = self._pack_context(related_nodes).text
         
         # Prepare message for validation
         messages = [
@@ -100,14 +130,29 @@ Validate the proposal and provide:
             """)
         ]
         
+        # The Islamic Finance Compliance API doesn't depend on the LLM's assessment,
+        # so query it while the LLM call is in flight
+        compliance_check = None
+        if self.use_compliance_api:
+            compliance_check = get_compliance_executor().submit(
+                self.check_shariah_compliance, standard_id, enhancement_proposal
+            )
+        
         # Get validation result
-        response = self.llm.invoke(messages)
+        try:
+            response = self._invoke_with_retry(messages)
+        except BaseException:
+            # No result to merge into: drop the request if it hasn't started,
+            # otherwise let it finish (bounded by its timeout) and log a failure
+            if compliance_check is not None and not compliance_check.cancel():
+                compliance_check.add_done_callback(_log_abandoned_check)
+            raise
         validation_result = response.content
         
         # Use the Islamic Finance Compliance API as an additional validation source if enabled
-        if self.use_compliance_api:
+        if compliance_check is not None:
             try:
-                shariah_compliance_check = self.check_shariah_compliance(standard_id, enhancement_proposal)
+                shariah_compliance_check = compliance_check.result()
                 validation_result = self.merge_validation_results(response.content, shariah_compliance_check)
             except Exception as e:
                 print(f"ERROR using Islamic Finance Compliance API: {e}")
@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Optional
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 # Try to import requests, with a graceful fallback if not installed
@@ -87,10 +88,35 @@ class ContextRetriever:
             return {domain: domain_docs}
 
         # Otherwise organize by domain with some overlap
-        domain_context = {}
-        for d in ["shariah", "finance", "legal"]:
+        domains = ["shariah", "finance", "legal"]
+
+        def fetch(d):
             # Fetch context for each domain using the API
-            domain_context[d] = self._retrieve_context(query, domain=d)
+            try:
+                return self._fetch_from_api(query, d, fallback=False)
+            except Exception as e:
+                self.logger.error(f"Error retrieving context: {e}")
+                return None
+
+        # The domain requests are independent; send them at once
+        with ThreadPoolExecutor(max_workers=len(domains), thread_name_prefix="context-api") as pool:
+            api_context = dict(zip(domains, pool.map(fetch, domains)))
+
+        # The vector DB query doesn't depend on the domain: domains the API
+        # couldn't serve share one retrieval
+        fallback_domains = [d for d in domains if api_context[d] is None]
+        if fallback_domains:
+            try:
+                fallback_docs = self._fetch_from_vector_db(query)
+            except Exception as e:
+                self.logger.error(f"Error retrieving context: {e}")
+                fallback_docs = []
+            for d in fallback_domains:
+                api_context[d] = list(fallback_docs)
+
+        domain_context = {}
+        for d in domains:
+            domain_context[d] = api_context[d]
             self.logger.info(
                 f"Retrieved {len(domain_context[d])} documents for {d} domain"
             )
@@ -124,8 +150,8 @@ class ContextRetriever:
             return []
 
     def _fetch_from_api(
-        self, query: str, domain: str, k: int = 5
-    ) -> List[Dict[str, str]]:
+        self, query: str, domain: str, k: int = 5, fallback: bool = True
+    ) -> Optional[List[Dict[str, str]]]:
         """
         Fetch context from the external API.
 
@@ -133,9 +159,12 @@ class ContextRetriever:
             query: The query text
             domain: The domain to query for (maps to 'source' in API: shariah, finance, legal)
             k: Maximum number of results to return
+            fallback: Fall back to the vector database when the API fails. If False,
+                None is returned instead so the caller can share one fallback
+                retrieval across domains.
 
         Returns:
-            List of context documents
+            List of context documents, or None if the API failed and fallback is False
         """
         try:
             # Skip API call if requests module is not available
@@ -143,7 +172,7 @@ class ContextRetriever:
                 self.logger.warning(
                     "Requests module not available, falling back to vector DB"
                 )
-                return self._fetch_from_vector_db(query, k)
+                return self._fetch_from_vector_db(query, k) if fallback else None
 
             # Construct API URL
             api_url = urljoin(CONTEXT_API_BASE_URL, CONTEXT_API_ENDPOINT)
@@ -163,7 +192,7 @@ class ContextRetriever:
                     # Validate response structure
                     if "clauses" not in data:
                         self.logger.warning("API response missing 'clauses' field")
-                        return self._fetch_from_vector_db(query, k)
+                        return self._fetch_from_vector_db(query, k) if fallback else None
 
                     # Transform the API response to the expected format
                     docs = []
@@ -194,15 +223,15 @@ class ContextRetriever:
                         self.logger.warning(
                             "API returned no results for source: {}".format(domain)
                         )
-                        return self._fetch_from_vector_db(query, k)
+                        return self._fetch_from_vector_db(query, k) if fallback else None
 
                     return docs
                 except ValueError as e:
                     self.logger.error(f"Failed to parse API response: {e}")
-                    return self._fetch_from_vector_db(query, k)
+                    return self._fetch_from_vector_db(query, k) if fallback else None
             elif response.status_code == 429:
                 self.logger.warning("API rate limit exceeded (429)")
-                return self._fetch_from_vector_db(query, k)
+                return self._fetch_from_vector_db(query, k) if fallback else None
             else:
                 self.logger.warning(
                     "API request failed with status code: {}".format(
@@ -210,20 +239,20 @@ class ContextRetriever:
                     )
                 )
                 # Fall back to vector DB if API fails
-                return self._fetch_from_vector_db(query, k)
+                return self._fetch_from_vector_db(query, k) if fallback else None
 
         except requests.exceptions.Timeout:
             self.logger.warning(
                 "API request timed out after {} seconds".format(API_TIMEOUT)
             )
-            return self._fetch_from_vector_db(query, k)
+            return self._fetch_from_vector_db(query, k) if fallback else None
         except requests.exceptions.ConnectionError:
             self.logger.warning("API connection error - check network or API endpoint")
-            return self._fetch_from_vector_db(query, k)
+            return self._fetch_from_vector_db(query, k) if fallback else None
         except Exception as e:
             self.logger.error(f"Error fetching from API: {e}")
             # Fall back to vector DB if API call fails
-            return self._fetch_from_vector_db(query, k)
+            return self._fetch_from_vector_db(query, k) if fallback else None
 
     def _fetch_from_vector_db(self, query: str, k: int = 5) -> List[Dict[str, str]]:
         """Retrieve context from the vector database as fallback."""
@@ -83,7 +83,7 @@ focusing on strengths, weaknesses, and key considerations.
         ]
         
         # Generate the argument
-        argument_response = self.llm.invoke(messages)
+        argument_response = self._invoke_with_retry(messages)
         
         return {
             "agent_type": self.domain,
@@ -147,7 +147,7 @@ evidence and reasoned analysis from your perspective.
         ]
         
         # Generate the counter-argument
-        counter_argument_response = self.llm.invoke(messages)
+        counter_argument_response = self._invoke_with_retry(messages)
         
         return {
             "agent_type": f"{self.domain}_counter",
@@ -202,7 +202,7 @@ As a {self.domain} expert, provide:
         ]
         
         # Generate the summary
-        summary_response = self.llm.invoke(messages)
+        summary_response = self._invoke_with_retry(messages)
         
         return {
             "agent_type": f"{self.domain}_summary",
@@ -365,7 +365,7 @@ Generate a comprehensive consensus report that:
         ]
 
         # Generate consensus report
-        response = self.llm.invoke(messages)
+        response = self._invoke_with_retry(messages)
 
         return response.content
 
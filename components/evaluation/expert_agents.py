@@ -363,7 +363,7 @@ Provide a detailed evaluation covering:
         ]
 
         # Get evaluation result
-        evaluation_response = self.llm.invoke(messages)
+        evaluation_response = self._invoke_with_retry(messages)
 
         # Process the response to extract scores
         scores = self._extract_scores(evaluation_response.content)
@@ -6,6 +6,7 @@ from typing import Dict, Any, List
 import logging
 from langchain_core.messages import SystemMessage, HumanMessage
 from components.agents.base_agent import Agent
+from components.utils.model_routing import llm_task
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -50,6 +51,7 @@ class ScoringAgent(Agent):
     def __init__(self):
         super().__init__(system_prompt=SCORING_AGENT_SYSTEM_PROMPT)
 
+    @llm_task
     def score_debate(
         self,
         prompt: str,
@@ -112,7 +114,7 @@ SCORE AND JUSTIFICATION:
             HumanMessage(content=human_message),
         ]
 
-        scoring_response = self.llm.invoke(messages)
+        scoring_response = self._invoke_with_retry(messages)
 
         print(scoring_response.content)
         # Extract score and justification
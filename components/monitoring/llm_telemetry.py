@@ -0,0 +1,414 @@
+"""
+Telemetry for LLM calls: latency, tokens, retries and estimated cost.
+
+Every model call made through ``Agent`` is recorded with the agent class,
+the workflow phase it ran in and the model tier it was routed to (see
+components/utils/model_routing.py). Records go to
+
+- the process-wide ``MetricsRegistry`` (``get_metrics_registry()``), which
+  keeps counters and a latency histogram per agent, phase, model and tier and
+  renders them in the Prometheus text format for ``/metrics``;
+- the active ``WorkflowTrace``, if any, so a workflow result can carry the
+  breakdown of its own calls and phases.
+
+Phases and traces are context variables, so they follow ``await``,
+``asyncio.gather`` and Starlette's threadpool without being passed around:
+
+    with workflow_trace("enhancement", standard_id="10") as trace:
+        with llm_phase("review"):
+            await reviewer_agent.analyze_standard(...)
+    result["telemetry"] = trace.to_dict()
+
+Cost is estimated from ``MODEL_PRICES`` (USD per million tokens);
+``LLM_INPUT_PRICE_PER_MTOK`` and ``LLM_OUTPUT_PRICE_PER_MTOK`` override the
+table for every model.
+"""
+
+import copy
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from components.retrieval.context_packer import estimate_tokens
+from components.utils.model_routing import current_task
+
+# (input, output) USD per million tokens, matched by model name prefix
+MODEL_PRICES = {
+    "gemini-2.5-flash": (0.15, 0.60),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+_INPUT_PRICE_OVERRIDE = os.environ.get("LLM_INPUT_PRICE_PER_MTOK")
+_OUTPUT_PRICE_OVERRIDE = os.environ.get("LLM_OUTPUT_PRICE_PER_MTOK")
+
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+DEFAULT_PHASE = "default"
+
+
+def model_name(llm: Any) -> str:
+    """Model id of a chat model or of a ``bind_tools`` binding."""
+    bound = getattr(llm, "bound", llm)
+    name = getattr(bound, "model", None) or getattr(bound, "model_name", None) or type(bound).__name__
+    return str(name).removeprefix("models/")
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = next(
+        (prices for prefix, prices in MODEL_PRICES.items() if model.startswith(prefix)),
+        (0.0, 0.0),
+    )
+    if _INPUT_PRICE_OVERRIDE is not None:
+        input_price = float(_INPUT_PRICE_OVERRIDE)
+    if _OUTPUT_PRICE_OVERRIDE is not None:
+        output_price = float(_OUTPUT_PRICE_OVERRIDE)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def _message_text(messages: Any) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "".join(str(getattr(message, "content", message)) for message in messages)
+
+
+@dataclass
+class LLMCallRecord:
+    """One logical LLM request (all of its retry attempts)."""
+    agent: str
+    phase: str
+    model: str
+    tier: str = "reasoning"
+    task: Optional[str] = None
+    outcome: str = "ok"  # ok | error | cache_hit
+    latency_seconds: float = 0.0
+    first_token_seconds: Optional[float] = None
+    attempts: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    cost_usd: float = 0.0
+    error: Optional[str] = None
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+
+class LLMCall:
+    """
+    An LLM request being timed; ``Agent`` opens one per request.
+
+    Count each attempt with ``attempt()`` (``note_attempt()`` does it for the
+    call active in the current context) and close it with ``finish(response)``;
+    ``track_llm_call`` closes it itself when the request fails.
+    """
+
+    def __init__(self, agent: str, llm: Any, messages: Any, tier: str = "reasoning"):
+        self.record = LLMCallRecord(
+            agent=agent, phase=current_phase(), model=model_name(llm), tier=tier, task=current_task()
+        )
+        self._messages = messages
+        self._started = time.perf_counter()
+        self._trace = _trace.get()
+
+    def attempt(self) -> None:
+        self.record.attempts += 1
+
+    def first_token(self) -> None:
+        if self.record.first_token_seconds is None:
+            self.record.first_token_seconds = time.perf_counter() - self._started
+
+    def finish(self, response: Any = None, error: Optional[BaseException] = None) -> LLMCallRecord:
+        record = self.record
+        record.latency_seconds = time.perf_counter() - self._started
+        if error is not None:
+            record.outcome = "error"
+            record.error = f"{type(error).__name__}: {error}"
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage:
+            record.prompt_tokens = usage.get("input_tokens", 0)
+            record.completion_tokens = usage.get("output_tokens", 0)
+        else:
+            # No usage reported (errors, some streams, fake models): estimate from text
+            record.tokens_estimated = True
+            record.prompt_tokens = estimate_tokens(_message_text(self._messages))
+            content = getattr(response, "content", "")
+            record.completion_tokens = estimate_tokens(content) if isinstance(content, str) else 0
+        record.cost_usd = estimate_cost(record.model, record.prompt_tokens, record.completion_tokens)
+        _publish(record, self._trace)
+        return record
+
+
+_phase: ContextVar[str] = ContextVar("llm_phase", default=DEFAULT_PHASE)
+_trace: ContextVar[Optional["WorkflowTrace"]] = ContextVar("llm_workflow_trace", default=None)
+_current_call: ContextVar[Optional[LLMCall]] = ContextVar("llm_current_call", default=None)
+
+
+def current_phase() -> str:
+    return _phase.get()
+
+
+@contextmanager
+def llm_phase(name: str):
+    """Tag LLM calls made in this block with workflow phase ``name`` and time the phase."""
+    token = _phase.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add_phase_time(name, time.perf_counter() - started)
+
+
+@contextmanager
+def track_llm_call(agent: str, llm: Any, messages: Any, tier: str = "reasoning"):
+    """Record the request made in this block; attempts are counted via ``note_attempt``."""
+    call = LLMCall(agent, llm, messages, tier)
+    token = _current_call.set(call)
+    try:
+        yield call
+    except BaseException as e:
+        call.finish(error=e)
+        raise
+    finally:
+        _current_call.reset(token)
+
+
+def note_attempt() -> None:
+    """Count one attempt (first try or retry) of the call being tracked."""
+    call = _current_call.get()
+    if call is not None:
+        call.attempt()
+
+
+def record_cache_hit(agent: str, llm: Any, tier: str = "reasoning") -> None:
+    record = LLMCallRecord(
+        agent=agent, phase=current_phase(), model=model_name(llm), tier=tier, task=current_task(), outcome="cache_hit"
+    )
+    _publish(record, _trace.get())
+
+
+class WorkflowTrace:
+    """LLM calls and phase timings of one workflow run."""
+
+    def __init__(self, name: str, parent: Optional["WorkflowTrace"] = None, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.started_at = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._ended: Optional[float] = None
+        self._lock = threading.Lock()
+        self.calls: List[LLMCallRecord] = []
+        self.phase_seconds: Dict[str, float] = {}
+
+    def add(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            self.calls.append(record)
+
+    def add_phase_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    def end(self) -> None:
+        self._ended = time.perf_counter()
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self._ended or time.perf_counter()) - self._started
+
+    @staticmethod
+    def _totals(records: List[LLMCallRecord]) -> Dict[str, Any]:
+        sent = [r for r in records if r.outcome != "cache_hit"]
+        return {
+            "llm_calls": len(sent),
+            "cache_hits": len(records) - len(sent),
+            "errors": sum(r.outcome == "error" for r in sent),
+            "retries": sum(r.retries for r in sent),
+            "llm_seconds": round(sum(r.latency_seconds for r in sent), 3),
+            "prompt_tokens": sum(r.prompt_tokens for r in sent),
+            "completion_tokens": sum(r.completion_tokens for r in sent),
+            "cost_usd": round(sum(r.cost_usd for r in sent), 6),
+        }
+
+    def to_dict(self, include_calls: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self.calls)
+            phase_seconds = dict(self.phase_seconds)
+        by_phase: Dict[str, List[LLMCallRecord]] = {}
+        by_agent: Dict[str, List[LLMCallRecord]] = {}
+        by_tier: Dict[str, List[LLMCallRecord]] = {}
+        for record in calls:
+            by_phase.setdefault(record.phase, []).append(record)
+            by_agent.setdefault(record.agent, []).append(record)
+            by_tier.setdefault(record.tier, []).append(record)
+
+        phases = {}
+        for phase in list(phase_seconds) + [p for p in by_phase if p not in phase_seconds]:
+            phases[phase] = {"wall_seconds": round(phase_seconds.get(phase, 0.0), 3), **self._totals(by_phase.get(phase, []))}
+
+        trace = {
+            "workflow": self.name,
+            **self.attributes,
+            "started_at": self.started_at,
+            "wall_seconds": round(self.wall_seconds, 3),
+            **self._totals(calls),
+            "phases": phases,
+            "agents": {agent: self._totals(records) for agent, records in by_agent.items()},
+            "tiers": {tier: self._totals(records) for tier, records in by_tier.items()},
+        }
+        if include_calls:
+            trace["calls"] = [{**asdict(record), "retries": record.retries} for record in calls]
+        return trace
+
+
+@contextmanager
+def workflow_trace(name: str, **attributes):
+    """Collect the LLM calls made in this block (including nested traces) into a ``WorkflowTrace``."""
+    trace = WorkflowTrace(name, parent=_trace.get(), **attributes)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+        trace.end()
+
+
+def current_trace() -> Optional[WorkflowTrace]:
+    return _trace.get()
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """In-process counters and latency histograms of LLM calls."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (agent, phase, model, tier) -> aggregated values
+        self._series: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+
+    def _new_series(self) -> Dict[str, Any]:
+        return {
+            "outcomes": {},
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0,
+            "latency_sum": 0.0,
+            "latency_count": 0,
+            "latency_buckets": [0] * len(self.buckets),
+        }
+
+    def record(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            series = self._series.setdefault((record.agent, record.phase, record.model, record.tier), self._new_series())
+            series["outcomes"][record.outcome] = series["outcomes"].get(record.outcome, 0) + 1
+            if record.outcome == "cache_hit":
+                return
+            series["retries"] += record.retries
+            series["prompt_tokens"] += record.prompt_tokens
+            series["completion_tokens"] += record.completion_tokens
+            series["cost_usd"] += record.cost_usd
+            series["latency_sum"] += record.latency_seconds
+            series["latency_count"] += 1
+            for i, bound in enumerate(self.buckets):
+                if record.latency_seconds <= bound:
+                    series["latency_buckets"][i] += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Current values, one dict per (agent, phase, model, tier)."""
+        with self._lock:
+            return [
+                {"agent": agent, "phase": phase, "model": model, "tier": tier, **copy.deepcopy(series)}
+                for (agent, phase, model, tier), series in self._series.items()
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        snapshot = self.snapshot()
+        keys = [dict(agent=s["agent"], phase=s["phase"], model=s["model"], tier=s["tier"]) for s in snapshot]
+
+        metric("llm_calls_total", "counter", "LLM requests by outcome (ok, error, cache_hit).",
+               [(_labels(**key, outcome=outcome), count) for key, s in zip(keys, snapshot) for outcome, count in s["outcomes"].items()])
+        metric("llm_retries_total", "counter", "Retried attempts of LLM requests.",
+               [(_labels(**key), s["retries"]) for key, s in zip(keys, snapshot)])
+        metric("llm_prompt_tokens_total", "counter", "Prompt tokens sent to the model.",
+               [(_labels(**key), s["prompt_tokens"]) for key, s in zip(keys, snapshot)])
+        metric("llm_completion_tokens_total", "counter", "Completion tokens returned by the model.",
+               [(_labels(**key), s["completion_tokens"]) for key, s in zip(keys, snapshot)])
+        metric("llm_cost_usd_total", "counter", "Estimated model cost in USD.",
+               [(_labels(**key), round(s["cost_usd"], 6)) for key, s in zip(keys, snapshot)])
+
+        histogram = []
+        for key, s in zip(keys, snapshot):
+            for bound, count in zip(self.buckets, s["latency_buckets"]):
+                histogram.append(("_bucket" + _labels(**key, le=bound), count))
+            histogram.append(("_bucket" + _labels(**key, le="+Inf"), s["latency_count"]))
+            histogram.append(("_sum" + _labels(**key), round(s["latency_sum"], 6)))
+            histogram.append(("_count" + _labels(**key), s["latency_count"]))
+        metric("llm_request_duration_seconds", "histogram", "Wall time of LLM requests including retries.", histogram)
+
+        # Process-wide LLM plumbing
+        from components.utils.rate_limiter import get_rate_limiter
+        from components.utils.single_flight import async_llm_calls, llm_calls
+        limiter = get_rate_limiter()
+        metric("llm_rate_limiter_wait_seconds_total", "counter", "Time callers waited for LLM quota.", [("", round(limiter.wait_seconds, 3))])
+        metric("llm_rate_limiter_waits_total", "counter", "Requests that had to wait for LLM quota.", [("", limiter.waits)])
+        metric("llm_coalesced_requests_total", "counter", "Requests that joined an identical in-flight request.",
+               [("", llm_calls.coalesced + async_llm_calls.coalesced)])
+        metric("llm_rate_limiter_shed_total", "counter", "Requests failed fast because the quota wait outlasted their deadline.",
+               [("", limiter.shed)])
+
+        from components.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, get_circuit_breaker
+        breaker = get_circuit_breaker()
+        metric("llm_circuit_state", "gauge", "LLM circuit breaker state (0 closed, 1 half-open, 2 open).",
+               [("", {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}[breaker.state])])
+        metric("llm_circuit_opened_total", "counter", "Times the LLM circuit breaker opened.", [("", breaker.opened)])
+        metric("llm_circuit_rejected_total", "counter", "Requests rejected while the LLM circuit was open.", [("", breaker.rejected)])
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """The process-wide LLM metrics registry, created on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def _publish(record: LLMCallRecord, trace: Optional[WorkflowTrace]) -> None:
+    get_metrics_registry().record(record)
+    while trace is not None:
+        trace.add(record)
+        trace = trace.parent
@@ -6,17 +6,19 @@ and managing the iterative refinement workflow.
 import asyncio
 import dataclasses
 import logging
+import os
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional
 
 # Assuming these paths are correct for your project structure
-from ..agents.base_agent import Agent # Base Agent class
+from ..agents.base_agent import Agent, LLM_UNAVAILABLE # Base Agent class
 from ..agents.reviewer_agent import reviewer_agent
 from ..agents.proposer_agent import proposer_agent # The structured-output version
 from ..agents.validator_agent import validator_agent
 from ..agents.cross_standard_analyzer import cross_standard_analyzer
 from ..agents.expert_agents import (
+    ExpertAgent,
     shariah_expert,
     finance_expert,
     standards_expert,
@@ -25,12 +27,19 @@ from ..agents.expert_agents import (
 )
 # Now importing the actual DiscussionMonitor
 from ..monitoring.discussion_monitor import DiscussionMonitor, ConsensusMetrics
+from ..monitoring.llm_telemetry import llm_phase, workflow_trace
+from ..utils.deadlines import deadline
+from .phase_graph import PhaseGraph
 # Assuming retriever is correctly set up and importable
 from retreiver import retriever
 
 
 logger = logging.getLogger(__name__)
 
+# Time budget of one enhancement run; once spent (or while the LLM circuit is
+# open) the run stops calling the model and returns what it has
+ENHANCEMENT_DEADLINE_SECONDS = float(os.environ.get("ENHANCEMENT_DEADLINE_SECONDS", "600"))
+
 @dataclass
 class EnhancementContext:
     """Context for a standards enhancement session."""
@@ -48,12 +57,19 @@ class EnhancementContext:
     discussion_history: List[Dict] = field(default_factory=list) # Raw contributions
     current_round: int = 0
     consensus_metrics_history: List[ConsensusMetrics] = field(default_factory=list) # Store metrics per round
+    skipped_phases: List[str] = field(default_factory=list) # Phases cut short by the deadline or an open LLM circuit
 
 class EnhancementOrchestrator:
-    def __init__(self, selected_experts_config: Optional[Dict[str, bool]] = None, max_discussion_rounds: int = 2):
+    def __init__(
+        self,
+        selected_experts_config: Optional[Dict[str, bool]] = None,
+        max_discussion_rounds: int = 2,
+        deadline_seconds: Optional[float] = None,
+    ):
         # Initialize DiscussionMonitor here
         self.discussion_monitor = DiscussionMonitor()
         self.max_rounds = max_discussion_rounds
+        self.deadline_seconds = ENHANCEMENT_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
 
         all_available_experts = {
             "shariah": shariah_expert,
@@ -91,7 +107,7 @@ class EnhancementOrchestrator:
 
     async def _get_full_standard_text(self, standard_id: str) -> str: # Kept for potential future use
         try:
-            nodes = retriever.retrieve(f"Complete text of AAOIFI FAS {standard_id}")
+            nodes = await retriever.aretrieve(f"Complete text of AAOIFI FAS {standard_id}")
             if nodes:
                 return "\n".join([node.text for node in nodes])
             logger.warning(f"No text found by retriever for full standard FAS {standard_id}.")
@@ -106,12 +122,32 @@ class EnhancementOrchestrator:
         trigger_scenario: str,
         progress_callback: Optional[Callable[[str, Optional[str]], None]] = None,
         include_cross_standard_analysis: bool = False
+    ) -> Dict[str, Any]:
+        # The trace breaks the run's LLM time, tokens and cost down by phase and agent;
+        # the deadline bounds every LLM call of the run, including retries
+        with workflow_trace("enhancement", standard_id=standard_id) as trace, deadline(self.deadline_seconds):
+            result = await self._run_enhancement_workflow(
+                standard_id, trigger_scenario, progress_callback, include_cross_standard_analysis
+            )
+        result["telemetry"] = trace.to_dict()
+        return result
+
+    async def _run_enhancement_workflow(
+        self,
+        standard_id: str,
+        trigger_scenario: str,
+        progress_callback: Optional[Callable[[str, Optional[str]], None]],
+        include_cross_standard_analysis: bool
     ) -> Dict[str, Any]:
         self._report_progress(progress_callback, "WorkflowStart", f"Starting enhancement for FAS {standard_id} on: {trigger_scenario}")
         context = EnhancementContext(standard_id=standard_id, trigger_scenario=trigger_scenario)
 
-        try:            # --- 1. Review Phase ---
-            self._report_progress(progress_callback, "ReviewPhase", "Starting initial standard review...")           
+        # Phases run as a dependency graph: validation and cross-standard analysis
+        # only need the final proposal, so they run concurrently
+        graph = PhaseGraph()
+
+        async def review():
+            self._report_progress(progress_callback, "ReviewPhase", "Starting initial standard review...")
             reviewer_input = {
                 "standard_id": standard_id, 
                 "trigger_scenario": trigger_scenario
@@ -123,7 +159,7 @@ class EnhancementOrchestrator:
                 logger.warning("Reviewer did not return retrieved_context.")
             self._report_progress(progress_callback, "ReviewPhaseComplete", "Initial review complete.")
 
-            # --- 2. Initial Proposal Generation Phase ---
+        async def proposal():
             self._report_progress(progress_callback, "ProposalPhase", "Generating initial enhancement proposal...")
             proposer_input = {
                 "standard_id": context.standard_id,
@@ -141,7 +177,7 @@ class EnhancementOrchestrator:
                 raise ValueError("Initial proposal generation failed.")
             self._report_progress(progress_callback, "ProposalPhaseComplete", "Initial proposal generated.")
 
-            # --- 3. Expert Discussion and Refinement Phase ---
+        async def discussion():
             if self.expert_agents and self.max_rounds > 0:
                 self._report_progress(progress_callback, "DiscussionPhase", "Starting expert discussion and refinement...")
                 await self._facilitate_expert_discussion_and_refinement(context, progress_callback)
@@ -149,13 +185,13 @@ class EnhancementOrchestrator:
             else:
                 self._report_progress(progress_callback, "DiscussionPhaseSkipped", "Skipping discussion (no experts or max_rounds is 0).")
 
-            # --- 4. Validation Phase ---
+        async def validation() -> str:
             self._report_progress(progress_callback, "ValidationPhase", "Validating final proposal...")
             final_proposal_for_validation = self._compile_final_output(context, "validation_input")
             validation_text = "Validation not performed."
             try:
-                # Assuming validator_agent.validate_proposal is synchronous. If async, use await.
-                validation_result_raw = validator_agent.validate_proposal(final_proposal_for_validation)
+                # validate_proposal is synchronous; a worker thread keeps the loop free for the concurrent phase
+                validation_result_raw = await asyncio.to_thread(validator_agent.validate_proposal, final_proposal_for_validation)
                 if isinstance(validation_result_raw, dict):
                     validation_text = validation_result_raw.get("validation_summary", str(validation_result_raw))
                 elif isinstance(validation_result_raw, str):
@@ -166,35 +202,76 @@ class EnhancementOrchestrator:
             except Exception as e:
                 logger.error(f"Error during validation phase: {e}")
                 validation_text = f"Validation failed due to an error: {str(e)}"
+                if isinstance(e, LLM_UNAVAILABLE):
+                    context.skipped_phases.append("validation")
             self._report_progress(progress_callback, "ValidationPhaseComplete", "Validation complete.")
+            return validation_text
+
+        async def cross_standard_analysis() -> str:
+            self._report_progress(progress_callback, "CrossStandardAnalysisPhase", "Performing cross-standard impact analysis...")
+            try:
+                impact_analysis_input = {
+                    "standard_id": context.standard_id,
+                    "proposed_changes_summary": context.current_proposal_structured_text,
+                    "trigger_scenario": context.trigger_scenario
+                }
+                cross_analysis_result_raw = await asyncio.to_thread(
+                    cross_standard_analyzer.analyze_cross_standard_impact, impact_analysis_input
+                )
+                cross_analysis_text = cross_analysis_result_raw.get("cross_standard_analysis", str(cross_analysis_result_raw))
+            except Exception as e:
+                logger.error(f"Error during cross-standard analysis: {e}")
+                cross_analysis_text = f"Cross-standard analysis failed: {str(e)}"
+                if isinstance(e, LLM_UNAVAILABLE):
+                    context.skipped_phases.append("cross_standard_analysis")
+            self._report_progress(progress_callback, "CrossStandardAnalysisPhaseComplete", "Cross-standard analysis complete.")
+            return cross_analysis_text
+
+        graph.add("review", review)
+        graph.add("proposal", proposal, after=["review"])
+        graph.add("discussion", discussion, after=["proposal"])
+        graph.add("validation", validation, after=["discussion"])
+        if include_cross_standard_analysis:
+            graph.add("cross_standard_analysis", cross_standard_analysis, after=["discussion"])
+
+        try:
+            phase_results = await graph.run()
 
-            # --- 5. Cross-Standard Analysis Phase (Optional) ---
-            cross_analysis_text = None
-            if include_cross_standard_analysis:
-                self._report_progress(progress_callback, "CrossStandardAnalysisPhase", "Performing cross-standard impact analysis...")
-                try:
-                    impact_analysis_input = {
-                        "standard_id": context.standard_id,
-                        "proposed_changes_summary": context.current_proposal_structured_text,
-                        "trigger_scenario": context.trigger_scenario
-                    }
-                    # Assuming cross_standard_analyzer.analyze_cross_standard_impact is synchronous. If async, use await.
-                    cross_analysis_result_raw = cross_standard_analyzer.analyze_cross_standard_impact(impact_analysis_input)
-                    cross_analysis_text = cross_analysis_result_raw.get("cross_standard_analysis", str(cross_analysis_result_raw))
-                except Exception as e:
-                    logger.error(f"Error during cross-standard analysis: {e}")
-                    cross_analysis_text = f"Cross-standard analysis failed: {str(e)}"
-                self._report_progress(progress_callback, "CrossStandardAnalysisPhaseComplete", "Cross-standard analysis complete.")
-            
             self._report_progress(progress_callback, "WorkflowComplete", "Enhancement workflow finished successfully.")
-            return self._compile_final_output(context, "final_workflow_output", validation_text, cross_analysis_text)
+            result = self._compile_final_output(
+                context, "final_workflow_output",
+                phase_results["validation"], phase_results.get("cross_standard_analysis")
+            )
+            result["phase_timings"] = graph.to_dict()
+            return result
+
+        except LLM_UNAVAILABLE as e:
+            # Fail fast: no more model calls, but keep the proposal we already have
+            logger.warning(f"Enhancement workflow for FAS {standard_id} cut short: {e}")
+            if not context.current_proposal_structured_text:
+                self._report_progress(progress_callback, "WorkflowError", f"Workflow failed: {str(e)}")
+                return {
+                    "error": str(e), "standard_id": standard_id, "trigger_scenario": trigger_scenario,
+                    "status": "failed", "current_phase_context_snapshot": dataclasses.asdict(context),
+                    "phase_timings": graph.to_dict()
+                }
+            context.skipped_phases.extend(["validation"] + (["cross_standard_analysis"] if include_cross_standard_analysis else []))
+            self._report_progress(progress_callback, "WorkflowPartial", f"Returning partial results: {str(e)}")
+            result = self._compile_final_output(
+                context, "final_workflow_output", f"Validation not performed: {str(e)}",
+                "Cross-standard analysis not performed." if include_cross_standard_analysis else None
+            )
+            result["error"] = str(e)
+            result["phase_timings"] = graph.to_dict()
+            return result
 
         except Exception as e:
             logger.error(f"Critical error in enhancement workflow for FAS {standard_id}: {e}", exc_info=True)
             self._report_progress(progress_callback, "WorkflowError", f"Workflow failed: {str(e)}")
             return {
                 "error": str(e), "standard_id": standard_id, "trigger_scenario": trigger_scenario,
-                "status": "failed", "current_phase_context_snapshot": dataclasses.asdict(context) if context else None
+                "status": "failed", "current_phase_context_snapshot": dataclasses.asdict(context) if context else None,
+                "phase_timings": graph.to_dict()
             }
 
     async def _facilitate_expert_discussion_and_refinement(
@@ -269,13 +346,17 @@ class EnhancementOrchestrator:
                     }
                 }
                 try:
-                    refined_proposal_result = await proposer_agent.generate_enhancement_proposal(refinement_input)
+                    with llm_phase("refinement"):
+                        refined_proposal_result = await proposer_agent.generate_enhancement_proposal(refinement_input)
                     refined_text = refined_proposal_result.get("enhancement_proposal_structured")
                     if refined_text and refined_text.strip() and refined_text != context.current_proposal_structured_text:
                         context.current_proposal_structured_text = refined_text
                         self._report_progress(progress_callback, f"ProposalRefinementSuccess_R{context.current_round}", "Proposal refined.")
                     else:
                         self._report_progress(progress_callback, f"ProposalRefinementNoChange_R{context.current_round}", "Proposal not significantly changed by refinement.")
+                except LLM_UNAVAILABLE:
+                    context.skipped_phases.append(f"refinement_round_{context.current_round}")
+                    raise
                 except Exception as e:
                     logger.error(f"Error during proposal refinement in round {context.current_round}: {e}")
                     self._report_progress(progress_callback, f"ProposalRefinementError_R{context.current_round}", f"Refinement error: {str(e)}")
@@ -284,12 +365,46 @@ class EnhancementOrchestrator:
                  self._report_progress(progress_callback, "DiscussionMaxRounds", "Maximum discussion rounds reached.")
 
 
+    async def _batch_expert_searches(self, context: EnhancementContext) -> Dict[str, Dict[str, Any]]:
+        """Run the standards search of every expert in one batched retrieval."""
+        expert_input = {
+            "proposal": context.current_proposal_structured_text,
+            "previous_discussion": context.discussion_history
+        }
+        searches = {}
+        queries = {}
+        for expert_name, expert_instance in self.expert_agents.items():
+            if not hasattr(expert_instance, "build_search_query"):
+                continue
+            keywords, query = expert_instance.build_search_query(expert_input)
+            searches[expert_name] = {"keywords_used_for_search": keywords, "retrieved_docs": []}
+            if query:
+                queries[expert_name] = query
+
+        if queries:
+            try:
+                results = await retriever.aretrieve_many(list(queries.values()), mode=ExpertAgent.RETRIEVAL_MODE)
+            except Exception as e:
+                # Experts fall back to searching individually
+                logger.error(f"Batched expert retrieval failed: {e}")
+                return {}
+            for expert_name, nodes in zip(queries.keys(), results):
+                searches[expert_name]["retrieved_docs"] = self.expert_agents[expert_name]._nodes_to_docs(nodes)
+        return searches
+
     async def _collect_expert_contributions(self, context: EnhancementContext) -> List[Dict]:
+        expert_searches = await self._batch_expert_searches(context)
         tasks = []
         for expert_name, expert_instance in self.expert_agents.items():
-            tasks.append(self._get_single_expert_contribution(expert_name, expert_instance, context))
+            tasks.append(self._get_single_expert_contribution(
+                expert_name, expert_instance, context, expert_searches.get(expert_name)
+            ))
         
         contributions_results = await asyncio.gather(*tasks, return_exceptions=True)
+        if contributions_results and all(isinstance(r, LLM_UNAVAILABLE) for r in contributions_results):
+            # No expert could reach the model; further rounds would fail the same way
+            context.skipped_phases.append(f"discussion_round_{context.current_round}")
+            raise contributions_results[0]
         
         processed_contributions = []
         for i, result in enumerate(contributions_results):
@@ -314,12 +429,20 @@ class EnhancementOrchestrator:
                 })
         return processed_contributions
 
-    async def _get_single_expert_contribution(self, expert_name: str, expert: Agent, context: EnhancementContext) -> Dict:
+    async def _get_single_expert_contribution(
+        self,
+        expert_name: str,
+        expert: Agent,
+        context: EnhancementContext,
+        search: Optional[Dict[str, Any]] = None
+    ) -> Dict:
         logger.info(f"Requesting contribution from {expert_name} for round {context.current_round}...")
         expert_input = {
             "proposal": context.current_proposal_structured_text,
             "previous_discussion": context.discussion_history
         }
+        if search:
+            expert_input.update(search) # Pre-fetched by _batch_expert_searches
         contribution_content = await expert.analyze_proposal(expert_input) # This is async
         return {
             "type": "discussion_contribution", # Changed from "discussion" for clarity
@@ -381,7 +504,8 @@ class EnhancementOrchestrator:
         if output_type == "final_workflow_output":
             final_data["validation_summary"] = validation_summary
             final_data["cross_standard_analysis_summary"] = cross_analysis_summary
-            final_data["status"] = "completed"
+            final_data["status"] = "partial" if context.skipped_phases else "completed"
+            final_data["skipped_phases"] = context.skipped_phases
             return final_data
         
         if output_type == "validation_input":
@@ -0,0 +1,110 @@
+"""
+Workflow phases as a dependency graph.
+
+A phase starts as soon as every phase it depends on has finished, so phases
+that only share an upstream dependency run concurrently instead of one after
+the other. In the enhancement workflow, validation and cross-standard
+analysis both need only the final proposal:
+
+    review -> proposal -> discussion -> validation
+                                     -> cross_standard_analysis
+
+Each phase runs inside ``llm_phase(name)``, so its LLM calls are attributed to
+it in the telemetry, and the graph records when each phase started relative
+to the run and how long it took. ``to_dict()`` reports those timings with the
+sum of the phase times, which is what the run would have taken sequentially.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from ..monitoring.llm_telemetry import llm_phase
+
+
+@dataclass
+class PhaseTiming:
+    """When a phase ran, relative to the start of the graph."""
+    status: str  # completed | failed | skipped
+    started_at_seconds: float = 0.0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class PhaseSkipped(Exception):
+    """A phase did not run because a phase it depends on failed."""
+
+
+class PhaseGraph:
+    """Phases and their dependencies; ``run()`` executes them with maximal overlap."""
+
+    def __init__(self):
+        self._phases: Dict[str, Tuple[Callable[[], Awaitable[Any]], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, PhaseTiming] = {}
+        self.wall_seconds = 0.0
+
+    def add(self, name: str, run: Callable[[], Awaitable[Any]], after: Sequence[str] = ()) -> None:
+        """
+        Add phase ``name``, run as ``await run()`` once the phases in ``after`` are done.
+
+        Dependencies must already be in the graph, which keeps it acyclic.
+        """
+        if name in self._phases:
+            raise ValueError(f"Phase {name!r} is already in the graph")
+        missing = [dependency for dependency in after if dependency not in self._phases]
+        if missing:
+            raise ValueError(f"Phase {name!r} depends on unknown phases {missing}")
+        self._phases[name] = (run, tuple(after))
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run every phase and return their results by name.
+
+        A failed phase does not stop independent phases; the phases that
+        depend on it are skipped, and once everything has settled the first
+        failure (in the order phases were added) is raised.
+        """
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_phase(name: str) -> Any:
+            run, after = self._phases[name]
+            outcomes = await asyncio.gather(*(tasks[dependency] for dependency in after), return_exceptions=True)
+            failed = [dependency for dependency, outcome in zip(after, outcomes) if isinstance(outcome, BaseException)]
+            if failed:
+                self.timings[name] = PhaseTiming(status="skipped", error=f"Depends on failed phase(s) {failed}")
+                raise PhaseSkipped(name)
+
+            timing = self.timings[name] = PhaseTiming(status="completed", started_at_seconds=time.perf_counter() - started)
+            try:
+                with llm_phase(name):
+                    return await run()
+            except Exception as e:
+                timing.status = "failed"
+                timing.error = str(e)
+                raise
+            finally:
+                timing.seconds = time.perf_counter() - started - timing.started_at_seconds
+
+        # Phases are added after their dependencies, so every awaited task exists
+        for name in self._phases:
+            tasks[name] = asyncio.ensure_future(run_phase(name))
+        outcomes = dict(zip(tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)))
+        self.wall_seconds = time.perf_counter() - started
+
+        for outcome in outcomes.values():
+            if isinstance(outcome, BaseException) and not isinstance(outcome, PhaseSkipped):
+                raise outcome
+        return outcomes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Per-phase timings, the run's wall time and the time the phases would take back to back."""
+        return {
+            "wall_seconds": round(self.wall_seconds, 3),
+            "sequential_seconds": round(sum(timing.seconds for timing in self.timings.values()), 3),
+            "phases": {
+                name: {key: round(value, 3) if isinstance(value, float) else value for key, value in asdict(timing).items()}
+                for name, timing in self.timings.items()
+            },
+        }
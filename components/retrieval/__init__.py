@@ -0,0 +1,6 @@
+"""
+Retrieval layer for the AAOIFI standards corpus.
+
+The agents only ever see the ``retriever`` object exported by ``retreiver.py``;
+this package holds the on-disk index and the retriever implementation behind it.
+"""
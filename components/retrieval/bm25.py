@@ -0,0 +1,221 @@
+"""
+Sparse lexical (BM25) index over the docstore nodes.
+
+Islamic-finance terms ("Istisna'a", "Ijarah Muntahia Bittamleek") and clause
+numbers ("3/1/1") match far better lexically than through embeddings, and a
+BM25 lookup needs no model at all. The inverted index is precomputed at build
+time in CSR form with the full BM25 weight of every posting, so a query is a
+handful of array additions.
+
+The index is self-contained (it carries its own node ids and standard
+partitions), so it can be built and queried on hosts that never load the
+embedding model.
+
+File layout (bm25.npz):
+    vocab       - sorted term list
+    offsets     - postings of term i are rows[offsets[i]:offsets[i + 1]]
+    rows        - int32 row ids
+    weights     - float32 BM25 weight of the term in that row
+    idf         - float32 idf per term (kept for inspection)
+    node_ids    - docstore node id per row
+    partitions  - JSON map of partition key -> [start row, end row)
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from components.retrieval.vector_index import partition_order
+
+logger = logging.getLogger(__name__)
+
+BM25_FILE = "bm25.npz"
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+_APOSTROPHES = re.compile(r"['‘’ʼ`]")
+# Clause references such as 3/1/1 or 2.4 are kept as a single token
+_TOKEN = re.compile(r"\d+(?:[/.]\d+)+|[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which will with "
+    "shall should may any such been".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, fold apostrophes ("Istisna'a" -> "istisnaa") and drop stopwords."""
+    text = _APOSTROPHES.sub("", text.lower())
+    return [token for token in _TOKEN.findall(text) if token not in _STOPWORDS]
+
+
+class BM25Index:
+    """Precomputed BM25 inverted index."""
+
+    def __init__(
+        self,
+        vocab: List[str],
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        weights: np.ndarray,
+        node_ids: List[str],
+        partitions: Optional[Dict[str, List[int]]] = None,
+    ):
+        self.term_ids = {term: i for i, term in enumerate(vocab)}
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+        self.node_ids = node_ids
+        self.partitions = partitions or {}
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        node_ids: Sequence[str],
+        texts: Sequence[str],
+        partition_keys: Optional[Sequence[Optional[str]]] = None,
+    ) -> "BM25Index":
+        """
+        Build the index and write it to ``path``.
+
+        Args:
+            path: Directory to write the index into
+            node_ids: Docstore node id per text
+            texts: Text of every node
+            partition_keys: Optional partition key per node (see VectorIndex.build)
+
+        Returns:
+            The built BM25Index
+        """
+        node_ids = list(node_ids)
+        texts = list(texts)
+        partitions = None
+        if partition_keys is not None:
+            order, partitions = partition_order(partition_keys)
+            node_ids = [node_ids[row] for row in order]
+            texts = [texts[row] for row in order]
+
+        docs = [Counter(tokenize(text)) for text in texts]
+        doc_lengths = np.array([sum(doc.values()) for doc in docs], dtype=np.float32)
+        avg_length = float(doc_lengths.mean()) if len(docs) else 0.0
+
+        postings = {}
+        for row, doc in enumerate(docs):
+            for term, tf in doc.items():
+                postings.setdefault(term, []).append((row, tf))
+
+        vocab = sorted(postings)
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        rows, weights, idf = [], [], np.zeros(len(vocab), dtype=np.float32)
+        for i, term in enumerate(vocab):
+            term_postings = postings[term]
+            df = len(term_postings)
+            idf[i] = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            for row, tf in term_postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[row] / (avg_length or 1.0))
+                rows.append(row)
+                weights.append(idf[i] * tf * (BM25_K1 + 1) / (tf + norm))
+            offsets[i + 1] = len(rows)
+
+        rows = np.array(rows, dtype=np.int32)
+        weights = np.array(weights, dtype=np.float32)
+        os.makedirs(path, exist_ok=True)
+        # np.savez appends .npz to names without it, so the temp name keeps the suffix
+        tmp_path = os.path.join(path, f"tmp_{BM25_FILE}")
+        np.savez(
+            tmp_path,
+            vocab=np.array(vocab, dtype=str),
+            offsets=offsets,
+            rows=rows,
+            weights=weights,
+            idf=idf,
+            node_ids=np.array(node_ids, dtype=str),
+            partitions=np.array(json.dumps(partitions or {})),
+        )
+        os.replace(tmp_path, os.path.join(path, BM25_FILE))
+        logger.info(f"Built BM25 index at {path}: {len(docs)} nodes, {len(vocab)} terms")
+        return cls(vocab, offsets, rows, weights, node_ids, partitions)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, BM25_FILE))
+
+    @classmethod
+    def open(cls, path: str) -> "BM25Index":
+        with np.load(os.path.join(path, BM25_FILE)) as data:
+            return cls(
+                data["vocab"].tolist(),
+                data["offsets"],
+                data["rows"],
+                data["weights"],
+                data["node_ids"].tolist(),
+                json.loads(str(data["partitions"])),
+            )
+
+    def search(
+        self, query: str, top_k: int, partitions: Optional[Sequence[str]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Score rows against a query.
+
+        Args:
+            query: Query text
+            top_k: Number of rows to return
+            partitions: Restrict results to these partitions
+
+        Returns:
+            List of (row, BM25 score) sorted by descending score; rows with no
+            matching term are not returned
+        """
+        scores = np.zeros(len(self.node_ids), dtype=np.float32)
+        for term in tokenize(query):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            scores[self.rows[start:end]] += self.weights[start:end]
+
+        if partitions is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            for key in partitions:
+                if key in self.partitions:
+                    start, end = self.partitions[key]
+                    mask[start:end] = True
+            scores[~mask] = 0.0
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        ranked = matched[np.argsort(-scores[matched])]
+        return [(int(row), float(scores[row])) for row in ranked]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[List[Tuple[str, float]]], top_k: int, k: int = RRF_K
+) -> List[Tuple[str, float]]:
+    """
+    Fuse several ranked lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: Ranked (node_id, score) lists; only the order is used
+        top_k: Number of results to return
+        k: RRF damping constant
+
+    Returns:
+        List of (node_id, fused score) sorted by descending fused score
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (node_id, _) in enumerate(ranking):
+            fused[node_id] = fused.get(node_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
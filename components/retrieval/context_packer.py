@@ -0,0 +1,132 @@
+"""
+Token-budgeted assembly of retrieved chunks into prompt context.
+
+Agents used to paste every retrieved chunk into their prompts. The standards
+PDFs are chunked per page with overlap, so neighbouring hits often repeat the
+same paragraphs, and some pages are empty. ``pack_context`` keeps the
+highest-scoring chunks, drops exact and near duplicates, and stops at a token
+budget.
+"""
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English prose; good enough for budgeting
+CHARS_PER_TOKEN = 4
+# Share of a chunk's shingles that must already be in a kept chunk for it to count as a duplicate
+NEAR_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _shingles(text: str) -> Set[int]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {hash(" ".join(words))} if words else set()
+    return {hash(" ".join(words[i:i + SHINGLE_SIZE])) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+@dataclass
+class PackedContext:
+    """Result of packing retrieved chunks into a budget."""
+    text: str
+    nodes: List[Any] = field(default_factory=list)
+    tokens: int = 0
+    input_tokens: int = 0
+    duplicates_dropped: int = 0
+    over_budget_dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.input_tokens - self.tokens
+
+
+def pack_context(
+    nodes: Sequence[Any],
+    token_budget: int,
+    separator: str = "\n\n",
+    near_duplicate_threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    label: str = "context",
+) -> PackedContext:
+    """
+    Pack retrieved nodes into a prompt context within a token budget.
+
+    Chunks are taken in descending score order. A chunk is skipped if it is
+    empty, has the same node id or text as a kept chunk, or if most of its
+    word shingles already appear in one kept chunk (overlapping page chunks).
+    Chunks that would overflow the budget are skipped; smaller lower-ranked
+    chunks may still fill the remaining space.
+
+    Args:
+        nodes: Retrieved nodes (NodeWithScore or anything with ``text``;
+            ``score`` and ``node_id`` are used when present)
+        token_budget: Maximum estimated tokens of the packed text
+        separator: String placed between chunks
+        near_duplicate_threshold: Shingle overlap above which a chunk is a duplicate
+        label: Name used in the log line (usually the agent)
+
+    Returns:
+        PackedContext with the joined text and packing statistics
+    """
+    ranked = sorted(nodes, key=lambda node: getattr(node, "score", None) or 0.0, reverse=True)
+    input_tokens = estimate_tokens(separator.join(node.text for node in nodes))
+
+    kept, kept_shingles = [], []
+    seen_ids, seen_texts = set(), set()
+    tokens = duplicates = over_budget = 0
+    separator_tokens = estimate_tokens(separator)
+
+    for node in ranked:
+        text = (node.text or "").strip()
+        if not text:
+            duplicates += 1
+            continue
+        node_id = getattr(node, "node_id", None)
+        text_hash = hashlib.sha1(" ".join(text.split()).encode("utf-8")).digest()
+        if (node_id is not None and node_id in seen_ids) or text_hash in seen_texts:
+            duplicates += 1
+            continue
+        shingles = _shingles(text)
+        if shingles and any(
+            len(shingles & other) / len(shingles) >= near_duplicate_threshold for other in kept_shingles
+        ):
+            duplicates += 1
+            continue
+
+        cost = estimate_tokens(text) + (separator_tokens if kept else 0)
+        if tokens + cost > token_budget:
+            over_budget += 1
+            continue
+
+        kept.append(node)
+        kept_shingles.append(shingles)
+        seen_ids.add(node_id)
+        seen_texts.add(text_hash)
+        tokens += cost
+
+    packed_text = separator.join(node.text.strip() for node in kept)
+    packed = PackedContext(
+        text=packed_text,
+        nodes=kept,
+        tokens=estimate_tokens(packed_text),
+        input_tokens=input_tokens,
+        duplicates_dropped=duplicates,
+        over_budget_dropped=over_budget,
+    )
+    logger.info(
+        f"[{label}] Packed {len(kept)}/{len(nodes)} chunks into ~{packed.tokens} tokens "
+        f"(budget {token_budget}, {duplicates} duplicate/empty, {over_budget} over budget, "
+        f"~{packed.tokens_saved} tokens saved)"
+    )
+    return packed
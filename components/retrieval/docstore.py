@@ -0,0 +1,230 @@
+"""
+Compact SQLite docstore with on-demand node loading.
+
+llama_index's ``docstore.json`` has to be parsed in full before the first
+query, and every node (text plus relationship metadata) stays in memory
+afterwards. ``CompactDocStore`` keeps the same nodes in one SQLite table keyed
+by node id, zlib-compressed: opening it reads nothing but the header, and a
+query only pages in and inflates the rows it returns.
+
+The store is derived from the llama_index persist directory and rebuilt
+automatically when ``docstore.json`` changes. It can also be converted by hand:
+
+    python -m components.retrieval.docstore ./vector_db_storage/
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from llama_index.core.schema import BaseNode
+from llama_index.core.storage.docstore.utils import json_to_doc
+
+from components.retrieval.standards import standard_id_from_metadata
+
+logger = logging.getLogger(__name__)
+
+LLAMA_DOCSTORE_FILE = "docstore.json"
+# Derived files live in the persist directory's index subdirectory, which the
+# result-cache fingerprint skips
+DERIVED_DIRNAME = "ann"
+DOCSTORE_FILE = "docstore.sqlite"
+FORMAT_VERSION = "1"
+COMPRESSION_LEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    row INTEGER PRIMARY KEY,
+    node_id TEXT NOT NULL UNIQUE,
+    standard_id TEXT,
+    node_json BLOB NOT NULL,
+    text BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def default_docstore_path(persist_dir: str) -> str:
+    return os.path.join(persist_dir, DERIVED_DIRNAME, DOCSTORE_FILE)
+
+
+def _compress(value: str) -> bytes:
+    return zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def _decompress(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _source_signature(path: str) -> str:
+    """Cheap change marker for the source docstore.json (size and mtime)."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def convert_llama_docstore(persist_dir: str, out_path: str) -> "CompactDocStore":
+    """
+    Convert a llama_index persist directory's docstore.json into a CompactDocStore.
+
+    Args:
+        persist_dir: llama_index persist directory containing docstore.json
+        out_path: Path of the SQLite file to write (replaced atomically)
+
+    Returns:
+        The opened CompactDocStore
+    """
+    start_time = time.time()
+    source = os.path.join(persist_dir, LLAMA_DOCSTORE_FILE)
+    with open(source) as f:
+        data = json.load(f)
+    docs = data.get("docstore/data", {})
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        rows = []
+        for node_id, doc_dict in docs.items():
+            node_data = dict(doc_dict["__data__"])
+            text = node_data.pop("text", "") or ""
+            rows.append((
+                node_id,
+                standard_id_from_metadata(node_data.get("metadata") or {}),
+                _compress(json.dumps({"__data__": node_data, "__type__": doc_dict["__type__"]}, separators=(",", ":"))),
+                _compress(text),
+            ))
+        conn.executemany("INSERT INTO nodes (node_id, standard_id, node_json, text) VALUES (?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [("format_version", FORMAT_VERSION), ("source_signature", _source_signature(source)), ("count", str(len(rows)))],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, out_path)
+
+    logger.info(
+        f"Converted {source} ({os.path.getsize(source) / 1e6:.1f} MB) to {out_path} "
+        f"({os.path.getsize(out_path) / 1e6:.1f} MB), {len(docs)} nodes in {time.time() - start_time:.2f}s"
+    )
+    return CompactDocStore(out_path)
+
+
+class CompactDocStore:
+    """
+    Read-only node store backed by SQLite.
+
+    Provides the subset of llama_index's docstore API the retriever uses
+    (``get_nodes`` / ``get_node``) plus batched iteration for index builds.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str, path: Optional[str] = None) -> "CompactDocStore":
+        """
+        Open the compact store for a persist directory, converting docstore.json
+        first if the store is missing or out of date.
+
+        Args:
+            persist_dir: llama_index persist directory
+            path: Location of the SQLite file (defaults to <persist_dir>/ann/docstore.sqlite)
+        """
+        path = path or default_docstore_path(persist_dir)
+        source = os.path.join(persist_dir, LLAMA_DOCSTORE_FILE)
+        if os.path.exists(path):
+            store = cls(path)
+            if not os.path.exists(source) or store.source_signature == _source_signature(source):
+                return store
+            store.close()
+            logger.info("docstore.json changed; rebuilding the compact docstore")
+        return convert_llama_docstore(persist_dir, path)
+
+    @property
+    def source_signature(self) -> Optional[str]:
+        return self._meta.get("source_signature")
+
+    def __len__(self) -> int:
+        return int(self._meta["count"])
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_node(node_json: bytes, text: bytes) -> BaseNode:
+        doc_dict = json.loads(_decompress(node_json))
+        doc_dict["__data__"]["text"] = _decompress(text)
+        return json_to_doc(doc_dict)
+
+    def get_nodes(self, node_ids: List[str]) -> List[BaseNode]:
+        """Nodes for ``node_ids`` in the given order; raises ValueError for unknown ids."""
+        if not node_ids:
+            return []
+        by_id: Dict[str, BaseNode] = {}
+        unique_ids = list(dict.fromkeys(node_ids))
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(unique_ids), 500):
+            batch = unique_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for node_id, node_json, text in self._query(
+                f"SELECT node_id, node_json, text FROM nodes WHERE node_id IN ({placeholders})", batch
+            ):
+                by_id[node_id] = self._to_node(node_json, text)
+        missing = [node_id for node_id in unique_ids if node_id not in by_id]
+        if missing:
+            raise ValueError(f"Nodes not found in docstore: {missing[:5]}")
+        return [by_id[node_id] for node_id in node_ids]
+
+    def get_node(self, node_id: str) -> BaseNode:
+        return self.get_nodes([node_id])[0]
+
+    def node_ids(self) -> List[str]:
+        return [row[0] for row in self._query("SELECT node_id FROM nodes ORDER BY row")]
+
+    def iter_nodes(self, batch_size: int = 256) -> Iterator[BaseNode]:
+        """Yield every node in storage order, loading ``batch_size`` rows at a time."""
+        last_row = 0
+        while True:
+            rows = self._query(
+                "SELECT row, node_json, text FROM nodes WHERE row > ? ORDER BY row LIMIT ?", (last_row, batch_size)
+            )
+            if not rows:
+                return
+            for row, node_json, text in rows:
+                yield self._to_node(node_json, text)
+            last_row = rows[-1][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a llama_index docstore.json into the compact SQLite docstore")
+    parser.add_argument("persist_dir", nargs="?", default="./vector_db_storage/", help="llama_index persist directory")
+    parser.add_argument("--output", help=f"Output file (default: <persist_dir>/{DERIVED_DIRNAME}/{DOCSTORE_FILE})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    convert_llama_docstore(args.persist_dir, args.output or default_docstore_path(args.persist_dir))
+
+
+if __name__ == "__main__":
+    main()
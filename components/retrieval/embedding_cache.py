@@ -0,0 +1,109 @@
+"""
+Two-tier cache for query embeddings.
+
+Retrieval queries are heavily templated ("FAS 10 standard full details", ...)
+and encoding them with bge-large is the dominant CPU cost of a retrieval.
+Embeddings are cached in an in-process LRU, backed by a SQLite store so they
+survive across runs. Keys combine the model name with the normalized query
+text, so switching models never serves stale vectors.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from components.utils.sqlite_cache import SqliteCache, default_cache_path
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CAPACITY = int(os.environ.get("EMBEDDING_CACHE_SIZE", "1024"))
+DISK_MAX_ENTRIES = 50000
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different spellings share an entry."""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """In-process LRU in front of a persistent embedding store."""
+
+    def __init__(
+        self,
+        model_name: str,
+        path: Optional[str] = None,
+        capacity: int = MEMORY_CAPACITY,
+        persistent: bool = True,
+    ):
+        self.model_name = model_name
+        self.capacity = capacity
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = (
+            SqliteCache(path or default_cache_path("query_embeddings.sqlite"), table="embeddings", max_entries=DISK_MAX_ENTRIES)
+            if persistent else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = self._key(text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        if self._disk is not None:
+            blob = self._disk.get(key)
+            if blob is not None:
+                embedding = np.frombuffer(blob, dtype=np.float32).tolist()
+                self._remember(key, embedding)
+                with self._lock:
+                    self.hits += 1
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        key = self._key(text)
+        self._remember(key, embedding)
+        if self._disk is not None:
+            self._disk.set(key, np.asarray(embedding, dtype=np.float32).tobytes())
+
+    def get_or_embed(self, text: str, embed_fn: Callable[[str], List[float]]) -> List[float]:
+        """Return the cached embedding for ``text``, computing it with ``embed_fn`` on a miss."""
+        embedding = self.get(text)
+        if embedding is None:
+            embedding = embed_fn(text)
+            self.put(text, embedding)
+        return embedding
+
+    def get_or_embed_many(
+        self, texts: List[str], embed_many_fn: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """Batched ``get_or_embed``: all misses are encoded in one ``embed_many_fn`` call."""
+        embeddings = [self.get(text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for i, embedding in zip(missing, embed_many_fn([texts[i] for i in missing])):
+                self.put(texts[i], embedding)
+                embeddings[i] = embedding
+        return embeddings
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._memory[key] = embedding
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
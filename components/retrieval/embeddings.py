@@ -0,0 +1,134 @@
+"""
+Embedding model backends for retrieval.
+
+The model and the inference backend are chosen by configuration:
+
+    EMBED_MODEL_NAME  - HuggingFace model id or preset: bge-large (default),
+                        bge-base, bge-small
+    EMBED_BACKEND     - torch (default, eager PyTorch via sentence-transformers)
+                        onnx        (ONNX Runtime, needs optimum[onnxruntime])
+                        onnx-int8   (dynamically quantized ONNX, exported once
+                                     into the local cache)
+                        fastembed   (needs llama-index-embeddings-fastembed)
+    EMBED_ONNX_QUANTIZATION - target for onnx-int8 export: avx2 (default),
+                        avx512, avx512_vnni or arm64
+
+Documents and queries must be embedded by the same model, so each model gets
+its own vector index; backends of one model share it.
+"""
+
+import logging
+import os
+import re
+from typing import Optional
+
+from components.retrieval.lazy import LazyEmbedding
+from components.utils.sqlite_cache import default_cache_path
+
+logger = logging.getLogger(__name__)
+
+MODEL_PRESETS = {
+    "bge-large": "BAAI/bge-large-en-v1.5",
+    "bge-base": "BAAI/bge-base-en-v1.5",
+    "bge-small": "BAAI/bge-small-en-v1.5",
+}
+DEFAULT_MODEL_NAME = MODEL_PRESETS["bge-large"]
+BACKENDS = ("torch", "onnx", "onnx-int8", "fastembed")
+
+EMBED_MODEL_NAME = os.environ.get("EMBED_MODEL_NAME", DEFAULT_MODEL_NAME)
+EMBED_BACKEND = os.environ.get("EMBED_BACKEND", "torch").lower()
+ONNX_QUANTIZATION = os.environ.get("EMBED_ONNX_QUANTIZATION", "avx2")
+
+
+def resolve_model_name(model_name: Optional[str] = None) -> str:
+    """Expand a preset name ("bge-small") to its HuggingFace model id."""
+    model_name = model_name or EMBED_MODEL_NAME
+    return MODEL_PRESETS.get(model_name, model_name)
+
+
+def model_slug(model_name: str) -> str:
+    """Filesystem-safe name for a model id ("BAAI/bge-large-en-v1.5" -> "BAAI--bge-large-en-v1.5")."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "--", model_name)
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime  # noqa: F401
+        import optimum  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "The onnx embedding backends need ONNX Runtime. Install with: pip install 'optimum[onnxruntime]'"
+        )
+
+
+def _quantized_onnx_dir(model_name: str, quantization: str) -> str:
+    """Export the model to int8 ONNX in the local cache once, and return its directory."""
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    export_dir = default_cache_path(os.path.join("onnx", model_slug(model_name)))
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        logger.info(f"Exporting {model_name} to int8 ONNX ({quantization}) in {export_dir}...")
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save(export_dir)
+        export_dynamic_quantized_onnx_model(model, quantization, export_dir)
+    return export_dir
+
+
+def load_embedding_model(model_name: Optional[str] = None, backend: Optional[str] = None):
+    """
+    Instantiate a llama_index embedding model.
+
+    Args:
+        model_name: HuggingFace model id or preset (defaults to EMBED_MODEL_NAME)
+        backend: One of BACKENDS (defaults to EMBED_BACKEND)
+
+    Returns:
+        A llama_index BaseEmbedding
+    """
+    model_name = resolve_model_name(model_name)
+    backend = (backend or EMBED_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Supported: {', '.join(BACKENDS)}")
+
+    if backend == "fastembed":
+        try:
+            from llama_index.embeddings.fastembed import FastEmbedEmbedding
+        except ImportError:
+            raise ImportError(
+                "The fastembed backend needs llama-index-embeddings-fastembed. "
+                "Install with: pip install llama-index-embeddings-fastembed"
+            )
+        return FastEmbedEmbedding(model_name=model_name)
+
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    if backend == "torch":
+        return HuggingFaceEmbedding(model_name=model_name)
+
+    _require_onnxruntime()
+    if backend == "onnx":
+        return HuggingFaceEmbedding(model_name=model_name, backend="onnx")
+
+    # The exported copy lives under a local path, so pass the bge instructions
+    # that HuggingFaceEmbedding would otherwise look up by model id
+    from llama_index.embeddings.huggingface.utils import (
+        get_query_instruct_for_model_name,
+        get_text_instruct_for_model_name,
+    )
+
+    return HuggingFaceEmbedding(
+        model_name=_quantized_onnx_dir(model_name, ONNX_QUANTIZATION),
+        backend="onnx",
+        model_kwargs={"file_name": f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"},
+        query_instruction=get_query_instruct_for_model_name(model_name),
+        text_instruction=get_text_instruct_for_model_name(model_name),
+    )
+
+
+def embedding_model(model_name: Optional[str] = None, backend: Optional[str] = None) -> LazyEmbedding:
+    """Configured embedding model, loaded on first use."""
+    model_name = resolve_model_name(model_name)
+    backend = (backend or EMBED_BACKEND).lower()
+    return LazyEmbedding(model_name, lambda: load_embedding_model(model_name, backend), backend=backend)
@@ -0,0 +1,37 @@
+"""
+Bounded thread pool for running blocking retrieval from async code.
+
+Query encoding and index scans are CPU-bound and release the GIL inside
+torch/numpy, so running them on a small pool lets concurrent agents (and
+concurrent API requests) overlap without stalling the event loop. The pool is
+bounded so a burst of requests can't oversubscribe the CPU the embedding
+model already uses.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+RETRIEVAL_WORKERS = int(os.environ.get("RETRIEVAL_WORKERS", "4"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_retrieval_executor() -> ThreadPoolExecutor:
+    """Shared executor for retrieval work, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+    return _executor
+
+
+async def run_in_retrieval_executor(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await ``fn(*args, **kwargs)`` running on the retrieval executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_retrieval_executor(), functools.partial(fn, *args, **kwargs))
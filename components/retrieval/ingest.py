@@ -0,0 +1,291 @@
+"""
+Incremental ingestion of standards PDFs into the persisted retrieval index.
+
+    python -m components.retrieval.ingest "documents/FAS 33 (33).pdf" [more.pdf | dir/ ...]
+
+PDFs are parsed in a process pool and every page's text is content-hashed.
+Pages whose hash matches the ingest manifest are skipped. Changed and new
+pages are chunked like the original build (one llama_index Document per
+page, default SentenceSplitter) and replace that page's old nodes. Only
+chunks without an embedding are sent to the model, in batches; every other
+row is copied from the existing vector index.
+
+Write order keeps the store consistent if the run is interrupted: the vector
+and BM25 indexes are written first (each file replaced atomically), then
+docstore.json and the manifest. A retriever started in between sees a
+docstore that doesn't match the index and rebuilds it from the stored rows
+without re-embedding.
+
+The FAS number is read from "(NN)" in the file name, as for the original
+standards; pass --standard-id when a file name doesn't carry it. The id is
+recorded in the manifest and reused when the file is ingested again.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from components.retrieval.standards import normalize_standard_id, standard_id_from_metadata
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "ingest_manifest.json"
+# Same keys SimpleDirectoryReader hides from the embedding and LLM views of a node
+EXCLUDED_METADATA_KEYS = [
+    "file_name",
+    "file_type",
+    "file_size",
+    "creation_date",
+    "last_modified_date",
+    "last_accessed_date",
+]
+
+
+def _page_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_pdf_pages(path: str) -> Dict[str, Any]:
+    """
+    Extract and hash every page of a PDF. Runs in a worker process.
+
+    Returns:
+        Dict with the file metadata and a list of pages as
+        {"page_label", "text", "hash"}
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    pages = []
+    for i, page in enumerate(reader.pages):
+        text = page.extract_text() or ""
+        pages.append({"page_label": str(i + 1), "text": text, "hash": _page_hash(text)})
+
+    stat = os.stat(path)
+    return {
+        "file_name": os.path.basename(path),
+        "file_path": os.path.abspath(path),
+        "file_size": stat.st_size,
+        "creation_date": datetime.fromtimestamp(stat.st_ctime).strftime("%Y-%m-%d"),
+        "last_modified_date": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d"),
+        "pages": pages,
+    }
+
+
+def _collect_pdfs(paths: List[str]) -> List[str]:
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".pdf"):
+                    pdfs.append(os.path.join(path, name))
+        elif path.lower().endswith(".pdf"):
+            pdfs.append(path)
+        else:
+            logger.warning(f"Skipping {path}: not a PDF or directory")
+    return pdfs
+
+
+def _load_manifest(persist_dir: str) -> Dict[str, Any]:
+    path = os.path.join(persist_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json_atomically(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _page_documents(parsed: Dict[str, Any], pages: List[Dict[str, Any]], standard_id: Optional[str]):
+    from llama_index.core import Document
+
+    documents = []
+    for page in pages:
+        metadata = {
+            "page_label": page["page_label"],
+            "file_name": parsed["file_name"],
+            "file_path": parsed["file_path"],
+            "file_type": "application/pdf",
+            "file_size": parsed["file_size"],
+            "creation_date": parsed["creation_date"],
+            "last_modified_date": parsed["last_modified_date"],
+        }
+        if standard_id:
+            metadata["standard_id"] = standard_id
+        documents.append(Document(
+            text=page["text"],
+            metadata=metadata,
+            excluded_embed_metadata_keys=list(EXCLUDED_METADATA_KEYS),
+            excluded_llm_metadata_keys=list(EXCLUDED_METADATA_KEYS),
+        ))
+    return documents
+
+
+def ingest_pdfs(
+    pdf_paths: List[str],
+    persist_dir: str,
+    embed_model,
+    workers: Optional[int] = None,
+    standard_id: Optional[str] = None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Add or update PDFs in the persisted index, re-embedding only changed pages.
+
+    Args:
+        pdf_paths: PDF files to ingest
+        persist_dir: llama_index persist directory (e.g. "./vector_db_storage/")
+        embed_model: Embedding model (a LazyEmbedding is only loaded if there is
+            something to embed)
+        workers: Parser processes (defaults to the CPU count)
+        standard_id: FAS number to tag every page with, overriding the file name.
+            It is recorded in the manifest and reused when the file is
+            ingested again without one
+        dry_run: Report what would change without writing anything
+
+    Returns:
+        Counts of parsed, unchanged, added and removed pages and added/removed nodes
+    """
+    from llama_index.core.node_parser import SentenceSplitter
+    from llama_index.core.storage.docstore import SimpleDocumentStore
+
+    from components.retrieval.docstore import LLAMA_DOCSTORE_FILE, CompactDocStore
+    from components.retrieval.retriever import _model_name, build_bm25_index, build_vector_index, vector_index_dir
+    from components.retrieval.vector_index import VectorIndex
+
+    start_time = time.time()
+    standard_id = normalize_standard_id(standard_id) if standard_id else None
+    stats = {"files": 0, "pages": 0, "unchanged_pages": 0, "changed_pages": 0, "added_nodes": 0, "removed_nodes": 0}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parsed_files = list(pool.map(read_pdf_pages, pdf_paths))
+    logger.info(f"Parsed {len(parsed_files)} PDFs in {time.time() - start_time:.2f}s")
+
+    docstore_path = os.path.join(persist_dir, LLAMA_DOCSTORE_FILE)
+    docstore = (
+        SimpleDocumentStore.from_persist_path(docstore_path) if os.path.exists(docstore_path) else SimpleDocumentStore()
+    )
+    manifest = _load_manifest(persist_dir)
+    ref_docs = docstore.get_all_ref_doc_info() or {}
+    splitter = SentenceSplitter()
+
+    new_nodes = []
+    for parsed in parsed_files:
+        file_name = parsed["file_name"]
+        stats["files"] += 1
+        stats["pages"] += len(parsed["pages"])
+        previous = manifest.get(file_name)
+        # An id given when the file was first ingested keeps applying to its new pages
+        override_id = standard_id or (previous or {}).get("standard_id")
+        file_standard_id = override_id or standard_id_from_metadata({"file_name": file_name})
+        if file_standard_id is None:
+            logger.warning(f"{file_name}: no FAS number in the file name; its pages won't be in any standard partition")
+
+        if previous is None:
+            # Not ingested by this tool before: replace whatever the original build stored for the file
+            stale_ref_docs = [ref_id for ref_id, info in ref_docs.items() if info.metadata.get("file_name") == file_name]
+            changed_pages = parsed["pages"]
+        else:
+            current_hashes = {page["page_label"]: page["hash"] for page in parsed["pages"]}
+            stale_ref_docs = [
+                entry["ref_doc_id"]
+                for label, entry in previous["pages"].items()
+                if current_hashes.get(label) != entry["hash"]
+            ]
+            changed_pages = [
+                page for page in parsed["pages"]
+                if previous["pages"].get(page["page_label"], {}).get("hash") != page["hash"]
+            ]
+
+        stats["unchanged_pages"] += len(parsed["pages"]) - len(changed_pages)
+        stats["changed_pages"] += len(changed_pages)
+        for ref_doc_id in stale_ref_docs:
+            info = ref_docs.get(ref_doc_id)
+            stats["removed_nodes"] += len(info.node_ids) if info else 0
+            if not dry_run:
+                docstore.delete_ref_doc(ref_doc_id, raise_error=False)
+
+        documents = _page_documents(parsed, changed_pages, override_id)
+        nodes = splitter.get_nodes_from_documents(documents)
+        new_nodes.extend(nodes)
+        stats["added_nodes"] += len(nodes)
+
+        pages_entry = dict(previous["pages"]) if previous else {}
+        for label in list(pages_entry):
+            if label not in {page["page_label"] for page in parsed["pages"]}:
+                del pages_entry[label]
+        for page, document in zip(changed_pages, documents):
+            pages_entry[page["page_label"]] = {"hash": page["hash"], "ref_doc_id": document.doc_id}
+        manifest[file_name] = {"standard_id": override_id, "pages": pages_entry}
+
+        logger.info(
+            f"{file_name}: {len(parsed['pages'])} pages, {len(changed_pages)} new or changed, "
+            f"{len(nodes)} chunks to add, {len(stale_ref_docs)} stale pages to remove"
+        )
+
+    if dry_run or (stats["changed_pages"] == 0 and stats["removed_nodes"] == 0):
+        logger.info(f"Nothing written ({'dry run' if dry_run else 'no changes'})")
+        return stats
+
+    docstore.add_documents(new_nodes)
+    all_nodes = list(docstore.docs.values())
+    index_dir = vector_index_dir(persist_dir, _model_name(embed_model))
+    previous_index = VectorIndex.open(index_dir) if VectorIndex.exists(index_dir) else None
+
+    # Indexes first; the docstore and manifest are the commit point
+    build_vector_index(persist_dir, embed_model, previous_index=previous_index, nodes=all_nodes)
+    build_bm25_index(persist_dir, nodes=all_nodes)
+    tmp_docstore_path = f"{docstore_path}.tmp"
+    docstore.persist(persist_path=tmp_docstore_path)
+    os.replace(tmp_docstore_path, docstore_path)
+    _write_json_atomically(os.path.join(persist_dir, MANIFEST_FILE), manifest)
+    CompactDocStore.from_persist_dir(persist_dir).close()
+
+    logger.info(
+        f"Ingested {stats['files']} files in {time.time() - start_time:.2f}s: "
+        f"{stats['changed_pages']} pages updated, {stats['unchanged_pages']} unchanged, "
+        f"+{stats['added_nodes']} / -{stats['removed_nodes']} nodes; index now has {len(all_nodes)} nodes"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally ingest AAOIFI standards PDFs into the retrieval index")
+    parser.add_argument("paths", nargs="+", help="PDF files or directories of PDFs")
+    parser.add_argument("--persist-dir", default="./vector_db_storage/", help="llama_index persist directory")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--standard-id", help="FAS number for these PDFs when the file name lacks '(NN)'")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    from components.retrieval.embeddings import embedding_model
+
+    pdf_paths = _collect_pdfs(args.paths)
+    if not pdf_paths:
+        parser.error("no PDF files found")
+    stats = ingest_pdfs(
+        pdf_paths,
+        args.persist_dir,
+        embedding_model(),
+        workers=args.workers,
+        standard_id=args.standard_id,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
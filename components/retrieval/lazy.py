@@ -0,0 +1,119 @@
+"""
+Lazy handle around the standards retriever.
+
+Building the retriever loads the embedding model and the docstore, which takes
+tens of seconds. ``LazyRetriever`` defers that work to the first call that
+actually needs it, so importing an agent module (or running ``--help``) stays
+cheap. ``LazyEmbedding`` does the same for the embedding model alone, so
+sparse (BM25-only) retrieval never loads it.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from components.retrieval.executor import run_in_retrieval_executor
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRetriever:
+    """
+    Proxy that materializes the real retriever on first use.
+
+    ``retrieve`` and any other attribute access are forwarded to the wrapped
+    retriever once it has been built. ``aretrieve`` / ``aretrieve_many`` run
+    the load and the search on the retrieval executor. Construction is thread-safe, so
+    concurrent first requests only build it once.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = "standards retriever"):
+        self._factory = factory
+        self._name = name
+        self._instance = None
+        self._lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def warmup(self) -> "LazyRetriever":
+        """Build the retriever now instead of on the first query."""
+        self._get()
+        return self
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start_time = time.perf_counter()
+                    self._instance = self._factory()
+                    self.timings["load_seconds"] = time.perf_counter() - start_time
+                    logger.info(f"Loaded {self._name} in {self.timings['load_seconds']:.2f}s")
+        return self._instance
+
+    def retrieve(self, *args, **kwargs):
+        return self._get().retrieve(*args, **kwargs)
+
+    def retrieve_many(self, *args, **kwargs):
+        return self._get().retrieve_many(*args, **kwargs)
+
+    async def aretrieve(self, *args, **kwargs):
+        # The first call may also build the retriever; that happens off the loop too
+        return await run_in_retrieval_executor(lambda: self._get().retrieve(*args, **kwargs))
+
+    async def aretrieve_many(self, *args, **kwargs):
+        return await run_in_retrieval_executor(lambda: self._get().retrieve_many(*args, **kwargs))
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not defined on the proxy itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._get(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyRetriever {self._name} ({state})>"
+
+
+class LazyEmbedding:
+    """
+    Proxy for an embedding model that is only loaded when a vector is needed.
+
+    ``model_name`` (and the inference ``backend``, if given) is known up
+    front, so index and cache checks that only compare names never trigger a
+    load.
+    """
+
+    def __init__(self, model_name: str, factory: Callable[[], Any], backend: Optional[str] = None):
+        self.model_name = model_name
+        self.backend = backend
+        self._factory = factory
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def _get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start_time = time.perf_counter()
+                    self._model = self._factory()
+                    logger.info(f"Loaded embedding model {self.model_name} in {time.perf_counter() - start_time:.2f}s")
+        return self._model
+
+    def __getattr__(self, name: str):
+        # Forward everything, including llama_index's private _embed batch hook
+        if name.startswith("__") or name in ("_model", "_factory", "_lock"):
+            raise AttributeError(name)
+        return getattr(self._get(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        backend = f" [{self.backend}]" if self.backend else ""
+        return f"<LazyEmbedding {self.model_name}{backend} ({state})>"
@@ -0,0 +1,125 @@
+"""
+Cache of ranked retrieval results, versioned by the index contents.
+
+Maps ``(query, top_k, filters, mode)`` to the ranked list of ``(node_id, score)``
+returned by the index. Every key includes a fingerprint of the persist
+directory, so rebuilding or re-ingesting the standards invalidates the cache
+without any manual step.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from components.retrieval.embedding_cache import normalize_query
+from components.utils.sqlite_cache import SqliteCache, default_cache_path
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CAPACITY = int(os.environ.get("RESULT_CACHE_SIZE", "2048"))
+DISK_MAX_ENTRIES = 20000
+_FINGERPRINT_KEY = "__index_fingerprint__"
+
+
+def fingerprint_directory(path: str) -> str:
+    """
+    Change marker for the files directly inside ``path``: their names, sizes
+    and modification times.
+
+    Nothing is read, so the cost doesn't grow with the corpus. Subdirectories
+    (such as the derived ``ann`` index) are skipped; they are rebuilt from
+    these files.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path):
+            continue
+        stat = os.stat(file_path)
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RetrievalResultCache:
+    """In-process LRU of ranked node ids, backed by a persistent store."""
+
+    def __init__(
+        self,
+        fingerprint: str,
+        model_name: str,
+        path: Optional[str] = None,
+        capacity: int = MEMORY_CAPACITY,
+        persistent: bool = True,
+    ):
+        self.fingerprint = fingerprint
+        self.model_name = model_name
+        self.capacity = capacity
+        self._memory: "OrderedDict[str, List[Tuple[str, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if persistent:
+            self._disk = SqliteCache(path or default_cache_path("retrieval_results.sqlite"), table="results", max_entries=DISK_MAX_ENTRIES)
+            self._drop_stale_entries()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop_stale_entries(self) -> None:
+        stored = self._disk.get(_FINGERPRINT_KEY)
+        if stored is not None and stored.decode("utf-8") != self.fingerprint:
+            logger.info("Standards index changed; clearing cached retrieval results")
+            self._disk.clear()
+        self._disk.set(_FINGERPRINT_KEY, self.fingerprint.encode("utf-8"))
+
+    def _key(self, query: str, top_k: int, filters: Optional[Dict[str, Any]], mode: str) -> str:
+        payload = json.dumps(
+            [self.fingerprint, self.model_name, normalize_query(query), top_k, filters or {}, mode],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(
+        self, query: str, top_k: int, filters: Optional[Dict[str, Any]] = None, mode: str = "dense"
+    ) -> Optional[List[Tuple[str, float]]]:
+        key = self._key(query, top_k, filters, mode)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        if self._disk is not None:
+            blob = self._disk.get(key)
+            if blob is not None:
+                ranked = [tuple(item) for item in json.loads(blob)]
+                self._remember(key, ranked)
+                with self._lock:
+                    self.hits += 1
+                return ranked
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(
+        self,
+        query: str,
+        top_k: int,
+        ranked: List[Tuple[str, float]],
+        filters: Optional[Dict[str, Any]] = None,
+        mode: str = "dense",
+    ) -> None:
+        key = self._key(query, top_k, filters, mode)
+        self._remember(key, ranked)
+        if self._disk is not None:
+            self._disk.set(key, json.dumps(ranked).encode("utf-8"))
+
+    def _remember(self, key: str, ranked: List[Tuple[str, float]]) -> None:
+        with self._lock:
+            self._memory[key] = ranked
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
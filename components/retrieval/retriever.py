@@ -0,0 +1,490 @@
+"""
+Standards retriever backed by the persistent vector index.
+
+``StandardsRetriever`` is a drop-in replacement for llama_index's
+``VectorIndexRetriever``: ``retrieve(query)`` returns a list of
+``NodeWithScore`` so every agent keeps using ``node.text`` / ``node.metadata``
+unchanged. Nodes are served from a compact SQLite copy of the llama_index
+docstore and embeddings from the memory-mapped index, both in
+``<persist_dir>/ann``.
+
+Queries can be scoped to one or more standards with
+``retrieve(query, filters={"standard_id": "10"})``; only that standard's
+partition of the index is scanned.
+
+Three retrieval modes are available per call (``mode=``) or through the
+``RETRIEVAL_MODE`` environment variable:
+    dense   - embedding similarity (default)
+    sparse  - BM25 over the precomputed inverted index; never loads the model
+    hybrid  - reciprocal-rank fusion of the dense and sparse rankings
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore, QueryBundle
+
+from components.retrieval.bm25 import BM25Index, reciprocal_rank_fusion
+from components.retrieval.docstore import DERIVED_DIRNAME, CompactDocStore
+from components.retrieval.embedding_cache import QueryEmbeddingCache
+from components.retrieval.embeddings import DEFAULT_MODEL_NAME, model_slug
+from components.retrieval.executor import run_in_retrieval_executor
+from components.retrieval.result_cache import RetrievalResultCache, fingerprint_directory
+from components.retrieval.standards import normalize_standard_id, standard_id_from_metadata
+from components.retrieval.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIRNAME = DERIVED_DIRNAME
+# Vector indexes for models other than the default live in per-model subdirectories
+VECTORS_DIRNAME = "vectors"
+LLAMA_VECTOR_STORE_FILE = "default__vector_store.json"
+# Model the persisted llama_index vector store was built with
+LLAMA_VECTOR_STORE_MODEL = DEFAULT_MODEL_NAME
+EMBED_BATCH_SIZE = 32
+
+RETRIEVAL_MODES = ("dense", "sparse", "hybrid")
+DEFAULT_RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "dense").lower()
+# Depth of each ranking fed into reciprocal-rank fusion
+HYBRID_CANDIDATES = int(os.environ.get("HYBRID_CANDIDATES", "50"))
+
+
+def _model_name(embed_model) -> str:
+    return getattr(embed_model, "model_name", type(embed_model).__name__)
+
+
+def _cache_key(embed_model) -> str:
+    """Model identity for query caches; other backends produce slightly different vectors."""
+    backend = getattr(embed_model, "backend", None)
+    model_name = _model_name(embed_model)
+    return model_name if backend in (None, "torch") else f"{model_name}@{backend}"
+
+
+def vector_index_dir(persist_dir: str, model_name: str) -> str:
+    """
+    Directory of the vector index for ``model_name``.
+
+    The default model keeps the original ``<persist_dir>/ann`` location; other
+    models get ``ann/vectors/<model>`` so switching models never overwrites
+    another model's index.
+    """
+    if model_name == DEFAULT_MODEL_NAME:
+        return os.path.join(persist_dir, INDEX_DIRNAME)
+    return os.path.join(persist_dir, INDEX_DIRNAME, VECTORS_DIRNAME, model_slug(model_name))
+
+
+def encode_queries(embed_model, queries: List[str]) -> List[List[float]]:
+    """Encode several queries in one forward pass when the model supports it."""
+    # HuggingFaceEmbedding batches natively; the query prompt matches get_query_embedding
+    if hasattr(embed_model, "_embed"):
+        return embed_model._embed(list(queries), prompt_name="query")
+    return [embed_model.get_query_embedding(query) for query in queries]
+
+
+def _load_persisted_embeddings(persist_dir: str) -> dict:
+    """Embeddings already computed by llama_index, if the vector store was persisted."""
+    path = os.path.join(persist_dir, LLAMA_VECTOR_STORE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("embedding_dict", {}) or {}
+
+
+def _load_index_embeddings(index: Optional[VectorIndex], model_name: str) -> dict:
+    """Embeddings from a previous build of the index, if made with the same model."""
+    if index is None or index.meta.model_name != model_name:
+        return {}
+    return {node_id: index.matrix[row] for row, node_id in enumerate(index.node_ids)}
+
+
+def build_vector_index(
+    persist_dir: str,
+    embed_model,
+    docstore: Optional[CompactDocStore] = None,
+    previous_index: Optional[VectorIndex] = None,
+    nodes: Optional[List[BaseNode]] = None,
+) -> VectorIndex:
+    """
+    Build the memory-mapped index from a llama_index persist directory.
+
+    Embeddings stored by llama_index or by a previous build of the index are
+    reused; nodes without one are embedded with ``embed_model`` in batches.
+    Rows are partitioned by the standard each node belongs to.
+
+    Args:
+        persist_dir: llama_index persist directory (contains docstore.json)
+        embed_model: llama_index embedding model
+        docstore: Already opened compact docstore
+        previous_index: Existing index whose embeddings can be reused
+        nodes: Index exactly these nodes instead of the docstore's (used by
+            ingestion before the new docstore is written)
+
+    Returns:
+        The opened VectorIndex
+    """
+    if nodes is None:
+        docstore = docstore or CompactDocStore.from_persist_dir(persist_dir)
+        nodes = list(docstore.iter_nodes())
+    model_name = _model_name(embed_model)
+    stored = _load_index_embeddings(previous_index, model_name)
+    if model_name == LLAMA_VECTOR_STORE_MODEL:
+        stored.update(_load_persisted_embeddings(persist_dir))
+
+    missing = [node for node in nodes if node.node_id not in stored]
+    if missing:
+        logger.info(f"Embedding {len(missing)} of {len(nodes)} nodes for the vector index...")
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in missing]
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            batch = texts[start:start + EMBED_BATCH_SIZE]
+            for node, embedding in zip(missing[start:start + EMBED_BATCH_SIZE], embed_model.get_text_embedding_batch(batch)):
+                stored[node.node_id] = embedding
+
+    node_ids = [node.node_id for node in nodes]
+    embeddings = np.array([stored[node_id] for node_id in node_ids], dtype=np.float32)
+    partition_keys = [standard_id_from_metadata(node.metadata) for node in nodes]
+    return VectorIndex.build(
+        vector_index_dir(persist_dir, model_name),
+        node_ids,
+        embeddings,
+        model_name,
+        partition_keys=partition_keys,
+    )
+
+
+def build_bm25_index(
+    persist_dir: str, docstore: Optional[CompactDocStore] = None, nodes: Optional[Iterable[BaseNode]] = None
+) -> BM25Index:
+    """Build the BM25 index from the docstore (or ``nodes``); no embedding model is needed."""
+    if nodes is None:
+        docstore = docstore or CompactDocStore.from_persist_dir(persist_dir)
+        nodes = docstore.iter_nodes()
+    node_ids, texts, partition_keys = [], [], []
+    for node in nodes:
+        node_ids.append(node.node_id)
+        texts.append(node.get_content(metadata_mode=MetadataMode.EMBED))
+        partition_keys.append(standard_id_from_metadata(node.metadata))
+    return BM25Index.build(
+        os.path.join(persist_dir, INDEX_DIRNAME), node_ids, texts, partition_keys=partition_keys
+    )
+
+
+def _resolve_mode(mode: Optional[str], default: str = DEFAULT_RETRIEVAL_MODE) -> str:
+    mode = (mode or default).lower()
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode '{mode}'. Supported: {', '.join(RETRIEVAL_MODES)}")
+    return mode
+
+
+def _normalize_filters(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, List[str]]]:
+    """Canonical form of a retrieval filter, e.g. {"standard_id": "FAS 10"} -> {"standard_id": ["10"]}."""
+    if not filters:
+        return None
+    unsupported = set(filters) - {"standard_id"}
+    if unsupported:
+        raise ValueError(f"Unsupported retrieval filters: {sorted(unsupported)}. Supported: standard_id")
+    standard_ids = filters["standard_id"]
+    if standard_ids is None:
+        return None
+    if isinstance(standard_ids, (str, int)):
+        standard_ids = [standard_ids]
+    normalized = sorted({normalize_standard_id(sid) for sid in standard_ids if normalize_standard_id(sid)})
+    if not normalized:
+        # An empty result would read as "no relevant standards"; search them all instead
+        logger.warning(f"Unrecognized standard_id filter {standard_ids!r}; searching all standards")
+        return None
+    return {"standard_id": normalized}
+
+
+class StandardsRetriever:
+    """Retriever over the standards corpus with the VectorIndexRetriever call surface."""
+
+    def __init__(
+        self,
+        index: Optional[VectorIndex],
+        docstore: CompactDocStore,
+        embed_model,
+        similarity_top_k: int = 20,
+        embedding_cache: Optional[QueryEmbeddingCache] = None,
+        result_cache: Optional[RetrievalResultCache] = None,
+        sparse_index: Optional[BM25Index] = None,
+        index_loader: Optional[Callable[[], VectorIndex]] = None,
+        mode: str = DEFAULT_RETRIEVAL_MODE,
+    ):
+        self._index = index
+        self._index_loader = index_loader
+        self._index_lock = threading.Lock()
+        self.docstore = docstore
+        self.embed_model = embed_model
+        self.similarity_top_k = similarity_top_k
+        self.embedding_cache = embedding_cache
+        self.result_cache = result_cache
+        self.sparse_index = sparse_index
+        self.mode = _resolve_mode(mode)
+
+    @property
+    def index(self) -> VectorIndex:
+        """The dense vector index, opened (or built) on first use in sparse-only setups."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    if self._index_loader is None:
+                        raise RuntimeError("No vector index available for dense retrieval")
+                    self._index = self._index_loader()
+        return self._index
+
+    def retrieve(
+        self,
+        str_or_query_bundle: Union[str, QueryBundle],
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+    ) -> List[NodeWithScore]:
+        """
+        Retrieve the most relevant nodes for a query.
+
+        Args:
+            str_or_query_bundle: Query text or llama_index QueryBundle
+            filters: Optional metadata filter; {"standard_id": "10"} (or a list of
+                ids) restricts the search to those standards' partitions. Ids
+                that match no standard in the index are dropped with a
+                warning; if none match, all standards are searched
+            mode: "dense", "sparse" or "hybrid"; defaults to the retriever's mode
+
+        Returns:
+            List of NodeWithScore sorted by descending score (cosine similarity,
+            BM25 score or fused RRF score depending on the mode)
+        """
+        filters = _normalize_filters(filters)
+        mode = _resolve_mode(mode, self.mode)
+        if isinstance(str_or_query_bundle, QueryBundle):
+            query_str = str_or_query_bundle.query_str
+            query_embedding = str_or_query_bundle.embedding
+        else:
+            query_str = str_or_query_bundle
+            query_embedding = None
+
+        # Results for a precomputed embedding aren't cached: the text may not match it
+        use_result_cache = self.result_cache is not None and query_embedding is None
+        if use_result_cache:
+            cached = self.result_cache.get(query_str, self.similarity_top_k, filters, mode)
+            if cached is not None:
+                return self._to_nodes(cached)
+
+        partitions = self._partitions(filters)
+        dense_ranked = sparse_ranked = None
+        if mode != "sparse":
+            if query_embedding is None:
+                query_embedding = self._embed_query(query_str)
+            hits = self.index.search(query_embedding, self._depth(mode), partitions=partitions)
+            dense_ranked = [(self.index.node_ids[row], score) for row, score in hits]
+        if mode != "dense":
+            sparse_ranked = self._sparse_search(query_str, self._depth(mode), partitions)
+
+        ranked = self._combine(mode, dense_ranked, sparse_ranked)
+        if use_result_cache:
+            self.result_cache.put(query_str, self.similarity_top_k, ranked, filters, mode)
+        return self._to_nodes(ranked)
+
+    def retrieve_many(
+        self,
+        queries: Sequence[str],
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+    ) -> List[List[NodeWithScore]]:
+        """
+        Retrieve for several queries at once.
+
+        Cache misses are encoded in a single batched forward pass and scored
+        against the index in a single matrix product.
+
+        Args:
+            queries: Query texts
+            filters: Optional metadata filter applied to every query (see retrieve)
+            mode: "dense", "sparse" or "hybrid"; defaults to the retriever's mode
+
+        Returns:
+            One list of NodeWithScore per query, in input order
+        """
+        filters = _normalize_filters(filters)
+        mode = _resolve_mode(mode, self.mode)
+        results: List[Optional[List[Tuple[str, float]]]] = [None] * len(queries)
+        if self.result_cache is not None:
+            for i, query in enumerate(queries):
+                results[i] = self.result_cache.get(query, self.similarity_top_k, filters, mode)
+
+        pending = [i for i, ranked in enumerate(results) if ranked is None]
+        if pending:
+            # Identical queries in one batch are only encoded and searched once
+            unique_queries = list(dict.fromkeys(queries[i] for i in pending))
+            partitions = self._partitions(filters)
+            depth = self._depth(mode)
+            dense_by_query = {}
+            if mode != "sparse":
+                embeddings = self._embed_queries(unique_queries)
+                all_hits = self.index.search_many(embeddings, depth, partitions=partitions)
+                for query, hits in zip(unique_queries, all_hits):
+                    dense_by_query[query] = [(self.index.node_ids[row], score) for row, score in hits]
+
+            ranked_by_query = {}
+            for query in unique_queries:
+                sparse_ranked = self._sparse_search(query, depth, partitions) if mode != "dense" else None
+                ranked = self._combine(mode, dense_by_query.get(query), sparse_ranked)
+                ranked_by_query[query] = ranked
+                if self.result_cache is not None:
+                    self.result_cache.put(query, self.similarity_top_k, ranked, filters, mode)
+            for i in pending:
+                results[i] = ranked_by_query[queries[i]]
+
+        return [self._to_nodes(ranked) for ranked in results]
+
+    async def aretrieve(
+        self,
+        str_or_query_bundle: Union[str, QueryBundle],
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+    ) -> List[NodeWithScore]:
+        """``retrieve`` on the retrieval executor, so the event loop keeps running."""
+        return await run_in_retrieval_executor(self.retrieve, str_or_query_bundle, filters=filters, mode=mode)
+
+    async def aretrieve_many(
+        self,
+        queries: Sequence[str],
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+    ) -> List[List[NodeWithScore]]:
+        """``retrieve_many`` on the retrieval executor."""
+        return await run_in_retrieval_executor(self.retrieve_many, queries, filters=filters, mode=mode)
+
+    def _partitions(self, filters: Optional[Dict[str, List[str]]]) -> Optional[List[str]]:
+        if not filters:
+            return None
+        standard_ids = filters["standard_id"]
+        # The BM25 and vector indexes share the docstore's partitioning
+        known = self.sparse_index.partitions if self.sparse_index is not None else None
+        if not known:
+            return standard_ids
+        missing = [sid for sid in standard_ids if sid not in known]
+        if len(missing) == len(standard_ids):
+            logger.warning(f"No standard {missing} in the index (available: {sorted(known)}); searching all standards")
+            return None
+        if missing:
+            logger.warning(f"No standard {missing} in the index; searching {[sid for sid in standard_ids if sid in known]}")
+        return [sid for sid in standard_ids if sid in known]
+
+    def _depth(self, mode: str) -> int:
+        # Fusion needs deeper rankings than the final cut to find agreement
+        return max(self.similarity_top_k, HYBRID_CANDIDATES) if mode == "hybrid" else self.similarity_top_k
+
+    def _sparse_search(self, query: str, top_k: int, partitions: Optional[List[str]]) -> List[Tuple[str, float]]:
+        if self.sparse_index is None:
+            raise RuntimeError("No BM25 index available for sparse retrieval")
+        hits = self.sparse_index.search(query, top_k, partitions=partitions)
+        return [(self.sparse_index.node_ids[row], score) for row, score in hits]
+
+    def _combine(
+        self,
+        mode: str,
+        dense_ranked: Optional[List[Tuple[str, float]]],
+        sparse_ranked: Optional[List[Tuple[str, float]]],
+    ) -> List[Tuple[str, float]]:
+        if mode == "dense":
+            return dense_ranked
+        if mode == "sparse":
+            return sparse_ranked
+        return reciprocal_rank_fusion([dense_ranked, sparse_ranked], self.similarity_top_k)
+
+    def _embed_query(self, query_str: str) -> List[float]:
+        if self.embedding_cache is None:
+            return self.embed_model.get_query_embedding(query_str)
+        return self.embedding_cache.get_or_embed(query_str, self.embed_model.get_query_embedding)
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        if self.embedding_cache is None:
+            return encode_queries(self.embed_model, queries)
+        return self.embedding_cache.get_or_embed_many(queries, lambda texts: encode_queries(self.embed_model, texts))
+
+    def _to_nodes(self, ranked: List[Tuple[str, float]]) -> List[NodeWithScore]:
+        nodes = self.docstore.get_nodes([node_id for node_id, _ in ranked])
+        return [NodeWithScore(node=node, score=score) for node, (_, score) in zip(nodes, ranked)]
+
+
+def load_standards_retriever(
+    persist_dir: str,
+    embed_model,
+    similarity_top_k: int = 20,
+    cache_query_embeddings: bool = True,
+    cache_results: bool = True,
+    mode: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> StandardsRetriever:
+    """
+    Open the standards retriever, building the vector and BM25 indexes on first use.
+
+    Args:
+        persist_dir: llama_index persist directory (e.g. "./vector_db_storage/")
+        embed_model: llama_index embedding model used for queries; pass a
+            LazyEmbedding to avoid loading it in sparse mode
+        similarity_top_k: Number of nodes returned per query
+        cache_query_embeddings: Reuse query embeddings across calls and runs
+        cache_results: Reuse ranked results until the persist directory changes
+        mode: Default retrieval mode (defaults to RETRIEVAL_MODE); in "sparse"
+            mode the vector index is only opened if a dense query comes in
+        quantization: Vector index first pass, "none", "int8" or "binary"
+            (defaults to RETRIEVAL_QUANTIZATION)
+
+    Returns:
+        A ready StandardsRetriever
+    """
+    start_time = time.time()
+    mode = _resolve_mode(mode)
+    docstore = CompactDocStore.from_persist_dir(persist_dir)
+    sparse_dir = os.path.join(persist_dir, INDEX_DIRNAME)
+    index_dir = vector_index_dir(persist_dir, _model_name(embed_model))
+
+    sparse_index = BM25Index.open(sparse_dir) if BM25Index.exists(sparse_dir) else None
+    if sparse_index is None or len(sparse_index) != len(docstore):
+        sparse_index = build_bm25_index(persist_dir, docstore=docstore)
+
+    def open_vector_index() -> VectorIndex:
+        index = VectorIndex.open(index_dir, quantization=quantization) if VectorIndex.exists(index_dir) else None
+        if index is None:
+            build_vector_index(persist_dir, embed_model, docstore=docstore)
+        elif (
+            len(index) != len(docstore)
+            or index.meta.model_name != _model_name(embed_model)
+            or index.meta.partitions is None
+            or index.meta.quantized is None
+        ):
+            logger.info("Vector index is out of date with the docstore; rebuilding")
+            build_vector_index(persist_dir, embed_model, docstore=docstore, previous_index=index)
+        else:
+            return index
+        # Reopen so the requested first pass also applies to a fresh build
+        return VectorIndex.open(index_dir, quantization=quantization)
+
+    index = None if mode == "sparse" else open_vector_index()
+
+    embedding_cache = QueryEmbeddingCache(_cache_key(embed_model)) if cache_query_embeddings else None
+    result_cache = (
+        RetrievalResultCache(fingerprint_directory(persist_dir), _cache_key(embed_model))
+        if cache_results else None
+    )
+
+    logger.info(
+        f"Standards retriever ready ({mode}): {len(sparse_index)} nodes in {time.time() - start_time:.2f}s"
+    )
+    return StandardsRetriever(
+        index,
+        docstore,
+        embed_model,
+        similarity_top_k=similarity_top_k,
+        embedding_cache=embedding_cache,
+        result_cache=result_cache,
+        sparse_index=sparse_index,
+        index_loader=open_vector_index,
+        mode=mode,
+    )
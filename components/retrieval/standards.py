@@ -0,0 +1,29 @@
+"""
+Helpers for mapping docstore nodes to the AAOIFI standard they belong to.
+
+Standard PDFs carry their FAS number in parentheses in the file name, e.g.
+"FI28ED_1_Salam and Parallel Salam (07).PDF" is FAS 7 and "Ijarah (32).pdf"
+is FAS 32. The vector index is partitioned by this id.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+_FILE_NAME_NUMBER = re.compile(r"\((\d+)\)")
+_STANDARD_NUMBER = re.compile(r"(\d+)")
+
+
+def normalize_standard_id(standard_id: Any) -> Optional[str]:
+    """Normalize "FAS 10", "10", 10 or "07" to the canonical id ("10", "7")."""
+    if standard_id is None:
+        return None
+    match = _STANDARD_NUMBER.search(str(standard_id))
+    return str(int(match.group(1))) if match else None
+
+
+def standard_id_from_metadata(metadata: Dict[str, Any]) -> Optional[str]:
+    """Standard id of a node, from an explicit ``standard_id`` or its source file name."""
+    if metadata.get("standard_id"):
+        return normalize_standard_id(metadata["standard_id"])
+    match = _FILE_NAME_NUMBER.search(metadata.get("file_name", ""))
+    return str(int(match.group(1))) if match else None
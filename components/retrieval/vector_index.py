@@ -0,0 +1,476 @@
+"""
+Persistent on-disk vector index for the standards corpus.
+
+Node embeddings are stored as a raw float32 matrix that is memory-mapped on
+open, so loading the index costs a couple of small file reads no matter how
+many nodes the corpus has. Search uses an HNSW graph (hnswlib) when one has
+been built and falls back to an exact scan over the mapped matrix otherwise.
+
+Rows are grouped by partition (the AAOIFI standard a node belongs to), so a
+standard-scoped query only scans the contiguous slice of its partition.
+
+With ``RETRIEVAL_QUANTIZATION=int8`` (4x smaller) or ``binary`` (32x smaller)
+the first pass scans compact codes instead of the float matrix, and only the
+best ``top_k * RESCORE_FACTOR`` candidates are rescored against their
+float32 rows. Those rows are paged in from the memory-mapped file on demand,
+so the resident set is the codes plus a few candidate rows per query.
+
+Layout of an index directory:
+    meta.json       - dimension, node count, embedding model, graph flag,
+                      partition row ranges
+    node_ids.json   - docstore node id for every matrix row
+    embeddings.f32  - row-major float32 matrix, L2-normalised
+    embeddings.i8   - int8 codes, per-dimension symmetric scale
+    int8_scales.f32 - per-dimension int8 scale (code = round(x * scale))
+    embeddings.bin  - sign bits, np.packbits per row
+    hnsw.bin        - optional HNSW graph over the same rows
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# hnswlib is optional - without it every query is an exact scan
+try:
+    import hnswlib
+
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+NODE_IDS_FILE = "node_ids.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+INT8_FILE = "embeddings.i8"
+INT8_SCALES_FILE = "int8_scales.f32"
+BINARY_FILE = "embeddings.bin"
+GRAPH_FILE = "hnsw.bin"
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+QUANTIZATION = os.environ.get("RETRIEVAL_QUANTIZATION", "none").lower()
+# First-pass candidates per requested result that get exact rescoring
+RESCORE_FACTOR = {"int8": 4, "binary": 20}
+# Rows decoded per block in the first pass, bounding temporary memory
+SCAN_BLOCK_ROWS = 4096
+# Set bits per byte value, for Hamming distance over packed codes
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+# Below this many rows an exact scan is as fast as walking a graph
+ANN_MIN_NODES = int(os.environ.get("ANN_MIN_NODES", "5000"))
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+
+
+@dataclass
+class IndexMeta:
+    """Header describing an on-disk vector index"""
+    dim: int
+    count: int
+    model_name: str
+    has_graph: bool = False
+    # partition key -> [start row, end row)
+    partitions: Optional[Dict[str, List[int]]] = None
+    # Quantized code files present next to the float matrix
+    quantized: Optional[List[str]] = None
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def partition_order(partition_keys: Sequence[Optional[str]]) -> Tuple[List[int], Dict[str, List[int]]]:
+    """
+    Row order that makes every partition contiguous.
+
+    Returns:
+        Tuple of (new order as a list of original rows, partition key ->
+        [start row, end row) in the new order); rows without a key go last
+    """
+    order = sorted(range(len(partition_keys)), key=lambda row: (partition_keys[row] is None, partition_keys[row] or ""))
+    partitions = {}
+    for new_row, old_row in enumerate(order):
+        key = partition_keys[old_row]
+        if key is None:
+            continue
+        if key not in partitions:
+            partitions[key] = [new_row, new_row]
+        partitions[key][1] = new_row + 1
+    return order, partitions
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-dimension int8 codes and the scales that produced them."""
+    max_abs = np.abs(matrix).max(axis=0) if len(matrix) else np.ones(matrix.shape[1], dtype=np.float32)
+    max_abs[max_abs == 0] = 1.0
+    scales = (127.0 / max_abs).astype(np.float32)
+    codes = np.clip(np.rint(matrix * scales), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def quantize_binary(matrix: np.ndarray) -> np.ndarray:
+    """Sign bits of each row packed into bytes."""
+    return np.packbits(matrix > 0, axis=-1)
+
+
+def _replace_atomically(path: str, write_fn) -> None:
+    """Write a file through a temporary sibling and rename it into place."""
+    tmp_path = f"{path}.tmp"
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class VectorIndex:
+    """
+    Memory-mapped embedding matrix with optional HNSW graph.
+
+    Rows are L2-normalised at build time so the dot product equals cosine
+    similarity, matching the scores returned by llama_index's SimpleVectorStore.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        meta: IndexMeta,
+        node_ids: List[str],
+        matrix: np.ndarray,
+        graph=None,
+        quantization: str = "none",
+        codes: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+    ):
+        self.path = path
+        self.meta = meta
+        self.node_ids = node_ids
+        self.matrix = matrix
+        self.graph = graph
+        self.quantization = quantization
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return self.meta.count
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, META_FILE))
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        node_ids: Sequence[str],
+        embeddings: np.ndarray,
+        model_name: str,
+        build_graph: Optional[bool] = None,
+        partition_keys: Optional[Sequence[Optional[str]]] = None,
+    ) -> "VectorIndex":
+        """
+        Write a new index to ``path`` and open it.
+
+        Args:
+            path: Directory to write the index into
+            node_ids: Docstore node id for each embedding row
+            embeddings: (count, dim) array of node embeddings
+            model_name: Name of the embedding model that produced the vectors
+            build_graph: Force graph construction on/off; by default a graph is
+                built when hnswlib is installed and the corpus is large enough
+            partition_keys: Optional partition key per row (None for rows that
+                belong to no partition); rows are reordered so each partition
+                is contiguous
+
+        Returns:
+            The opened VectorIndex
+        """
+        os.makedirs(path, exist_ok=True)
+        matrix = _normalize(np.asarray(embeddings, dtype=np.float32))
+        node_ids = list(node_ids)
+        count, dim = matrix.shape
+
+        partitions = None
+        if partition_keys is not None:
+            order, partitions = partition_order(partition_keys)
+            matrix = matrix[order]
+            node_ids = [node_ids[row] for row in order]
+
+        if build_graph is None:
+            build_graph = HNSWLIB_AVAILABLE and count >= ANN_MIN_NODES
+        if build_graph and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib is not installed; building index without an HNSW graph")
+            build_graph = False
+
+        _replace_atomically(os.path.join(path, EMBEDDINGS_FILE), lambda p: matrix.tofile(p))
+        int8_codes, int8_scales = quantize_int8(matrix)
+        _replace_atomically(os.path.join(path, INT8_FILE), lambda p: int8_codes.tofile(p))
+        _replace_atomically(os.path.join(path, INT8_SCALES_FILE), lambda p: int8_scales.tofile(p))
+        _replace_atomically(os.path.join(path, BINARY_FILE), lambda p: quantize_binary(matrix).tofile(p))
+
+        def write_ids(p):
+            with open(p, "w") as f:
+                json.dump(node_ids, f)
+
+        _replace_atomically(os.path.join(path, NODE_IDS_FILE), write_ids)
+
+        if build_graph:
+            graph = hnswlib.Index(space="ip", dim=dim)
+            graph.init_index(max_elements=count, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            graph.add_items(matrix, np.arange(count))
+            _replace_atomically(os.path.join(path, GRAPH_FILE), lambda p: graph.save_index(p))
+        elif os.path.exists(os.path.join(path, GRAPH_FILE)):
+            os.remove(os.path.join(path, GRAPH_FILE))
+
+        # The header is written last so a half-built index is never opened
+        meta = IndexMeta(
+            dim=dim,
+            count=count,
+            model_name=model_name,
+            has_graph=build_graph,
+            partitions=partitions,
+            quantized=["int8", "binary"],
+        )
+
+        def write_meta(p):
+            with open(p, "w") as f:
+                json.dump(asdict(meta), f, indent=2)
+
+        _replace_atomically(os.path.join(path, META_FILE), write_meta)
+        logger.info(f"Built vector index at {path}: {count} nodes, dim={dim}, graph={build_graph}")
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str, quantization: Optional[str] = None) -> "VectorIndex":
+        """
+        Open an existing index; the embedding matrix is mapped, not read.
+
+        Args:
+            path: Index directory
+            quantization: "none", "int8" or "binary" first pass (defaults to
+                RETRIEVAL_QUANTIZATION). Quantized codes are loaded into memory
+                and the HNSW graph is not, since it keeps its own float copy.
+        """
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = IndexMeta(**json.load(f))
+        with open(os.path.join(path, NODE_IDS_FILE)) as f:
+            node_ids = json.load(f)
+
+        matrix = np.memmap(
+            os.path.join(path, EMBEDDINGS_FILE), dtype=np.float32, mode="r", shape=(meta.count, meta.dim)
+        )
+
+        quantization = (quantization or QUANTIZATION).lower()
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{quantization}'. Supported: {', '.join(QUANTIZATION_MODES)}")
+        codes = scales = None
+        if quantization != "none" and quantization not in (meta.quantized or []):
+            logger.warning(f"Index at {path} has no {quantization} codes; rebuild it to enable quantization")
+            quantization = "none"
+        if quantization == "int8":
+            codes = np.fromfile(os.path.join(path, INT8_FILE), dtype=np.int8).reshape(meta.count, meta.dim)
+            scales = np.fromfile(os.path.join(path, INT8_SCALES_FILE), dtype=np.float32)
+        elif quantization == "binary":
+            codes = np.fromfile(os.path.join(path, BINARY_FILE), dtype=np.uint8).reshape(meta.count, -1)
+
+        graph = None
+        if meta.has_graph and quantization == "none":
+            if HNSWLIB_AVAILABLE:
+                graph = hnswlib.Index(space="ip", dim=meta.dim)
+                graph.load_index(os.path.join(path, GRAPH_FILE), max_elements=meta.count)
+                graph.set_ef(HNSW_EF_SEARCH)
+            else:
+                logger.warning("Index has an HNSW graph but hnswlib is not installed; using exact scan")
+
+        return cls(path, meta, node_ids, matrix, graph, quantization=quantization, codes=codes, scales=scales)
+
+    def partition_ranges(self, partitions: Sequence[str]) -> List[Tuple[int, int]]:
+        """Row ranges of the given partitions; unknown partitions are skipped."""
+        known = self.meta.partitions or {}
+        missing = [key for key in partitions if key not in known]
+        if missing:
+            logger.warning(f"No index partition for {missing}; available: {sorted(known)}")
+        return [tuple(known[key]) for key in partitions if key in known]
+
+    def search(
+        self, query_embedding: Sequence[float], top_k: int, partitions: Optional[Sequence[str]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the rows most similar to a query embedding.
+
+        Args:
+            query_embedding: Query vector (normalised here)
+            top_k: Number of rows to return
+            partitions: Restrict the search to these partitions; the scan only
+                touches their rows
+
+        Returns:
+            List of (row, cosine similarity) sorted by descending similarity
+        """
+        top_k = min(top_k, self.meta.count)
+        if top_k <= 0:
+            return []
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+
+        if self.codes is not None:
+            ranges = self.partition_ranges(partitions) if partitions is not None else None
+            return self._quantized_search(query[None, :], top_k, ranges)[0]
+
+        if partitions is not None:
+            return self._partition_search(query[None, :], top_k, self.partition_ranges(partitions))[0]
+
+        if self.graph is not None:
+            labels, distances = self.graph.knn_query(query, k=top_k)
+            # hnswlib's "ip" space reports 1 - dot product
+            return [(int(row), float(1.0 - dist)) for row, dist in zip(labels[0], distances[0])]
+
+        return self._exact_search(query, top_k)
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        top_k: int,
+        partitions: Optional[Sequence[str]] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Batched ``search``: all queries are scored in a single matrix product
+        (or a single batched graph query).
+
+        Returns:
+            One ranked (row, similarity) list per query, in input order
+        """
+        top_k = min(top_k, self.meta.count)
+        if top_k <= 0 or len(query_embeddings) == 0:
+            return [[] for _ in query_embeddings]
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+
+        if self.codes is not None:
+            ranges = self.partition_ranges(partitions) if partitions is not None else None
+            return self._quantized_search(queries, top_k, ranges)
+
+        if partitions is not None:
+            return self._partition_search(queries, top_k, self.partition_ranges(partitions))
+
+        if self.graph is not None:
+            labels, distances = self.graph.knn_query(queries, k=top_k)
+            return [
+                [(int(row), float(1.0 - dist)) for row, dist in zip(row_labels, row_distances)]
+                for row_labels, row_distances in zip(labels, distances)
+            ]
+
+        # (count, n_queries) similarity matrix in one pass over the mapped rows
+        scores = (self.matrix @ queries.T).T
+        if top_k < scores.shape[1]:
+            candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        results = []
+        for query_scores, query_candidates in zip(scores, candidates):
+            ranked = query_candidates[np.argsort(-query_scores[query_candidates])]
+            results.append([(int(row), float(query_scores[row])) for row in ranked])
+        return results
+
+    def _partition_search(
+        self, queries: np.ndarray, top_k: int, ranges: List[Tuple[int, int]]
+    ) -> List[List[Tuple[int, float]]]:
+        """Exact scan restricted to the given row ranges."""
+        if not ranges:
+            return [[] for _ in queries]
+        rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+        scores = np.concatenate([(self.matrix[start:end] @ queries.T).T for start, end in ranges], axis=1)
+        top_k = min(top_k, len(rows))
+        results = []
+        for query_scores in scores:
+            if top_k < len(query_scores):
+                candidates = np.argpartition(-query_scores, top_k - 1)[:top_k]
+            else:
+                candidates = np.arange(len(query_scores))
+            ranked = candidates[np.argsort(-query_scores[candidates])]
+            results.append([(int(rows[i]), float(query_scores[i])) for i in ranked])
+        return results
+
+    def _approximate_scores(self, start: int, end: int, queries: np.ndarray) -> np.ndarray:
+        """(n_queries, end - start) first-pass scores from the quantized codes."""
+        if self.quantization == "int8":
+            # x ~ code / scale, so x . q ~ code . (q / scale)
+            return (self.codes[start:end].astype(np.float32) @ (queries / self.scales).T).T
+        query_bits = quantize_binary(queries)
+        # Fewer differing sign bits means more similar; negate so higher is better
+        return np.stack([
+            -_POPCOUNT[np.bitwise_xor(self.codes[start:end], bits)].sum(axis=1, dtype=np.float32)
+            for bits in query_bits
+        ])
+
+    def _quantized_search(
+        self, queries: np.ndarray, top_k: int, ranges: Optional[List[Tuple[int, int]]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """First pass over the quantized codes, then exact rescoring of the best candidates."""
+        if ranges is None:
+            ranges = [(0, self.meta.count)]
+        if not ranges:
+            return [[] for _ in queries]
+
+        rows, blocks = [], []
+        for start, end in ranges:
+            for block_start in range(start, end, SCAN_BLOCK_ROWS):
+                block_end = min(block_start + SCAN_BLOCK_ROWS, end)
+                rows.append(np.arange(block_start, block_end))
+                blocks.append(self._approximate_scores(block_start, block_end, queries))
+        rows = np.concatenate(rows)
+        approximate = np.concatenate(blocks, axis=1)
+
+        top_k = min(top_k, len(rows))
+        n_candidates = min(len(rows), top_k * RESCORE_FACTOR[self.quantization])
+        results = []
+        for query, query_scores in zip(queries, approximate):
+            if n_candidates < len(query_scores):
+                candidates = np.argpartition(-query_scores, n_candidates - 1)[:n_candidates]
+            else:
+                candidates = np.arange(len(query_scores))
+            # Sorted row order keeps the reads from the mapped float matrix sequential
+            candidate_rows = np.sort(rows[candidates])
+            exact = self.matrix[candidate_rows] @ query
+            best = np.argsort(-exact)[:top_k]
+            results.append([(int(candidate_rows[i]), float(exact[i])) for i in best])
+        return results
+
+    def _exact_search(self, query: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        scores = self.matrix @ query
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(int(row), float(scores[row])) for row in ranked]
+
+
+def quantization_recall(
+    index: "VectorIndex", query_embeddings: Sequence[Sequence[float]], k: int = 20
+) -> Dict[str, float]:
+    """
+    Recall@k of each quantized first pass against the exact float32 scan.
+
+    Args:
+        index: An index built with quantized codes (opened with any mode)
+        query_embeddings: Embeddings of representative queries
+        k: Cut-off
+
+    Returns:
+        Dict of quantization mode -> mean recall@k (1.0 means identical top k)
+    """
+    exact = VectorIndex(index.path, index.meta, index.node_ids, index.matrix)
+    truth = [{row for row, _ in hits} for hits in exact.search_many(query_embeddings, k)]
+    recall = {}
+    for mode in ("int8", "binary"):
+        quantized = VectorIndex.open(index.path, quantization=mode)
+        if quantized.quantization != mode:
+            continue
+        found = [{row for row, _ in hits} for hits in quantized.search_many(query_embeddings, k)]
+        recall[mode] = float(np.mean([len(f & t) / max(len(t), 1) for f, t in zip(found, truth)]))
+    return recall
@@ -0,0 +1,40 @@
+test_cases = [
+    {
+        "name": "Digital Assets in Istisna'a",
+        "standard_id": "10",
+        "trigger_scenario": """A financial institution wants to structure an Istisna'a contract for the development 
+                              of a large-scale AI software platform. The current wording of FAS 10 on 'well-defined 
+                              subject matter' and 'determination of cost' is causing uncertainty for intangible assets 
+                              like software development."""
+    },
+    {
+        "name": "Tokenized Mudarabah Investments",
+        "standard_id": "4",
+        "trigger_scenario": """Fintech platforms are offering investment in tokenized Mudarabah funds where investors can 
+                              buy/sell fractional ownership tokens on blockchain networks. FAS 4 needs clarification on 
+                              how to handle these digital representations of investment units and profit distribution in 
+                              real-time token trading scenarios."""
+    },
+    {
+        "name": "Green Sukuk Environmental Impact",
+        "standard_id": "32",
+        "trigger_scenario": """Islamic financial institutions are increasingly issuing 'Green Sukuk' to fund 
+                              environmentally sustainable projects, but FAS 32 lacks specific guidance on how to account 
+                              for and report environmental impact metrics alongside financial returns."""
+    },
+    {
+        "name": "Digital Banking Services in Ijarah",
+        "standard_id": "28",
+        "trigger_scenario": """Islamic banks are offering digital banking services through cloud-based infrastructure 
+                              leased through Ijarah arrangements. FAS 28 needs enhancement to address how to classify, 
+                              recognize, and measure these digital service agreements which may include both tangible 
+                              and intangible components."""
+    },
+    {
+        "name": "Cryptocurrency Zakat Calculation",
+        "standard_id": "7",
+        "trigger_scenario": """Islamic financial institutions holding cryptocurrencies as assets need guidance on how 
+                              to calculate and distribute Zakat on these volatile digital assets. The current FAS 7 
+                              doesn't address value fluctuations and verification methods specific to crypto assets."""
+    }
+]
@@ -0,0 +1,133 @@
+"""
+Process-wide circuit breaker around the upstream LLM.
+
+When Gemini degrades, every agent retrying on its own keeps hammering it and
+keeps callers waiting through minutes of backoff. The breaker counts
+consecutive failed model requests across all agents:
+
+    closed     requests go through; LLM_BREAKER_FAILURES consecutive failures
+               (default 5) open the circuit
+    open       requests fail immediately with ``CircuitOpenError`` for
+               LLM_BREAKER_RECOVERY_SECONDS (default 30)
+    half-open  after that, LLM_BREAKER_PROBES requests (default 1) are let
+               through as probes; a success closes the circuit, a failure
+               opens it again for another recovery period
+
+``CircuitOpenError`` is not retried, so workflows fail fast and can return
+what they have so far.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.environ.get("LLM_BREAKER_FAILURES", "5"))
+RECOVERY_SECONDS = float(os.environ.get("LLM_BREAKER_RECOVERY_SECONDS", "30"))
+HALF_OPEN_PROBES = int(os.environ.get("LLM_BREAKER_PROBES", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """The upstream LLM is failing; the request was not sent."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing."""
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        recovery_seconds: float = RECOVERY_SECONDS,
+        half_open_probes: int = HALF_OPEN_PROBES,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.recovery_seconds:
+            self._state = HALF_OPEN
+            self._half_opened_at = now
+            self._probes = 0
+        elif self._state == HALF_OPEN and now - self._half_opened_at >= self.recovery_seconds:
+            # A probe that never reported back (cancelled caller) must not wedge the circuit
+            self._half_opened_at = now
+            self._probes = 0
+
+    def before_call(self) -> None:
+        """Admit a request or raise ``CircuitOpenError``."""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._maybe_half_open(now)
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+            self.rejected += 1
+            since = self._opened_at if self._state == OPEN else self._half_opened_at
+            retry_in = max(self.recovery_seconds - (now - since), 0.0)
+        raise CircuitOpenError(f"LLM circuit is open after repeated upstream failures; retry in {retry_in:.0f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("LLM circuit closed: upstream recovered")
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                logger.warning(
+                    f"LLM circuit opened after {self._failures} consecutive failures; "
+                    f"failing fast for {self.recovery_seconds:.0f}s"
+                )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """The process-wide LLM circuit breaker, created on first use."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
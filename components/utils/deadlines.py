@@ -0,0 +1,109 @@
+"""
+Deadlines that bound a whole workflow's LLM work.
+
+A deadline is a context variable, so it follows ``await``,
+``asyncio.gather``, ``asyncio.to_thread`` and Starlette's threadpool like
+the telemetry phase does. Every LLM call made under it checks the time left
+before each attempt, caps its retry backoff and rate-limiter wait at that
+time, and fails with ``DeadlineExceeded`` once it is spent instead of
+retrying for minutes. Nested deadlines can only shorten the outer one.
+
+    with deadline(120):
+        result = await orchestrator.run_enhancement_workflow(...)
+
+    LLM_CALL_TIMEOUT_SECONDS - upper bound of a single model request
+                               (default 120)
+
+Blocking calls are bounded with ``call_within_deadline``: when the deadline
+is closer than the per-call bound, the call runs on a worker thread and the
+caller stops waiting once the deadline passes.
+"""
+
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+CALL_TIMEOUT_SECONDS = float(os.environ.get("LLM_CALL_TIMEOUT_SECONDS", "120"))
+DEADLINE_WORKERS = int(os.environ.get("LLM_DEADLINE_WORKERS", "16"))
+
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The time budget of the current workflow is spent."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Bound the work in this block to ``seconds`` (``None`` or <= 0: no new bound)."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def check_deadline(what: str = "LLM call") -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+
+def call_timeout() -> float:
+    """Time allowed for the next model request: the per-call bound or what is left."""
+    left = remaining()
+    return CALL_TIMEOUT_SECONDS if left is None else max(min(CALL_TIMEOUT_SECONDS, left), 0.0)
+
+
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=DEADLINE_WORKERS, thread_name_prefix="llm-deadline"
+                )
+    return _executor
+
+
+def call_within_deadline(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Blocking ``fn(*args, **kwargs)``, given up with ``DeadlineExceeded`` once
+    the current deadline passes.
+
+    Without a deadline closer than ``CALL_TIMEOUT_SECONDS`` the call runs
+    inline; the client's own request timeout bounds it. Otherwise it runs on
+    a worker thread (in a copy of this context), and an abandoned call
+    finishes there within the client timeout.
+    """
+    timeout = call_timeout()
+    if timeout >= CALL_TIMEOUT_SECONDS:
+        return fn(*args, **kwargs)
+    future = _get_executor().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        if future.done():
+            raise  # fn's own timeout, not the deadline
+        future.cancel()
+        raise DeadlineExceeded("Deadline exceeded during LLM call") from None
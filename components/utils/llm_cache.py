@@ -0,0 +1,168 @@
+"""
+Content-addressed cache for chat model responses.
+
+Test suites, evaluation reruns and UI regenerations send byte-identical
+prompts to Gemini again and again. Responses are stored in SQLite under a
+hash of the model configuration (model id, generation parameters, bound
+tools) and the canonical message list, so an identical request is answered
+from disk in milliseconds without spending quota.
+
+Configuration:
+    LLM_CACHE              - "off" disables the cache (default "on")
+    LLM_CACHE_TTL_SECONDS  - entry lifetime (default one week)
+    LLM_CACHE_MAX_ENTRIES  - size bound, least recently used entries go first
+    LLM_CACHE_BYPASS       - "1" skips cache reads (fresh answers still
+                             refresh the cache); checked on every call
+
+Code that must see fresh answers can also wrap the work in
+``with bypass_llm_cache():`` or pass ``bypass_cache=True`` to
+``Agent._invoke_with_retry``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    convert_to_messages,
+    message_to_dict,
+    messages_from_dict,
+)
+
+from components.utils.sqlite_cache import SqliteCache, default_cache_path
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "on").lower() not in ("off", "0", "false")
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Within this block, LLM calls skip cache reads (results are still stored)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    return _bypass.get() or os.environ.get("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+
+def model_fingerprint(llm: Any) -> str:
+    """
+    Stable description of everything about a chat model that shapes its answer.
+
+    Handles plain chat models and ``bind_tools`` bindings (whose ``kwargs``
+    hold the converted tool schemas).
+    """
+    bound = getattr(llm, "bound", llm)
+    params = getattr(bound, "_identifying_params", None) or {"model": getattr(bound, "model", type(bound).__name__)}
+    return json.dumps(
+        {"model": params, "bound": getattr(llm, "kwargs", {})},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _canonical_messages(messages: Any) -> List[dict]:
+    if isinstance(messages, str):
+        messages = [HumanMessage(content=messages)]
+    elif hasattr(messages, "to_messages"):
+        messages = messages.to_messages()
+    canonical = []
+    for message in convert_to_messages(messages):
+        record = {"type": message.type, "content": message.content}
+        if message.name:
+            record["name"] = message.name
+        # Message and tool call ids are random per run and don't change the answer
+        if getattr(message, "tool_calls", None):
+            record["tool_calls"] = [{"name": call["name"], "args": call["args"]} for call in message.tool_calls]
+        if getattr(message, "tool_call_id", None):
+            record["tool_call_id"] = message.tool_call_id
+        canonical.append(record)
+    return canonical
+
+
+def request_key(llm: Any, messages: Any) -> str:
+    """Hash identifying a request: same key, same model configuration and messages."""
+    payload = json.dumps(
+        {"model": model_fingerprint(llm), "messages": _canonical_messages(messages)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Persistent map from (model fingerprint, messages) to the model's reply."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[float] = LLM_CACHE_TTL_SECONDS,
+        max_entries: Optional[int] = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self._store = SqliteCache(
+            path or default_cache_path("llm_responses.sqlite"),
+            table="responses",
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, llm: Any, messages: Any) -> str:
+        return request_key(llm, messages)
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        blob = self._store.get(key)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        message = messages_from_dict([json.loads(blob)])[0]
+        message.response_metadata["llm_cache"] = "hit"
+        return message
+
+    def put(self, key: str, message: BaseMessage) -> None:
+        # Empty replies are usually safety blocks or truncation; let the next call retry
+        if not message.content and not getattr(message, "tool_calls", None):
+            return
+        self._store.set(key, json.dumps(message_to_dict(message), default=str).encode("utf-8"))
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Shared response cache, created on first use; None when LLM_CACHE=off."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache()
+    return _cache
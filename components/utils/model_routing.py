@@ -0,0 +1,140 @@
+"""
+Routing of agent LLM calls to model tiers.
+
+Every agent used to send every request to the same Gemini model. Mechanical
+steps (extracting clauses, scoring a debate, parsing product requirements)
+do not need the reasoning model, so they are
+routed to a cheaper, lower-latency tier:
+
+    reasoning  LLM_REASONING_MODEL (default gemini-2.5-flash-preview-04-17)
+               proposal generation, expert analysis, everything not routed
+    fast       LLM_FAST_MODEL (default gemini-2.0-flash-lite)
+
+Routes are looked up as "AgentClass.method" and then "AgentClass" (through
+the agent's base classes); the method is the innermost ``@llm_task`` method
+running in the current context. ``DEFAULT_ROUTES`` holds the built-in table.
+
+    LLM_ROUTES  - comma-separated overrides, e.g.
+                  "ScoringAgent.score_debate=reasoning,ClauseExtractorAgent=fast"
+    LLM_ROUTING - "off" sends every call to the reasoning tier
+
+With ``LLM_BACKEND=offline`` both tiers are offline models; the fast one
+answers in ``OFFLINE_LLM_FAST_LATENCY_MS`` (default a quarter of
+``OFFLINE_LLM_LATENCY_MS``). The tier and model of each call are recorded in
+the LLM telemetry.
+"""
+
+import functools
+import inspect
+import os
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+REASONING = "reasoning"
+FAST = "fast"
+TIERS = (REASONING, FAST)
+
+TIER_MODELS = {
+    REASONING: os.environ.get("LLM_REASONING_MODEL", "gemini-2.5-flash-preview-04-17"),
+    FAST: os.environ.get("LLM_FAST_MODEL", "gemini-2.0-flash-lite"),
+}
+
+DEFAULT_ROUTES = {
+    "ClauseExtractorAgent.extract_clauses": FAST,
+    "ScoringAgent.score_debate": FAST,
+    "ProductDesignAdvisorAgent.extract_requirements_from_query": FAST,
+}
+
+ROUTING_ENABLED = os.environ.get("LLM_ROUTING", "on").lower() not in ("off", "0", "false")
+
+
+def _parse_routes(spec: str) -> Dict[str, str]:
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        target, _, tier = item.partition("=")
+        tier = tier.strip().lower()
+        if tier not in TIERS:
+            raise ValueError(f"LLM_ROUTES: unknown tier {tier!r} for {target.strip()!r}; expected one of {TIERS}")
+        routes[target.strip()] = tier
+    return routes
+
+
+ROUTES = {**DEFAULT_ROUTES, **_parse_routes(os.environ.get("LLM_ROUTES", ""))}
+
+_task: ContextVar[Optional[str]] = ContextVar("llm_task", default=None)
+
+
+def current_task() -> Optional[str]:
+    return _task.get()
+
+
+def llm_task(fn: Callable) -> Callable:
+    """Mark an agent method as a routable task: its LLM calls are routed by its name."""
+    name = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            token = _task.set(name)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _task.reset(token)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _task.set(name)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _task.reset(token)
+    return wrapper
+
+
+def route(agent_class: type, task: Optional[str] = None) -> str:
+    """Tier for a call by ``agent_class`` within ``task`` (default: the current task)."""
+    if not ROUTING_ENABLED:
+        return REASONING
+    task = task if task is not None else current_task()
+    for cls in agent_class.__mro__:
+        if task and f"{cls.__name__}.{task}" in ROUTES:
+            return ROUTES[f"{cls.__name__}.{task}"]
+        if cls.__name__ in ROUTES:
+            return ROUTES[cls.__name__]
+    return REASONING
+
+
+def _build_model(tier: str) -> Any:
+    if os.environ.get("LLM_BACKEND", "gemini").lower() == "offline":
+        from components.utils.offline_llm import OfflineChatModel
+
+        return OfflineChatModel.from_env(tier)
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    from components.utils.deadlines import CALL_TIMEOUT_SECONDS
+
+    return ChatGoogleGenerativeAI(
+        model=TIER_MODELS[tier],
+        api_key=os.environ["GEMINI_API_KEY"],
+        timeout=CALL_TIMEOUT_SECONDS,
+    )
+
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+
+def get_chat_model(tier: str = REASONING) -> Any:
+    """The process-wide chat model of ``tier``, created on first use."""
+    model = _models.get(tier)
+    if model is None:
+        with _models_lock:
+            model = _models.get(tier)
+            if model is None:
+                if tier not in TIERS:
+                    raise ValueError(f"Unknown model tier {tier!r}; expected one of {TIERS}")
+                model = _models[tier] = _build_model(tier)
+    return model
@@ -0,0 +1,327 @@
+"""
+Deterministic offline stand-in for the Gemini chat model.
+
+With ``LLM_BACKEND=offline`` every agent talks to ``OfflineChatModel``
+instead of Gemini. It answers from templates in the formats the agents
+parse ("THE CORRECT STANDARD IS:", "Proposal 1:", "ANALYSIS:/CONCERNS:/
+RECOMMENDATIONS:", "THE FINAL SCORE IS:", compatibility matrices, validation
+decisions, the reviewer's and other JSON replies), so whole workflows run with no network and no quota. That
+makes it the baseline for measuring the orchestration, retrieval and parsing
+overhead of the system itself (see ``utils/orchestration_benchmark.py``).
+
+Replies depend only on the prompt, so the same request always gets the same
+answer. Latency and failures are simulated:
+
+    OFFLINE_LLM_LATENCY_MS  - mean time per call (default 0)
+    OFFLINE_LLM_FAST_LATENCY_MS - mean time per call of the "fast" routing
+                              tier (default a quarter of the above)
+    OFFLINE_LLM_JITTER      - +/- fraction of the latency (default 0.2)
+    OFFLINE_LLM_FAILURE_RATE - probability that a call raises (default 0)
+    OFFLINE_LLM_SEED        - seed for latency jitter and failures (default 0)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from components.retrieval.context_packer import estimate_tokens
+
+STANDARDS = {
+    "4": ("Musharaka Financing", ("musharaka", "partnership", "diminishing")),
+    "7": ("Salam and Parallel Salam", ("salam",)),
+    "10": ("Istisna'a and Parallel Istisna'a", ("istisna", "construction", "manufactur")),
+    "28": ("Murabaha and Other Deferred Payment Sales", ("murabaha", "deferred payment", "cost-plus")),
+    "32": ("Ijarah", ("ijarah", "lease", "leasing")),
+}
+
+
+class OfflineLLMError(RuntimeError):
+    """Simulated backend failure."""
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _pick_standards(text: str) -> List[str]:
+    """Standards named in the prompt, most mentioned first; a stable pick if none."""
+    lowered = text.lower()
+    counts = {}
+    for standard_id, (_, keywords) in STANDARDS.items():
+        hits = len(re.findall(rf"\bfas\s*{standard_id}\b", lowered)) + sum(lowered.count(k) for k in keywords)
+        if hits:
+            counts[standard_id] = hits
+    ranked = sorted(counts, key=counts.get, reverse=True)
+    ids = list(STANDARDS)
+    for offset in range(len(ids)):
+        if len(ranked) >= 2:
+            break
+        candidate = ids[(_digest(text) + offset) % len(ids)]
+        if candidate not in ranked:
+            ranked.append(candidate)
+    return ranked
+
+
+def _transaction_analysis(text: str, standards: List[str]) -> str:
+    first, second = standards[0], standards[1]
+    return f"""THE CORRECT STANDARD IS: FAS {first}
+
+**1. Transaction Summary:** The transaction reverses entries recognised under the {STANDARDS[first][0]} arrangement.
+
+**2. Applicable Standards:**
+1. **FAS {first}: {STANDARDS[first][0]}** - 85% Probability
+2. **FAS {second}: {STANDARDS[second][0]}** - 15% Probability
+
+**3. Detailed Reasoning:**
+**FAS {first}: {STANDARDS[first][0]}** (85%): The contract terms and journal entries match the recognition and derecognition requirements of FAS {first}.
+**FAS {second}: {STANDARDS[second][0]}** (15%): Parts of the arrangement resemble FAS {second}, but its core conditions are not met.
+"""
+
+
+def _expert_contribution(text: str, standards: List[str]) -> str:
+    return f"""ANALYSIS:
+The proposal addresses the gap identified for FAS {standards[0]} and keeps the terminology of the standard.
+
+CONCERNS:
+1. The proposed wording may overlap with existing requirements of FAS {standards[1]}.
+2. Transition guidance for existing contracts is not specified.
+
+RECOMMENDATIONS:
+1. Add a cross-reference to FAS {standards[1]} to avoid conflicting treatment.
+2. Include an illustrative example of the revised accounting entries.
+"""
+
+
+def _proposal(text: str, standards: List[str]) -> str:
+    standard = standards[0]
+    return f"""Proposal 1: Clarification of recognition under FAS {standard}
+Original Text Snippet (if applicable)
+Original Text: N/A - New section/clause
+Proposed Modified or New Text
+Proposed Text: The institution shall recognise the asset when control transfers and shall disclose the basis used to determine that point.
+Rationale
+The scenario is not addressed explicitly by FAS {standard}; stating the recognition point removes the ambiguity.
+
+Proposal 2: Disclosure of digital arrangements
+Original Text Snippet (if applicable)
+Original Text: N/A - New section/clause
+Proposed Modified or New Text
+Proposed Text: Where the arrangement is executed or recorded on a digital platform, the institution shall disclose the platform and the governing terms.
+Rationale
+Improves transparency without changing the measurement requirements of FAS {standard}.
+"""
+
+
+def _cross_standard(text: str, standards: List[str]) -> str:
+    rows = []
+    for standard_id in STANDARDS:
+        if standard_id == standards[0]:
+            continue
+        level, kind = ("Medium", "Synergy") if standard_id == standards[1] else ("Low", "None")
+        rows.append(f"| FAS {standard_id} | {level} | {kind} |")
+    return f"""1. Summary: The enhancement clarifies FAS {standards[0]}.
+
+2. Cross-Standard Impact Analysis: The change is consistent with the shared principles of the related standards; FAS {standards[1]} benefits from the clarified recognition point.
+
+3. Compatibility Matrix
+| Standard | Impact Level | Impact Type |
+|---|---|---|
+""" + "\n".join(rows) + f"""
+
+4. Recommendations: Align the definitions in FAS {standards[1]} with the enhanced text.
+"""
+
+
+def _validation(text: str, standards: List[str]) -> str:
+    return f"""1. Shariah Compliance: The proposal avoids Riba, Gharar and Maysir.
+2. Internal Consistency: Consistent with the remaining requirements of FAS {standards[0]}.
+3. Practical Implementation: Institutions can apply the guidance with existing systems.
+4. Final Decision: APPROVED
+
+The enhancement is approved with minor editorial suggestions.
+"""
+
+
+def _final_score(text: str, standards: List[str]) -> str:
+    score = 2 + _digest(text) % 3
+    return f"""THE FINAL SCORE IS: {score}
+The response identifies the relevant standard (FAS {standards[0]}) and applies its requirements with minor omissions.
+"""
+
+
+def _debate_summary(text: str, standards: List[str]) -> str:
+    score = 6 + _digest(text) % 4
+    return f"""Debate Summary
+Key strength: the response applies FAS {standards[0]} correctly to the scenario.
+Key weakness: the treatment of related FAS {standards[1]} requirements is limited.
+Overall Score: {score}/10
+"""
+
+
+def _review(text: str, standards: List[str]) -> str:
+    first, second = standards[0], standards[1]
+    return json.dumps({
+        "analysis": (
+            f"FAS {first} ({STANDARDS[first][0]}) does not state when control transfers in the scenario "
+            f"described, and its disclosure requirements for related FAS {second} arrangements are limited."
+        ),
+        "enhancement_areas": [
+            f"Timing of control transfer under FAS {first}",
+            f"Disclosure of related FAS {second} arrangements",
+            "Measurement of subsequent contract modifications",
+        ],
+    })
+
+
+def _json_reply(text: str, standards: List[str]) -> str:
+    if "clause_id" in text:
+        return json.dumps([{"clause_id": "1", "proposed_text": f"Clarified requirement for FAS {standards[0]}."}])
+    return json.dumps({})
+
+
+def _compliance_sections(text: str, standards: List[str]) -> str:
+    return f"""COMPLIANCE_CHECKPOINTS:
+- Asset ownership is established before sale (FAS {standards[0]})
+POTENTIAL_CONCERNS:
+- Late payment penalties must be donated to charity
+RISK_MITIGATION:
+- Obtain a Shariah board review of the contract templates
+NEXT_STEPS:
+- Draft the product term sheet
+"""
+
+
+def _contracts(text: str, standards: List[str]) -> str:
+    return f"""RECOMMENDED_CONTRACTS: {STANDARDS[standards[0]][0]}, {STANDARDS[standards[1]][0]}
+RATIONALE: The objectives match the risk sharing and ownership transfer of FAS {standards[0]}.
+"""
+
+
+def _general(text: str, standards: List[str]) -> str:
+    first, second = standards[0], standards[1]
+    return f"""Analysis of FAS {first} ({STANDARDS[first][0]}):
+- The standard does not state when control transfers in the scenario described.
+- Disclosure requirements for related FAS {second} arrangements are limited.
+- Measurement guidance for subsequent changes to the contract is incomplete.
+
+Accounting treatment: recognise the asset under FAS {first} at cost and disclose the contract terms.
+"""
+
+
+# Format instructions that identify the request; the first match wins. Ordered
+# so that prompts quoting an earlier agent's output (experts, the validator and
+# the cross-standard analyzer all quote "Proposal 1: ...") still match their own
+TEMPLATES = (
+    (re.compile(r"THE FINAL SCORE IS"), _final_score),
+    (re.compile(r"THE CORRECT STANDARD IS"), _transaction_analysis),
+    (re.compile(r"compatibility matrix", re.IGNORECASE), _cross_standard),
+    (re.compile(r"NEEDS REVISION"), _validation),
+    (re.compile(r"^\s*RECOMMENDATIONS:", re.MULTILINE), _expert_contribution),
+    (re.compile(r"Proposal 1:"), _proposal),
+    (re.compile(r'"enhancement_areas": \['), _review),
+    (re.compile(r"score \(0-10\)"), _debate_summary),
+    (re.compile(r"COMPLIANCE_CHECKPOINTS"), _compliance_sections),
+    (re.compile(r"RECOMMENDED_CONTRACTS"), _contracts),
+    (re.compile(r"JSON"), _json_reply),
+)
+
+
+def render_completion(messages: List[BaseMessage]) -> str:
+    """The offline reply to ``messages``."""
+    text = "\n".join(str(message.content) for message in messages)
+    standards = _pick_standards(text)
+    for marker, template in TEMPLATES:
+        if marker.search(text):
+            return template(text, standards)
+    return _general(text, standards)
+
+
+class OfflineChatModel(BaseChatModel):
+    """Chat model that answers from templates, with simulated latency and failures."""
+
+    model: str = "offline"
+    latency_seconds: float = 0.0
+    jitter: float = 0.2
+    failure_rate: float = 0.0
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_env(cls, tier: str = "reasoning") -> "OfflineChatModel":
+        latency_ms = float(os.environ.get("OFFLINE_LLM_LATENCY_MS", "0"))
+        if tier == "fast":
+            latency_ms = float(os.environ.get("OFFLINE_LLM_FAST_LATENCY_MS", latency_ms / 4))
+        return cls(
+            model="offline" if tier == "reasoning" else f"offline-{tier}",
+            latency_seconds=latency_ms / 1000,
+            jitter=float(os.environ.get("OFFLINE_LLM_JITTER", "0.2")),
+            failure_rate=float(os.environ.get("OFFLINE_LLM_FAILURE_RATE", "0")),
+            seed=int(os.environ.get("OFFLINE_LLM_SEED", "0")),
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model}
+
+    def bind_tools(self, tools, **kwargs):
+        # Tools are accepted so tool-using agents can be built; the templates never call them
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _next_call(self) -> tuple:
+        """(delay, fails) for the next call, from the seeded generator."""
+        with self._rng_lock:
+            spread = self._rng.uniform(-self.jitter, self.jitter)
+            fails = self._rng.random() < self.failure_rate
+        return max(self.latency_seconds * (1 + spread), 0.0), fails
+
+    def _result(self, messages: List[BaseMessage], fails: bool) -> ChatResult:
+        if fails:
+            raise OfflineLLMError("503 simulated offline backend failure")
+        content = render_completion(messages)
+        message = AIMessage(content=content, usage_metadata=self._usage(messages, content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _usage(messages: List[BaseMessage], content: str) -> dict:
+        input_tokens = estimate_tokens("".join(str(message.content) for message in messages))
+        output_tokens = estimate_tokens(content)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        delay, fails = self._next_call()
+        time.sleep(delay)
+        return self._result(messages, fails)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        delay, fails = self._next_call()
+        await asyncio.sleep(delay)
+        return self._result(messages, fails)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        # The latency is time to first token; the rest arrives line by line
+        content = self._generate(messages, stop=stop, **kwargs).generations[0].message.content
+        lines = content.splitlines(keepends=True)
+        for i, line in enumerate(lines):
+            usage = self._usage(messages, content) if i == len(lines) - 1 else None
+            yield ChatGenerationChunk(message=AIMessageChunk(content=line, usage_metadata=usage))
@@ -0,0 +1,190 @@
+"""
+Process-wide token-bucket rate limiter for LLM calls.
+
+Every agent shares one limiter that knows the Gemini quotas. It is opt-in:
+quotas depend on the key's tier, so both limits are off until set.
+
+    LLM_REQUESTS_PER_MINUTE   - request quota (default 0, no limit; the free
+                                tier allows 10)
+    LLM_TOKENS_PER_MINUTE     - input+output token quota (default 0, no limit;
+                                the free tier allows 250000)
+    LLM_EXPECTED_OUTPUT_TOKENS - output tokens reserved per call before the
+                                 real usage is known (default 1000)
+
+A caller reserves capacity before it sends a request. Reservations are
+granted in arrival order: each one is taken from the bucket immediately,
+possibly driving it negative, and the caller waits until the bucket has
+refilled past its reservation. Concurrent callers therefore queue fairly
+instead of all firing and all getting 429s. ``acquire`` blocks the thread;
+``aacquire`` waits with ``asyncio.sleep`` so the event loop keeps running.
+
+After the call, the token reservation is corrected with the usage Gemini
+reports. A 429 pauses the whole limiter for the server's retry delay, so
+every agent backs off together; the pause applies even when no quota is
+configured. A caller with a deadline (see
+components/utils/deadlines.py) whose wait would outlast it is shed at once
+with ``DeadlineExceeded`` instead of queueing.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from components.utils.deadlines import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))
+TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", "0"))
+EXPECTED_OUTPUT_TOKENS = int(os.environ.get("LLM_EXPECTED_OUTPUT_TOKENS", "1000"))
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``rate`` units per second, up to ``capacity``."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` now and return the seconds until it is covered."""
+        self._refill(now)
+        self._level -= amount
+        return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def refund(self, amount: float, now: float) -> None:
+        """Return capacity (negative ``amount`` charges extra)."""
+        self._refill(now)
+        self._level = min(self.capacity, self._level + amount)
+
+    def drain_until(self, until: float, now: float) -> None:
+        """Make the bucket empty until ``until``."""
+        self._refill(now)
+        self._level = min(self._level, -(until - now) * self.rate)
+
+
+@dataclass
+class Reservation:
+    """Capacity taken for one request; settle it with the real token usage."""
+    tokens: int
+    wait_seconds: float
+
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter."""
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE, tokens_per_minute: float = TOKENS_PER_MINUTE):
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute > 0 else None
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.shed = 0
+
+    def reserve(self, tokens: int) -> Reservation:
+        """Take capacity for one request of about ``tokens`` tokens, in arrival order."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, 0.0)
+            if self._requests is not None:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            self.requests += 1
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+        if wait > 1:
+            logger.info(f"Rate limiter: waiting {wait:.1f}s for LLM quota")
+        return Reservation(tokens=tokens, wait_seconds=wait)
+
+    def _shed(self, reservation: Reservation, max_wait: Optional[float]) -> None:
+        """Give up a request whose wait would exceed ``max_wait``."""
+        if max_wait is not None and reservation.wait_seconds > max_wait:
+            self.cancel(reservation)
+            with self._lock:
+                self.shed += 1
+                self.waits -= 1
+                self.wait_seconds -= reservation.wait_seconds
+            raise DeadlineExceeded(
+                f"LLM quota frees up in {reservation.wait_seconds:.1f}s, after the deadline ({max(max_wait, 0):.1f}s left)"
+            )
+
+    def acquire(self, tokens: int, max_wait: Optional[float] = None) -> Reservation:
+        """
+        Block until a request of about ``tokens`` tokens fits in the quotas.
+
+        Raises ``DeadlineExceeded`` at once, without taking capacity, if that
+        would take longer than ``max_wait`` seconds.
+        """
+        reservation = self.reserve(tokens)
+        self._shed(reservation, max_wait)
+        if reservation.wait_seconds > 0:
+            time.sleep(reservation.wait_seconds)
+        return reservation
+
+    async def aacquire(self, tokens: int, max_wait: Optional[float] = None) -> Reservation:
+        """``acquire`` for coroutines; waits without blocking the event loop."""
+        reservation = self.reserve(tokens)
+        self._shed(reservation, max_wait)
+        if reservation.wait_seconds > 0:
+            try:
+                await asyncio.sleep(reservation.wait_seconds)
+            except asyncio.CancelledError:
+                self.cancel(reservation)
+                raise
+        return reservation
+
+    def settle(self, reservation: Reservation, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the request's real usage is known."""
+        if self._tokens is None or actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens.refund(reservation.tokens - actual_tokens, time.monotonic())
+
+    def cancel(self, reservation: Reservation) -> None:
+        """Give back the capacity of a request that was never sent."""
+        with self._lock:
+            now = time.monotonic()
+            if self._requests is not None:
+                self._requests.refund(1, now)
+            if self._tokens is not None:
+                self._tokens.refund(reservation.tokens, now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for ``seconds`` (after a 429 from the server)."""
+        with self._lock:
+            now = time.monotonic()
+            extended = now + seconds > self._paused_until
+            self._paused_until = max(self._paused_until, now + seconds)
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.drain_until(now + seconds, now)
+        if extended:
+            logger.warning(f"Rate limiter: pausing LLM calls for {seconds:.0f}s after a quota error")
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide LLM rate limiter, created on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,119 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+Two Streamlit sessions or API requests that send the same prompt at the
+same time would otherwise both pay for the model call: the response cache
+only helps once the first one has finished. With single-flight, the first
+caller for a key makes the call and everyone who asks for the same key
+while it is in flight waits for that result (or exception) instead.
+
+``SingleFlight`` coalesces across threads; ``AsyncSingleFlight`` coalesces
+coroutines on the same event loop. The in-flight call of the async variant
+runs as its own task, so a waiter that is cancelled does not cancel the
+call for the others.
+
+    LLM_SINGLE_FLIGHT - "off" disables coalescing of LLM calls (default "on")
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+SINGLE_FLIGHT_ENABLED = os.environ.get("LLM_SINGLE_FLIGHT", "on").lower() not in ("off", "0", "false")
+
+
+class _Call:
+    """One in-flight call and the callers sharing it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return ``fn()``, or the result of the identical call already in flight.
+
+        Returns:
+            (result, shared) where ``shared`` tells whether other callers
+            received the same result object
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, call.waiters > 0
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for coroutines; calls are shared per event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[int, Hashable], list] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async ``SingleFlight.do``; ``fn`` returns the coroutine to run."""
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        with self._lock:
+            entry = self._calls.get(slot)
+            if entry is None:
+                task = loop.create_task(fn())
+                # [task, number of callers that joined it]
+                entry = self._calls[slot] = [task, 0]
+                task.add_done_callback(lambda _: self._forget(slot))
+            else:
+                entry[1] += 1
+                self.coalesced += 1
+        result = await asyncio.shield(entry[0])
+        return result, entry[1] > 0
+
+    def _forget(self, slot) -> None:
+        with self._lock:
+            self._calls.pop(slot, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Shared by every agent in the process
+llm_calls = SingleFlight()
+async_llm_calls = AsyncSingleFlight()
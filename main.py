@@ -22,6 +22,10 @@ from utils.transaction_tests import run_category2_tests
 from utils.verify_compliance import verify_document_compliance
 from utils.compliance_tests import run_compliance_tests
 from utils.enhancement_tests import run_category3_tests
+from utils.quantization_tests import run_quantization_recall_tests
+from utils.embedding_benchmark import run_embedding_benchmark
+from utils.retrieval_benchmark import run_retrieval_benchmark
+from utils.orchestration_benchmark import run_orchestration_benchmark
 
 # Load environment variables
 load_dotenv()
@@ -109,10 +113,48 @@ if __name__ == "__main__":
         default="json",
         help="Output format for compliance test results"
     )
+    # Retrieval arguments
+    parser.add_argument(
+        "--quantization-recall",
+        action="store_true",
+        help="Measure recall@20 of the int8/binary vector index first pass on the test queries",
+    )
+    parser.add_argument(
+        "--embedding-benchmark",
+        action="store_true",
+        help="Compare embedding models/backends (recall@20 vs bge-large, encode latency)",
+    )
+    parser.add_argument(
+        "--retrieval-benchmark",
+        action="store_true",
+        help="Benchmark retrieval modes on labeled test cases (recall@k, MRR, latency, peak RSS)",
+    )
+    parser.add_argument(
+        "--orchestration-benchmark",
+        action="store_true",
+        help="Load-test the agent workflows on the offline LLM backend (throughput, latency percentiles)",
+    )
+    # LLM arguments
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ignore cached LLM responses and query the model again",
+    )
     
     args = parser.parse_args()
 
-    if args.compliance_tests or args.compliance_verbose:
+    if args.fresh:
+        os.environ["LLM_CACHE_BYPASS"] = "1"
+
+    if args.quantization_recall:
+        run_quantization_recall_tests()
+    elif args.embedding_benchmark:
+        run_embedding_benchmark()
+    elif args.retrieval_benchmark:
+        run_retrieval_benchmark()
+    elif args.orchestration_benchmark:
+        run_orchestration_benchmark()
+    elif args.compliance_tests or args.compliance_verbose:
         run_compliance_tests(
             verbose=args.compliance_verbose,
             output_format=args.compliance_output
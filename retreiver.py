@@ -1,23 +1,38 @@
-from llama_index.core import StorageContext, load_index_from_storage
-from llama_index.core.retrievers import VectorIndexRetriever
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+import logging
+import time
 
+_import_start = time.perf_counter()
+
+from components.retrieval.embeddings import embedding_model, load_embedding_model, resolve_model_name
+from components.retrieval.lazy import LazyRetriever
 
 
 storage_path = "./vector_db_storage/"
+# EMBED_MODEL_NAME / EMBED_BACKEND select the model and CPU backend (see components/retrieval/embeddings.py)
+embed_model_name = resolve_model_name()
+
+
+def load_embed_model():
+    return load_embedding_model(embed_model_name)
 
-storage_context = StorageContext.from_defaults(persist_dir=storage_path)
 
-# Load the index from storage
+def _load_retriever():
+    # Heavy imports live here so importing this module stays cheap
+    from components.retrieval.retriever import load_standards_retriever
 
+    # The embedding model is only loaded once a dense or hybrid query needs it,
+    # so RETRIEVAL_MODE=sparse hosts never pay for it
+    embed_model = embedding_model(embed_model_name)
 
-embed_model = HuggingFaceEmbedding(
-    model_name="BAAI/bge-large-en-v1.5"
-)  # Adjust device as needed
+    # Load the docstore, BM25 index and memory-mapped vector index (built on first run)
+    return load_standards_retriever(
+        storage_path,
+        embed_model=embed_model,
+        similarity_top_k=20,  # Number of most relevant chunks to retrieve
+    )
 
-index = load_index_from_storage(storage_context, embed_model=embed_model)
 
-retriever = VectorIndexRetriever(
-    index=index,
-    similarity_top_k=20,  # Number of most relevant chunks to retrieve
-)
+# Materialized on the first retrieve() call, or explicitly via retriever.warmup()
+retriever = LazyRetriever(_load_retriever)
+retriever.timings["import_seconds"] = time.perf_counter() - _import_start
+logging.getLogger(__name__).debug(f"retreiver imported in {retriever.timings['import_seconds'] * 1000:.1f}ms")
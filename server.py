@@ -1,15 +1,35 @@
 from fastapi import FastAPI, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
+import contextvars
+import json
+import os
+import threading
 import uvicorn
 
 import enhancement
 from components.agents import transaction_analyzer, use_case_processor
+from components.agents.base_agent import LLM_UNAVAILABLE
+from components.monitoring.llm_telemetry import get_metrics_registry, workflow_trace
+from components.utils.deadlines import deadline
+from retreiver import retriever
+
+# Upper bound on the LLM work of one request (options.deadline_seconds overrides);
+# once spent the request fails fast, or returns partial results for enhance_standard
+API_DEADLINE_SECONDS = float(os.environ.get("API_DEADLINE_SECONDS", "300"))
 
 app = FastAPI(title="Islamic Finance Standards API",
               description="API for Islamic Finance Standards processing and analysis",
               version="1.0.0")
 
+@app.on_event("startup")
+async def warm_retriever():
+    """Optionally load the retriever in the background so the first request doesn't pay for it."""
+    if os.environ.get("RETRIEVER_WARMUP", "").lower() in ("1", "true", "yes"):
+        threading.Thread(target=retriever.warmup, daemon=True).start()
+
 class AgentRequest(BaseModel):
     prompt: str
     task: str
@@ -31,65 +51,30 @@ async def process_agent_request(request: AgentRequest = Body(...)):
     - analyze_transaction: Analyze Islamic finance transactions
     - process_use_case: Generate accounting guidance for Islamic finance use cases
     
-    Returns the agent's response with execution details.
+    Returns the agent's response with execution details. The request's LLM
+    work is bounded by ``options.deadline_seconds`` (default
+    ``API_DEADLINE_SECONDS``), streamed or not. With ``options.stream`` set,
+    analyze_transaction and process_use_case instead return newline-delimited
+    JSON events as the text is generated (see ``stream_agent_events``).
     """
     import time
     start_time = time.time()
     result = {}
+
+    if request.options.get("stream") and request.task in STREAMING_TASKS:
+        # Starlette iterates the sync generator in its threadpool, off the event loop
+        return StreamingResponse(stream_agent_events(request, start_time), media_type="application/x-ndjson")
     
     try:
-        if request.task == "enhance_standard":
-            # Extract standard_id and trigger_scenario from the prompt or options
-            standard_id = request.options.get("standard_id", None)
-            trigger_scenario = request.prompt
-            
-            # If standard_id not provided in options, try to find from test cases
-            if not standard_id:
-                # Try to find a matching test case based on keywords in the prompt
-                test_case = enhancement.find_test_case_by_keyword(request.prompt)
-                standard_id = test_case["standard_id"]
-            
-            # Include cross-standard analysis based on options
-            include_cross = request.options.get("include_cross_standard_analysis", True)
-            
-            # Run the enhancement process
-            result = enhancement.run_standards_enhancement(
-                standard_id=standard_id, 
-                trigger_scenario=trigger_scenario,
-                include_cross_standard_analysis=include_cross
-            )
-            
-            # Format the results for better display if needed
-            result["formatted_output"] = enhancement.format_results_for_display(result)
-            
-        elif request.task == "analyze_transaction":
-            # Process transaction analysis request
-            analysis_result = transaction_analyzer.analyze_transaction(request.prompt)
-            
-            # Get the identified standards
-            standards = analysis_result.get("identified_standards", [])
-            
-            result = {
-                "analysis": analysis_result.get("analysis", ""),
-                "identified_standards": standards,
-                "full_result": analysis_result
-            }
-            
-        elif request.task == "process_use_case":
-            # Process use case request
-            use_case_result = use_case_processor.process_use_case(request.prompt)
-            
-            result = {
-                "accounting_guidance": use_case_result.get("accounting_guidance", ""),
-                "full_result": use_case_result
-            }
-            
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown task: {request.task}")
-            
+        with deadline(float(request.options.get("deadline_seconds", API_DEADLINE_SECONDS))):
+            result = await _run_agent_task(request)
     except Exception as e:
+        error = {"error": str(e)}
+        if isinstance(e, LLM_UNAVAILABLE):
+            # The model is failing or the deadline is spent; the caller may retry later
+            error["retryable"] = True
         return {
-            "result": {"error": str(e)},
+            "result": error,
             "task": request.task,
             "execution_time": time.time() - start_time,
             "status": "error"
@@ -102,6 +87,130 @@ async def process_agent_request(request: AgentRequest = Body(...)):
         "status": "success"
     }
 
+
+async def _run_agent_task(request: AgentRequest) -> Dict[str, Any]:
+    """Run a non-streaming ``/api/agent`` task and return its result payload."""
+    result = {}
+    if request.task == "enhance_standard":
+        # Extract standard_id and trigger_scenario from the prompt or options
+        standard_id = request.options.get("standard_id", None)
+        trigger_scenario = request.prompt
+        
+        # If standard_id not provided in options, try to find from test cases
+        if not standard_id:
+            # Try to find a matching test case based on keywords in the prompt
+            test_case = enhancement.find_test_case_by_keyword(request.prompt)
+            standard_id = test_case["standard_id"]
+        
+        # Include cross-standard analysis based on options
+        include_cross = request.options.get("include_cross_standard_analysis", True)
+        
+        # Run the enhancement process off the event loop so other requests keep being served
+        result = await run_in_threadpool(
+            enhancement.run_standards_enhancement,
+            standard_id=standard_id, 
+            trigger_scenario=trigger_scenario,
+            include_cross_standard_analysis=include_cross
+        )
+        
+        # Format the results for better display if needed
+        result["formatted_output"] = enhancement.format_results_for_display(result)
+        
+    elif request.task == "analyze_transaction":
+        # Process transaction analysis request
+        with workflow_trace(request.task) as trace:
+            analysis_result = await run_in_threadpool(transaction_analyzer.analyze_transaction, request.prompt)
+        
+        # Get the identified standards
+        standards = analysis_result.get("identified_standards", [])
+        
+        result = {
+            "analysis": analysis_result.get("analysis", ""),
+            "identified_standards": standards,
+            "full_result": analysis_result,
+            "telemetry": trace.to_dict()
+        }
+        
+    elif request.task == "process_use_case":
+        # Process use case request
+        with workflow_trace(request.task) as trace:
+            use_case_result = await run_in_threadpool(use_case_processor.process_use_case, request.prompt)
+        
+        result = {
+            "accounting_guidance": use_case_result.get("accounting_guidance", ""),
+            "full_result": use_case_result,
+            "telemetry": trace.to_dict()
+        }
+        
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown task: {request.task}")
+
+    return result
+
+STREAMING_TASKS = ("analyze_transaction", "process_use_case")
+
+
+def stream_agent_events(request: AgentRequest, start_time: float) -> Iterator[str]:
+    """
+    Run a streaming task and emit one JSON event per line:
+
+        {"type": "delta", "phase": "analysis" | "draft" | "verified", "text": "..."}
+        {"type": "result", "result": {...}, "task": ..., "execution_time": ..., "status": "success"}
+        {"type": "error", "result": {"error": "..."}, "task": ..., "execution_time": ..., "status": "error"}
+
+    The result event carries the same payload as the non-streaming response.
+    """
+    # Starlette runs each step in a fresh copy of the request context; step the
+    # events in one context of their own so the deadline and trace hold across steps
+    context = contextvars.copy_context()
+    events = _agent_events(request, start_time)
+    try:
+        while True:
+            try:
+                yield context.run(next, events)
+            except StopIteration:
+                return
+    finally:
+        context.run(events.close)
+
+
+def _agent_events(request: AgentRequest, start_time: float) -> Iterator[str]:
+    import time
+    final = {}
+    try:
+        with deadline(float(request.options.get("deadline_seconds", API_DEADLINE_SECONDS))), \
+                workflow_trace(request.task) as trace:
+            if request.task == "analyze_transaction":
+                for text in transaction_analyzer.stream_analysis(request.prompt, on_complete=final.update):
+                    yield json.dumps({"type": "delta", "phase": "analysis", "text": text}) + "\n"
+                result = {
+                    "analysis": final.get("analysis", ""),
+                    "identified_standards": final.get("identified_standards", []),
+                    "full_result": final,
+                }
+            else:
+                for phase, text in use_case_processor.stream_use_case(request.prompt, on_complete=final.update):
+                    yield json.dumps({"type": "delta", "phase": phase, "text": text}) + "\n"
+                result = {
+                    "accounting_guidance": final.get("accounting_guidance", ""),
+                    "full_result": final,
+                }
+        result["telemetry"] = trace.to_dict()
+        event = {"type": "result", "result": result, "status": "success"}
+    except Exception as e:
+        event = {"type": "error", "result": {"error": str(e)}, "status": "error"}
+        if isinstance(e, LLM_UNAVAILABLE):
+            event["result"]["retryable"] = True
+    event.update({"task": request.task, "execution_time": time.time() - start_time})
+    yield json.dumps(event, default=str) + "\n"
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """LLM call metrics (latency, tokens, retries, cost per agent and phase) in the Prometheus text format."""
+    return PlainTextResponse(get_metrics_registry().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     return {
@@ -109,6 +218,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": [
             "/api/agent - Main endpoint for agent processing",
+            "/metrics - LLM call metrics in the Prometheus text format",
             "/ - This help message"
         ],
         "available_tasks": [
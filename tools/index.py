@@ -5,18 +5,23 @@ from retreiver import retriever
 
 
 @tool
-def search_standards(query: str) -> str:
+def search_standards(query: str, mode: Optional[str] = None) -> str:
     """
     Search for information within AAOIFI standards.
     
     Args:
         query: The search query to find information in AAOIFI standards.
+        mode: Optional search mode: "dense" (semantic), "sparse" (exact keyword match,
+            best for contract names and clause numbers such as 3/1/1) or "hybrid" (both).
         
     Returns:
         str: Relevant information from the standards.
     """
     # Use the retriever to get relevant chunks from standards
-    retrieved_nodes = retriever.retrieve(query)
+    try:
+        retrieved_nodes = retriever.retrieve(query, mode=mode)
+    except ValueError as e:
+        return f"Invalid search: {e}"
     
     # If no results found, return a message
     if not retrieved_nodes:
@@ -57,7 +62,7 @@ def get_standard_info(standard_id: str) -> str:
     
     # Use the retriever to get information about this specific standard
     query = f"FAS {standard_id} standard full details"
-    retrieved_nodes = retriever.retrieve(query)
+    retrieved_nodes = retriever.retrieve(query, filters={"standard_id": standard_id})
     
     # Extract text content from retrieved nodes
     results = [f"# {standard_names[standard_id]}\n"]
@@ -30,7 +30,7 @@ from ui.states.session_state import (
 )
 
 # Import our improved utils for transaction analysis
-from ui.utils.transaction_utils import analyze_transaction, DIRECT_IMPORT_AVAILABLE
+from ui.utils.transaction_utils import analyze_transaction, stream_transaction_analysis, DIRECT_IMPORT_AVAILABLE
 
 # API endpoint as fallback - but we'll try to use local methods first
 API_ENDPOINT = "http://localhost:8000/api/agent"
@@ -198,7 +198,15 @@ def process_analysis(transaction_details, analysis_method, generate_dual=False):
             st.success("Transaction analysis completed with dual perspectives!")
         else:
             # Call the analyzer with the appropriate method
-            results = analyze_transaction(transaction_details, use_api=use_api)
+            if use_api or not DIRECT_IMPORT_AVAILABLE:
+                results = analyze_transaction(transaction_details, use_api=use_api)
+            else:
+                # Show the analysis as it is generated instead of waiting for the full completion
+                results = {}
+                live_output = st.empty()
+                with live_output.container():
+                    st.write_stream(stream_transaction_analysis(transaction_details, on_complete=results.update))
+                live_output.empty()
             
             # Check if results are valid
             if not results or (isinstance(results, dict) and "error" in results):
@@ -270,8 +270,18 @@ def render_use_case_processor_page():
                         display_progress_bar(progress_container, 0.6, "Processing scenario...")
                         status_container.info("Analyzing scenario and applying standards...")
                         
-                        # Process the use case directly with the agent
-                        results = use_case_processor.process_use_case(scenario_text)
+                        # Process the use case directly with the agent, showing the
+                        # guidance as it is generated: first the draft, then the verified text
+                        results = {}
+                        live_output = st.empty()
+                        streamed = {"draft": "", "verified": ""}
+                        for phase, text in use_case_processor.stream_use_case(scenario_text, on_complete=results.update):
+                            if phase == "verified" and not streamed["verified"]:
+                                display_progress_bar(progress_container, 0.8, "Verifying guidance...")
+                                status_container.info("Checking the draft guidance against the standards...")
+                            streamed[phase] += text
+                            live_output.markdown(streamed[phase])
+                        live_output.empty()
                         
                         # Step 3: Format the results
                         display_progress_bar(progress_container, 0.9, "Preparing results...")
@@ -11,7 +11,7 @@ import traceback
 import requests
 import re
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union, Callable, Iterator
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -33,7 +33,8 @@ CHALLENGE2_OUTPUT_PATH = Path(parent_dir) / "documentation" / "agent_outputs_tex
 
 # Try to import the transaction analyzer for direct method (fallback only)
 try:
-    from components.agents.transaction_analyzer import analyze_transaction as agent_analyze_transaction
+    from components.agents.transaction_analyzer import transaction_analyzer
+    agent_analyze_transaction = transaction_analyzer.analyze_transaction
     logger.info("Successfully imported transaction analyzer for direct use.")
 except ImportError as e:
     logger.warning(f"Could not import transaction analyzer directly: {e}")
@@ -69,6 +70,38 @@ def analyze_transaction(
         logger.info("Using API method for transaction analysis")
         return analyze_with_api_method(transaction_details)
 
+def stream_transaction_analysis(
+    transaction_details: Union[str, Dict[str, Any]],
+    on_complete: Callable[[Dict[str, Any]], None]
+) -> Iterator[str]:
+    """
+    Streaming counterpart of ``analyze_transaction`` for the file-based and direct methods.
+    
+    Yields the analysis text as the agent generates it (a pre-analyzed sample
+    transaction is yielded in one piece), then calls ``on_complete`` with the
+    same dict ``analyze_transaction`` would return.
+    
+    Args:
+        transaction_details: Transaction data as either a dict or string
+        on_complete: Receives the analysis results or error information
+    """
+    if isinstance(transaction_details, dict) and transaction_details.get("name"):
+        file_results = analyze_with_file_method(transaction_details)
+        if file_results and not file_results.get("error"):
+            yield file_results["analysis"]
+            on_complete(file_results)
+            return
+    
+    try:
+        transaction_json = json.dumps(transaction_details) if isinstance(transaction_details, dict) else transaction_details
+        result = {}
+        yield from transaction_analyzer.stream_analysis(transaction_json, on_complete=result.update)
+        on_complete(extract_standards_from_analysis(result))
+    except Exception as e:
+        logger.error(f"Error in streaming transaction analysis: {str(e)}")
+        logger.error(traceback.format_exc())
+        on_complete({"error": str(e)})
+
 def analyze_with_file_method(transaction_details: Dict[str, Any]) -> Dict[str, Any]:
     """
     Analyze transaction by looking up pre-analyzed results in challenge2_output.txt file.
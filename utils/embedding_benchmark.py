@@ -0,0 +1,128 @@
+"""
+Recall/latency benchmark for the embedding model and backend choices.
+
+Every candidate (model preset + backend) embeds the repository's test queries
+one at a time, as the agents do, and retrieves the top k chunks from its own
+vector index. Recall@k is measured against bge-large on the torch backend,
+the model the standards were originally indexed with.
+"""
+
+import json
+import logging
+import os
+import statistics
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from components.retrieval.embeddings import embedding_model
+from utils.quantization_tests import test_queries
+
+logger = logging.getLogger(__name__)
+
+REFERENCE = ("bge-large", "torch")
+DEFAULT_CANDIDATES = [
+    ("bge-large", "torch"),
+    ("bge-large", "onnx"),
+    ("bge-large", "onnx-int8"),
+    ("bge-base", "torch"),
+    ("bge-base", "onnx-int8"),
+    ("bge-small", "torch"),
+    ("bge-small", "onnx-int8"),
+]
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _run_candidate(model_name: str, backend: str, queries: List[str], k: int, storage_path: str):
+    """Top-k node ids per query and encode timings for one candidate."""
+    from components.retrieval.retriever import load_standards_retriever
+
+    embed_model = embedding_model(model_name, backend)
+    load_start = time.perf_counter()
+    embed_model.get_query_embedding("warmup")
+    load_seconds = time.perf_counter() - load_start
+
+    retriever = load_standards_retriever(
+        storage_path, embed_model=embed_model, similarity_top_k=k,
+        cache_query_embeddings=False, cache_results=False, mode="dense",
+    )
+    rankings, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        embedding = embed_model.get_query_embedding(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits = retriever.index.search(embedding, k)
+        rankings.append([retriever.index.node_ids[row] for row, _ in hits])
+    return rankings, latencies, load_seconds
+
+
+def run_embedding_benchmark(
+    candidates: Optional[Sequence[Tuple[str, str]]] = None,
+    k: int = 20,
+    storage_path: str = "./vector_db_storage/",
+    output_dir: str = "results",
+):
+    """
+    Compare embedding models/backends on recall@k and per-query encode latency.
+
+    Candidates whose backend isn't installed are reported as skipped. The first
+    run of a new model embeds the docstore into that model's vector index.
+
+    Args:
+        candidates: (model preset or id, backend) pairs; defaults to DEFAULT_CANDIDATES
+        k: Cut-off for recall
+        storage_path: llama_index persist directory
+        output_dir: Directory the JSON report is written to
+    """
+    candidates = list(candidates or DEFAULT_CANDIDATES)
+    queries = test_queries()
+    print(f"Benchmarking {len(candidates)} embedding configurations on {len(queries)} test queries...")
+
+    reference, _, _ = _run_candidate(*REFERENCE, queries, k, storage_path)
+    results = []
+    for model_name, backend in candidates:
+        label = f"{model_name} [{backend}]"
+        try:
+            rankings, latencies, load_seconds = _run_candidate(model_name, backend, queries, k, storage_path)
+        except ImportError as e:
+            print(f"  {label:<28} skipped: {e}")
+            results.append({"model": model_name, "backend": backend, "skipped": str(e)})
+            continue
+
+        recall = statistics.mean(
+            len(set(ranking) & set(expected)) / len(expected) if expected else 1.0
+            for ranking, expected in zip(rankings, reference)
+        )
+        result = {
+            "model": model_name,
+            "backend": backend,
+            f"recall@{k}": recall,
+            "encode_ms": {
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "mean": statistics.mean(latencies),
+            },
+            "load_seconds": load_seconds,
+        }
+        results.append(result)
+        print(
+            f"  {label:<28} recall@{k}={recall:.3f}  encode p50={result['encode_ms']['p50']:.1f}ms "
+            f"p95={result['encode_ms']['p95']:.1f}ms  load={load_seconds:.1f}s"
+        )
+
+    report = {
+        "k": k,
+        "queries": len(queries),
+        "reference": {"model": REFERENCE[0], "backend": REFERENCE[1]},
+        "results": results,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"embedding_benchmark_{int(time.time())}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {output_path}")
+    return report
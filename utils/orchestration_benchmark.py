@@ -0,0 +1,262 @@
+"""
+Orchestration load benchmark on the offline LLM backend.
+
+Runs the multi-agent workflows with ``LLM_BACKEND=offline`` (see
+components/utils/offline_llm.py), so no request leaves the machine and no
+quota is spent. Each workload is run at several concurrency levels:
+
+    enhancement  EnhancementOrchestrator.run_enhancement_workflow, runs gathered on one event loop
+    debate       DebateManager.conduct_debate over three domains, runs in threads
+    api          POST /api/agent (analyze_transaction and process_use_case) through the ASGI app
+
+and reported as wall time, throughput and per-run latency percentiles, with
+the LLM call counts from the telemetry traces. With the default zero model
+latency the figures are the pure orchestration, retrieval and parsing
+overhead; set ``latency_ms`` to see how that overhead and the workflow
+structure behave when model calls take realistic time.
+
+The agents bind their chat model at import, so when the current process is
+not already on the offline backend the benchmark runs in a child process
+that is. The response cache, rate limiter and request coalescing are
+switched off there, so every run makes all of its model calls. The
+validator's external compliance API and the debate context API are
+bypassed; retrieval uses the local index.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.retrieval_benchmark import _git_commit, labeled_queries
+
+logger = logging.getLogger(__name__)
+
+WORKLOADS = ("enhancement", "debate", "api")
+CONCURRENCY_LEVELS = (1, 4, 16)
+
+OFFLINE_ENV = {
+    "LLM_BACKEND": "offline",
+    "LLM_CACHE": "off",
+    "LLM_SINGLE_FLIGHT": "off",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+}
+
+
+def _run_record(started: float, trace, error: Optional[str] = None) -> Dict[str, Any]:
+    totals = trace.to_dict(include_calls=False)
+    return {
+        "latency_seconds": time.perf_counter() - started,
+        "llm_calls": totals["llm_calls"],
+        "llm_seconds": totals["llm_seconds"],
+        "error": error,
+    }
+
+
+async def _enhancement_runs(concurrency: int, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from components.monitoring.llm_telemetry import workflow_trace
+    from components.orchestration.enhancement_orchestrator import EnhancementOrchestrator
+
+    orchestrator = EnhancementOrchestrator()
+
+    async def run(case):
+        started = time.perf_counter()
+        with workflow_trace("benchmark") as trace:
+            result = await orchestrator.run_enhancement_workflow(
+                case["standard_id"], case["query"], include_cross_standard_analysis=True
+            )
+        return _run_record(started, trace, result.get("error"))
+
+    return await asyncio.gather(*(run(cases[i % len(cases)]) for i in range(concurrency)))
+
+
+def _debate_runs(concurrency: int, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from components.evaluation.debate_manager import DebateManager
+    from components.monitoring.llm_telemetry import workflow_trace
+    from retreiver import retriever
+
+    domains = ["shariah", "finance", "legal"]
+
+    def run(case):
+        started = time.perf_counter()
+        with workflow_trace("benchmark") as trace:
+            # Local retrieval instead of the external context API
+            docs = [{"text": node.text, "metadata": getattr(node, "metadata", {}) or {}} for node in retriever.retrieve(case["query"])]
+            response = f"The applicable standard is FAS {case['standard_id']}."
+            result = DebateManager().conduct_debate(case["query"], response, domains, context={d: docs for d in domains})
+        return _run_record(started, trace, result.get("error"))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, (cases[i % len(cases)] for i in range(concurrency))))
+
+
+async def _api_runs(concurrency: int, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    import httpx
+
+    from components.monitoring.llm_telemetry import workflow_trace
+    from server import app
+
+    async def run(client, case):
+        task = "process_use_case" if case["source"] == "use_case" else "analyze_transaction"
+        started = time.perf_counter()
+        with workflow_trace("benchmark") as trace:
+            response = await client.post("/api/agent", json={"prompt": case["query"], "task": task, "options": {}})
+        body = response.json()
+        error = None if response.status_code == 200 and body.get("status") == "success" else str(body.get("result", body))
+        return _run_record(started, trace, error)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        return await asyncio.gather(*(run(client, cases[i % len(cases)]) for i in range(concurrency)))
+
+
+def _summarize(workload: str, concurrency: int, wall_seconds: float, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = np.array([run["latency_seconds"] for run in runs])
+    return {
+        "workload": workload,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(len(runs) / wall_seconds * 60, 2) if wall_seconds > 0 else None,
+        "latency_seconds": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+            "max": round(float(latencies.max()), 3),
+        },
+        "llm_calls_per_run": round(float(np.mean([run["llm_calls"] for run in runs])), 1),
+        "llm_seconds_per_run": round(float(np.mean([run["llm_seconds"] for run in runs])), 3),
+        "errors": sum(run["error"] is not None for run in runs),
+        "first_error": next((run["error"] for run in runs if run["error"]), None),
+    }
+
+
+def _benchmark_in_process(workloads: Sequence[str], concurrency_levels: Sequence[int]) -> List[Dict[str, Any]]:
+    from components.agents.validator_agent import validator_agent
+
+    # The compliance API is an external service; keep the benchmark local
+    validator_agent.use_compliance_api = False
+
+    queries = labeled_queries()
+    inputs: Dict[str, List[Dict[str, Any]]] = {
+        "enhancement": [q for q in queries if q["source"] == "enhancement"],
+        "debate": [q for q in queries if q["source"] != "enhancement"],
+        "api": [q for q in queries if q["source"] != "enhancement"],
+    }
+    runners: Dict[str, Callable[[int, List[Dict[str, Any]]], Any]] = {
+        "enhancement": lambda n, cases: asyncio.run(_enhancement_runs(n, cases)),
+        "debate": _debate_runs,
+        "api": lambda n, cases: asyncio.run(_api_runs(n, cases)),
+    }
+
+    results = []
+    for workload in workloads:
+        # One warm-up run loads the retriever and imports outside the measurement
+        runners[workload](1, inputs[workload])
+        for concurrency in concurrency_levels:
+            started = time.perf_counter()
+            runs = runners[workload](concurrency, inputs[workload])
+            summary = _summarize(workload, concurrency, time.perf_counter() - started, runs)
+            results.append(summary)
+            print(
+                f"  {workload:<12} x{concurrency:<3} wall={summary['wall_seconds']:.2f}s "
+                f"throughput={summary['throughput_per_minute']}/min p50={summary['latency_seconds']['p50']:.2f}s "
+                f"p95={summary['latency_seconds']['p95']:.2f}s llm_calls/run={summary['llm_calls_per_run']} "
+                f"errors={summary['errors']}"
+            )
+    return results
+
+
+def _report(workloads, concurrency_levels, latency_ms: float, failure_rate: float) -> Dict[str, Any]:
+    print(f"Benchmarking {', '.join(workloads)} at concurrency {list(concurrency_levels)} "
+          f"(offline LLM, {latency_ms:g}ms latency, {failure_rate:g} failure rate)...")
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "llm_latency_ms": latency_ms,
+        "llm_failure_rate": failure_rate,
+        "results": _benchmark_in_process(workloads, concurrency_levels),
+    }
+
+
+def run_orchestration_benchmark(
+    workloads: Sequence[str] = WORKLOADS,
+    concurrency_levels: Sequence[int] = CONCURRENCY_LEVELS,
+    latency_ms: float = 0.0,
+    failure_rate: float = 0.0,
+    output_dir: str = "results",
+) -> Dict[str, Any]:
+    """
+    Benchmark the agent workflows under concurrency on the offline LLM backend.
+
+    Args:
+        workloads: Any of "enhancement", "debate", "api"
+        concurrency_levels: Numbers of simultaneous runs to measure
+        latency_ms: Simulated mean latency of each model call
+        failure_rate: Simulated probability that a model call fails (retried
+            with the normal backoff)
+        output_dir: Directory the JSON report is written to
+
+    Returns:
+        The report dict
+    """
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        raise ValueError(f"Unknown workloads {sorted(unknown)}; expected some of {WORKLOADS}")
+
+    commit = _git_commit()
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"orchestration_benchmark_{commit or 'unknown'}_{int(time.time())}.json")
+    env = {
+        **OFFLINE_ENV,
+        "OFFLINE_LLM_LATENCY_MS": str(latency_ms),
+        "OFFLINE_LLM_FAILURE_RATE": str(failure_rate),
+    }
+
+    if any(os.environ.get(key) != value for key, value in env.items()):
+        # Agents bind their chat model when imported; rerun in a process that starts offline
+        subprocess.run(
+            [
+                sys.executable, "-m", "utils.orchestration_benchmark",
+                "--workloads", *workloads,
+                "--concurrency", *map(str, concurrency_levels),
+                "--latency-ms", str(latency_ms),
+                "--failure-rate", str(failure_rate),
+                "--output", output_path,
+            ],
+            env={**os.environ, **env},
+            check=True,
+        )
+        print(f"\nReport saved to {output_path}")
+        with open(output_path) as f:
+            return json.load(f)
+
+    report = _report(workloads, concurrency_levels, latency_ms, failure_rate)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {output_path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Orchestration load benchmark on the offline LLM backend")
+    parser.add_argument("--workloads", nargs="+", default=list(WORKLOADS), choices=WORKLOADS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=list(CONCURRENCY_LEVELS))
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the report to this path")
+    args = parser.parse_args()
+
+    if args.output:
+        # Child run started by run_orchestration_benchmark
+        with open(args.output, "w") as f:
+            json.dump(_report(args.workloads, args.concurrency, args.latency_ms, args.failure_rate), f, indent=2)
+    else:
+        run_orchestration_benchmark(args.workloads, args.concurrency, args.latency_ms, args.failure_rate)
@@ -0,0 +1,66 @@
+"""
+Recall check for the quantized vector index first pass.
+
+Embeds the repository's test queries and compares the top results of the
+int8 and binary first passes against the exact float32 scan.
+"""
+
+import json
+import logging
+import os
+import time
+
+from components.retrieval.retriever import encode_queries
+from components.retrieval.vector_index import quantization_recall
+from components.test.reverse_transactions import test_cases as transaction_test_cases
+from components.test.use_case import test_cases as use_case_test_cases
+from utils.sample_tests import sample_queries
+
+logger = logging.getLogger(__name__)
+
+
+def test_queries():
+    """Query texts from the transaction, use case and sample test sets."""
+    queries = [str(case["transaction"]) for case in transaction_test_cases]
+    queries += [str(case["transaction"]) for case in use_case_test_cases]
+    queries += [sample["query"].strip() for sample in sample_queries()]
+    return queries
+
+
+def run_quantization_recall_tests(k: int = 20, output_dir: str = "results"):
+    """
+    Measure recall@k of the int8 and binary first passes on the test queries.
+
+    Args:
+        k: Cut-off for recall
+        output_dir: Directory the JSON report is written to
+    """
+    from retreiver import retriever
+
+    queries = test_queries()
+    print(f"Embedding {len(queries)} test queries...")
+    retriever.warmup()
+    embeddings = encode_queries(retriever.embed_model, queries)
+    index = retriever.index
+
+    recall = quantization_recall(index, embeddings, k=k)
+    dim, count = index.meta.dim, index.meta.count
+    report = {
+        "k": k,
+        "queries": len(queries),
+        "nodes": count,
+        "recall": recall,
+        "first_pass_bytes": {"float32": count * dim * 4, "int8": count * dim, "binary": count * ((dim + 7) // 8)},
+    }
+
+    print(f"\nRecall@{k} against the exact float32 scan ({len(queries)} queries, {count} nodes):")
+    for mode, value in recall.items():
+        ratio = report["first_pass_bytes"]["float32"] / report["first_pass_bytes"][mode]
+        print(f"  {mode:<7} recall={value:.3f}  first-pass memory {ratio:.0f}x smaller")
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"quantization_recall_{int(time.time())}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {output_path}")
+    return report
@@ -0,0 +1,251 @@
+"""
+Retrieval quality and cost benchmark built from the repository's test cases.
+
+The reverse-transaction, use-case and enhancement test cases become labeled
+queries: each is tagged with the FAS standard it is about. Every retrieval
+configuration (mode, quantization, embedding model/backend) is scored on
+
+    recall@k     share of queries with a chunk of the expected standard in the top k
+    precision@k  mean share of the top k chunks that come from the expected standard
+    MRR          mean reciprocal rank of the first chunk of the expected standard
+
+plus per-query latency percentiles and peak RSS. Configurations run one at a
+time in a fresh process so the RSS figures don't bleed into each other. The
+JSON report records the git commit, so runs can be compared across commits.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+K_VALUES = (1, 3, 5, 10, 20)
+
+# Standards: 4 Musharaka, 7 Salam, 10 Istisna'a, 28 Murabaha, 32 Ijarah.
+# "Sukuk Early Termination" and "Hybrid Digital Asset Conversion" don't map to
+# one indexed standard and are left out.
+TRANSACTION_STANDARDS = {
+    "Test case 1": "10",
+    "Test case 2": "10",
+    "GreenTech Buyout": "4",
+    "Agricultural Commodity Advance Purchase Cancellation": "7",
+    "Ijarah Early Termination": "32",
+    "Equipment Lease Modification": "32",
+    "Contract Change Order Reversal": "10",
+    "Deferred Payment Sale Early Settlement": "28",
+}
+USE_CASE_STANDARDS = {
+    "Istisna'a Contract - Revenue Recognition (Percentage of Completion - Seller's Books)": "10",
+    "Parallel Istisna'a - Cost Recognition (Bank as Buyer in Parallel, Seller in Main - Seller's Books)": "10",
+    "Salam Contract - Initial Recognition and Payment (Bank as Buyer - Buyer's Books)": "7",
+    "Salam Contract - Receipt of Goods (Different Quality - Buyer's Books)": "7",
+    "Musharaka Financing - Initial Capital Contribution (Bank's Books)": "4",
+    "Diminishing Musharaka - Bank's Share Transfer (Bank's Books)": "4",
+    "Ijarah - Lessor Accounting (Initial Recognition of Underlying Asset)": "32",
+}
+
+DEFAULT_CONFIGURATIONS = [
+    {"name": "dense", "mode": "dense", "quantization": "none"},
+    {"name": "dense-int8", "mode": "dense", "quantization": "int8"},
+    {"name": "dense-binary", "mode": "dense", "quantization": "binary"},
+    {"name": "sparse", "mode": "sparse", "quantization": "none"},
+    {"name": "hybrid", "mode": "hybrid", "quantization": "none"},
+    {"name": "hybrid-int8", "mode": "hybrid", "quantization": "int8"},
+]
+
+
+def labeled_queries() -> List[Dict[str, str]]:
+    """Test cases as {"source", "name", "query", "standard_id"} records."""
+    from components.test.enhancement import test_cases as enhancement_test_cases
+    from components.test.reverse_transactions import test_cases as transaction_test_cases
+    from components.test.use_case import test_cases as use_case_test_cases
+
+    queries = []
+    for source, cases, labels in (
+        ("reverse_transactions", transaction_test_cases, TRANSACTION_STANDARDS),
+        ("use_case", use_case_test_cases, USE_CASE_STANDARDS),
+    ):
+        for case in cases:
+            if case["name"] in labels:
+                queries.append({
+                    "source": source,
+                    "name": case["name"],
+                    "query": str(case["transaction"]).strip(),
+                    "standard_id": labels[case["name"]],
+                })
+    for case in enhancement_test_cases:
+        queries.append({
+            "source": "enhancement",
+            "name": case["name"],
+            "query": " ".join(case["trigger_scenario"].split()),
+            "standard_id": case["standard_id"],
+        })
+    return queries
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def score_rankings(rankings: Sequence[Sequence[str]], expected: Sequence[str], k_values: Sequence[int]) -> Dict[str, Any]:
+    """
+    Recall@k, precision@k and MRR from ranked standard ids.
+
+    Args:
+        rankings: Per query, the standard id of each retrieved chunk in rank order
+        expected: Per query, the expected standard id
+        k_values: Cut-offs to report
+    """
+    metrics: Dict[str, Any] = {}
+    for k in k_values:
+        metrics[f"recall@{k}"] = float(np.mean([label in ranking[:k] for ranking, label in zip(rankings, expected)]))
+        metrics[f"precision@{k}"] = float(np.mean([
+            sum(standard == label for standard in ranking[:k]) / k for ranking, label in zip(rankings, expected)
+        ]))
+    reciprocal_ranks = [
+        1.0 / (list(ranking).index(label) + 1) if label in ranking else 0.0
+        for ranking, label in zip(rankings, expected)
+    ]
+    metrics["mrr"] = float(np.mean(reciprocal_ranks))
+    return metrics
+
+
+def _evaluate_configuration(
+    configuration: Dict[str, Any], queries: List[Dict[str, str]], k_values: Sequence[int], storage_path: str
+) -> Dict[str, Any]:
+    """Load one retrieval configuration and run every query through it."""
+    from components.retrieval.embeddings import embedding_model
+    from components.retrieval.retriever import load_standards_retriever
+    from components.retrieval.standards import standard_id_from_metadata
+
+    top_k = max(k_values)
+    load_start = time.perf_counter()
+    retriever = load_standards_retriever(
+        storage_path,
+        embed_model=embedding_model(configuration.get("model"), configuration.get("backend")),
+        similarity_top_k=top_k,
+        cache_query_embeddings=False,
+        cache_results=False,
+        mode=configuration["mode"],
+        quantization=configuration.get("quantization"),
+    )
+    # The first query also loads the embedding model in dense and hybrid modes
+    retriever.retrieve(queries[0]["query"])
+    load_seconds = time.perf_counter() - load_start
+
+    rankings, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        nodes = retriever.retrieve(query["query"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        rankings.append([standard_id_from_metadata(node.metadata) for node in nodes])
+
+    expected = [query["standard_id"] for query in queries]
+    result = {
+        **configuration,
+        **score_rankings(rankings, expected, k_values),
+        "latency_ms": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+            "mean": float(np.mean(latencies)),
+        },
+        "load_seconds": load_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+        "first_relevant_rank": {
+            query["name"]: (ranking.index(query["standard_id"]) + 1 if query["standard_id"] in ranking else None)
+            for query, ranking in zip(queries, rankings)
+        },
+    }
+    return result
+
+
+def run_retrieval_benchmark(
+    configurations: Optional[List[Dict[str, Any]]] = None,
+    k_values: Sequence[int] = K_VALUES,
+    storage_path: str = "./vector_db_storage/",
+    output_dir: str = "results",
+    isolate: bool = True,
+):
+    """
+    Benchmark retrieval configurations on the labeled test-case queries.
+
+    Args:
+        configurations: Dicts with "name", "mode" and optionally "quantization",
+            "model" and "backend"; defaults to DEFAULT_CONFIGURATIONS
+        k_values: Cut-offs for recall and precision
+        storage_path: llama_index persist directory
+        output_dir: Directory the JSON report is written to
+        isolate: Run each configuration in its own process so peak RSS is per
+            configuration
+
+    Returns:
+        The report dict
+    """
+    configurations = configurations or DEFAULT_CONFIGURATIONS
+    queries = labeled_queries()
+    print(f"Benchmarking {len(configurations)} retrieval configurations on {len(queries)} labeled queries...")
+
+    results = []
+    for configuration in configurations:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(_evaluate_configuration, configuration, queries, k_values, storage_path).result()
+        else:
+            result = _evaluate_configuration(configuration, queries, k_values, storage_path)
+        results.append(result)
+
+        top_k = max(k_values)
+        rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] is not None else "n/a"
+        print(
+            f"  {configuration['name']:<14} recall@5={result['recall@5']:.2f} recall@{top_k}={result[f'recall@{top_k}']:.2f} "
+            f"P@5={result['precision@5']:.2f} MRR={result['mrr']:.3f}  "
+            f"p50={result['latency_ms']['p50']:.1f}ms p95={result['latency_ms']['p95']:.1f}ms "
+            f"p99={result['latency_ms']['p99']:.1f}ms  peak RSS={rss}"
+        )
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "k_values": list(k_values),
+        "queries": len(queries),
+        "queries_by_source": {
+            source: sum(query["source"] == source for query in queries)
+            for source in sorted({query["source"] for query in queries})
+        },
+        "results": results,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"retrieval_benchmark_{report['commit'] or 'unknown'}_{int(time.time())}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {output_path}")
+    return report